@@ -6,6 +6,11 @@ import pandas as pd
 import os
 import glob
 import numpy as np
+from utils.atomic_io import to_csv_atomic
+from utils.data_profiler import profile_ingested
+from utils.dtypes import downcast, read_compact
+from utils.instrumentation import instrumented, stage
+from utils.panel_tensor import PanelTensor
 
 # --- Konfigurasi Direktori ---
 CONFIG = {
@@ -16,13 +21,13 @@ CONFIG = {
         'P1': 'Data_Source/Persentase Penduduk Miskin/(P1) Menurut Provinsi/',
         'P2': 'Data_Source/Persentase Penduduk Miskin/(P2) Menurut Provinsi/'
     },
+    'P0_KAB_DIR': 'Data_Source/Persentase Penduduk Miskin/(P0) Menurut Kabupaten_Kota/',
+    'P0_NASIONAL_DIR': 'Data_Source/Persentase Penduduk Miskin/(P0) Menurut Daerah/',
+    'POP_DIR': 'Data_Source/Jumlah Penduduk/',
     'CLEANED_DIR': 'cleaned_data/',
     'MIN_TAHUN': 2013 # Kritis untuk memastikan kelengkapan feature GK dan TPT
 }
 
-# Pastikan folder cleaned_data ada
-os.makedirs(CONFIG['CLEANED_DIR'], exist_ok=True)
-
 # ====================================================
 # FUNGSI UTILITAS
 # ====================================================
@@ -34,6 +39,7 @@ def standardize_province_names(df):
         df['Provinsi'] = df['Provinsi'].str.replace(r'\s+', ' ', regex=True)
         
         # Hapus KATA KUNCI geografis yang mengganggu
+        df['Provinsi'] = df['Provinsi'].str.replace(r'^D I ', 'DI ', regex=True)
         df['Provinsi'] = df['Provinsi'].str.replace('DAERAH ISTIMEWA', '', regex=False)
         df['Provinsi'] = df['Provinsi'].str.replace('DKI', '', regex=False)
         
@@ -87,6 +93,7 @@ def clean_and_impute_semesters(df_clean, data_type, prefix_map, target_col):
 # STEP 1: PENGGABUNGAN & PEMBERSIHAN TPT
 # ====================================================
 
+@instrumented
 def process_tpt_data():
     list_df_tpt = []
     all_files = glob.glob(os.path.join(CONFIG['TPT_DIR'], "*.csv"))
@@ -116,19 +123,20 @@ def process_tpt_data():
             prefix_map = {'Mar': 'TPT_Feb', 'Sep': 'TPT_Aug', 'Tahunan': 'TPT_Tahunan_Source'}
             df_clean = clean_and_impute_semesters(df_clean, 'TPT', prefix_map, 'TPT_Tahunan')
             
-            list_df_tpt.append(df_clean[['Provinsi', 'TPT_Tahunan', 'Tahun']])
+            list_df_tpt.append(downcast(df_clean[['Provinsi', 'TPT_Tahunan', 'Tahun']]))
             
         except Exception as e:
             print(f"Gagal memproses file {filename}: {e}")
 
     df_tpt_master = pd.concat(list_df_tpt, ignore_index=True) if list_df_tpt else pd.DataFrame()
     df_tpt_master.dropna(subset=['TPT_Tahunan'], inplace=True)
-    return standardize_province_names(df_tpt_master)
+    return downcast(standardize_province_names(df_tpt_master), label='TPT master')
 
 # ====================================================
 # STEP 2: PENGGABUNGAN & PEMBERSIHAN P0, P1, P2
 # ====================================================
 
+@instrumented(name=lambda data_type, data_dir: f'process_p_data[{data_type}]')
 def process_p_data(data_type, data_dir):
     list_df = []
     all_files = glob.glob(os.path.join(data_dir, "*.csv"))
@@ -158,19 +166,20 @@ def process_p_data(data_type, data_dir):
             prefix_map = {'Mar': f'{data_type}_Mar', 'Sep': f'{data_type}_Sep', 'Tahunan': f'{data_type}_Tahunan_Source'}
             df_clean = clean_and_impute_semesters(df_clean, data_type, prefix_map, data_type)
             
-            list_df.append(df_clean[['Provinsi', data_type, 'Tahun']])
+            list_df.append(downcast(df_clean[['Provinsi', data_type, 'Tahun']]))
             
         except Exception as e:
             print(f"Gagal memproses file {filename}: {e}")
 
     df_master = pd.concat(list_df, ignore_index=True) if list_df else pd.DataFrame()
     df_master.dropna(subset=[data_type], inplace=True)
-    return standardize_province_names(df_master)
+    return downcast(standardize_province_names(df_master), label=f'{data_type} master')
 
 # ====================================================
 # STEP 3: PENGGABUNGAN & PEMBERSIHAN GARIS KEMISKINAN (GK)
 # ====================================================
 
+@instrumented
 def process_gk_data_final():
     list_df = []
     all_files = glob.glob(os.path.join(CONFIG['GK_DIR'], "*.csv"))
@@ -219,29 +228,144 @@ def process_gk_data_final():
             
             df_clean['GK_Tahunan'] = df_clean[['GK_Kota_Tahunan', 'GK_Desa_Tahunan']].mean(axis=1).round(2)
             
-            list_df.append(df_clean[['Provinsi', 'GK_Tahunan', 'Tahun']])
+            list_df.append(downcast(df_clean[['Provinsi', 'GK_Tahunan', 'Tahun']]))
             
         except Exception as e:
             print(f"Gagal memproses file {filename}: {e}")
 
     df_master = pd.concat(list_df, ignore_index=True) if list_df else pd.DataFrame()
     df_master.dropna(subset=['GK_Tahunan'], inplace=True)
-    return standardize_province_names(df_master)
+    return downcast(standardize_province_names(df_master), label='GK master')
+
+# ====================================================
+# STEP 3B: P0 KABUPATEN/KOTA & NASIONAL (UNTUK FORECAST HIERARKI)
+# ====================================================
+
+@instrumented
+def process_kabupaten_data():
+    """P0 Kabupaten/Kota: baris HURUF BESAR = provinsi induk, baris lainnya = kabupaten/kota"""
+    list_df = []
+    all_files = glob.glob(os.path.join(CONFIG['P0_KAB_DIR'], "*.csv"))
+    if not all_files: return pd.DataFrame()
+    
+    print(f"\nDitemukan {len(all_files)} file CSV P0 Kabupaten/Kota. Memulai penggabungan...")
+
+    for filename in all_files:
+        try:
+            df = pd.read_csv(filename, header=None, skiprows=3, names=['Wilayah', 'P0'])
+            year_str = os.path.basename(filename).split(',')[-1].replace('.csv', '').strip()
+            df['Tahun'] = int(year_str)
+            
+            df['Wilayah'] = df['Wilayah'].astype(str).str.strip()
+            is_prov = df['Wilayah'].str.isupper()
+            
+            # Provinsi induk diteruskan ke baris kabupaten/kota di bawahnya
+            df['Provinsi'] = df['Wilayah'].where(is_prov).ffill()
+            df_clean = df[~is_prov & df['Provinsi'].notna()].rename(columns={'Wilayah': 'Kabupaten'})
+            df_clean['P0'] = pd.to_numeric(df_clean['P0'], errors='coerce')
+            
+            list_df.append(downcast(df_clean[['Provinsi', 'Kabupaten', 'P0', 'Tahun']]))
+            
+        except Exception as e:
+            print(f"Gagal memproses file {filename}: {e}")
+
+    df_master = pd.concat(list_df, ignore_index=True) if list_df else pd.DataFrame()
+    df_master.dropna(subset=['P0'], inplace=True)
+    df_master = standardize_province_names(df_master)
+    # Tabel kabupaten menulis nama lengkap, tabel provinsi memakai singkatan
+    df_master['Provinsi'] = df_master['Provinsi'].replace({'KEPULAUAN RIAU': 'KEP. RIAU'})
+    return downcast(df_master, label='P0 kabupaten master')
+
+@instrumented
+def process_nasional_data():
+    """P0 Nasional dari baris 'Kota+Desa' pada data P0 Menurut Daerah"""
+    list_df = []
+    all_files = glob.glob(os.path.join(CONFIG['P0_NASIONAL_DIR'], "*.csv"))
+    if not all_files: return pd.DataFrame()
+    
+    print(f"\nDitemukan {len(all_files)} file CSV P0 Nasional. Memulai penggabungan dan imputasi...")
+
+    for filename in all_files:
+        try:
+            df = pd.read_csv(filename, header=3)
+            year_str = os.path.basename(filename).split(',')[-1].replace('.csv', '').strip()
+            df['Tahun'] = int(year_str)
+            
+            df_clean = df[df[df.columns[0]].astype(str).str.strip() == 'Kota+Desa'].copy()
+            df_clean = df_clean.rename(columns={
+                df_clean.columns[1]: 'P0_Mar',
+                df_clean.columns[2]: 'P0_Sep',
+                df_clean.columns[3]: 'P0_Tahunan_Source'
+            })
+            
+            prefix_map = {'Mar': 'P0_Mar', 'Sep': 'P0_Sep', 'Tahunan': 'P0_Tahunan_Source'}
+            df_clean = clean_and_impute_semesters(df_clean, 'P0', prefix_map, 'P0')
+            
+            list_df.append(downcast(df_clean[['Tahun', 'P0']]))
+            
+        except Exception as e:
+            print(f"Gagal memproses file {filename}: {e}")
+
+    df_master = pd.concat(list_df, ignore_index=True) if list_df else pd.DataFrame()
+    df_master.dropna(subset=['P0'], inplace=True)
+    return df_master.sort_values('Tahun')
+
+# ====================================================
+# STEP 3C: JUMLAH PENDUDUK (BOBOT AGREGAT NASIONAL)
+# ====================================================
+
+@instrumented
+def process_population_data():
+    """Jumlah Penduduk Menurut Provinsi (ribu jiwa), satu file per tahun dengan layout header=3"""
+    list_df = []
+    all_files = glob.glob(os.path.join(CONFIG['POP_DIR'], "*.csv"))
+    if not all_files: return pd.DataFrame()
+
+    print(f"\nDitemukan {len(all_files)} file CSV Jumlah Penduduk. Memulai penggabungan...")
+
+    for filename in all_files:
+        try:
+            df = pd.read_csv(filename, header=3)
+            year_str = os.path.basename(filename).split(',')[-1].replace('.csv', '').strip()
+            df['Tahun'] = int(year_str)
+
+            # Mapping Kolom: [0: Provinsi] [1: Jumlah Penduduk]
+            df_clean = df[df[df.columns[0]].notna()].copy()
+            df_clean = df_clean.rename(columns={
+                df_clean.columns[0]: 'Provinsi',
+                df_clean.columns[1]: 'Penduduk'
+            })
+
+            # Pembersihan baris non-data
+            df_clean = df_clean[~df_clean['Provinsi'].str.contains('INDONESIA|RATA-RATA|TOTAL', na=False, case=False)]
+
+            df_clean['Penduduk'] = df_clean['Penduduk'].astype(str).str.replace(r'[^\d\.]', '', regex=True)
+            df_clean['Penduduk'] = pd.to_numeric(df_clean['Penduduk'], errors='coerce')
+
+            list_df.append(downcast(df_clean[['Provinsi', 'Penduduk', 'Tahun']]))
+
+        except Exception as e:
+            print(f"Gagal memproses file {filename}: {e}")
+
+    df_master = pd.concat(list_df, ignore_index=True) if list_df else pd.DataFrame()
+    df_master.dropna(subset=['Penduduk'], inplace=True)
+    return downcast(standardize_province_names(df_master), label='Penduduk master')
 
 # ====================================================
 # STEP 4: MENGGABUNGKAN SEMUA DATA BPS (MASTER ML)
 # ====================================================
 
+@instrumented
 def create_master_dataframe():
     
     cleaned_dir = CONFIG['CLEANED_DIR']
     
     # Memuat data yang sudah dibersihkan
-    df_tpt = pd.read_csv(os.path.join(cleaned_dir, 'tpt_master_final.csv'))
-    df_p0 = pd.read_csv(os.path.join(cleaned_dir, 'P0_master_final.csv'))
-    df_p1 = pd.read_csv(os.path.join(cleaned_dir, 'P1_master_final.csv'))
-    df_p2 = pd.read_csv(os.path.join(cleaned_dir, 'P2_master_final.csv'))
-    df_gk = pd.read_csv(os.path.join(cleaned_dir, 'gk_master_final.csv'))
+    df_tpt = read_compact(os.path.join(cleaned_dir, 'tpt_master_final.csv'))
+    df_p0 = read_compact(os.path.join(cleaned_dir, 'P0_master_final.csv'))
+    df_p1 = read_compact(os.path.join(cleaned_dir, 'P1_master_final.csv'))
+    df_p2 = read_compact(os.path.join(cleaned_dir, 'P2_master_final.csv'))
+    df_gk = read_compact(os.path.join(cleaned_dir, 'gk_master_final.csv'))
 
     # --- KONVERSI EKSPILISIT KOLOM TAHUN ---
     for df in [df_tpt, df_p0, df_p1, df_p2, df_gk]:
@@ -249,12 +373,12 @@ def create_master_dataframe():
         df.dropna(subset=['Tahun'], inplace=True)
         df['Tahun'] = df['Tahun'].astype(int) 
     
-    # Standardisasi nama provinsi
-    df_tpt = standardize_province_names(df_tpt)
-    df_p0 = standardize_province_names(df_p0)
-    df_p1 = standardize_province_names(df_p1)
-    df_p2 = standardize_province_names(df_p2)
-    df_gk = standardize_province_names(df_gk)
+    # Standardisasi nama provinsi (lalu kembali ke dtype ringkas)
+    df_tpt = downcast(standardize_province_names(df_tpt))
+    df_p0 = downcast(standardize_province_names(df_p0))
+    df_p1 = downcast(standardize_province_names(df_p1))
+    df_p2 = downcast(standardize_province_names(df_p2))
+    df_gk = downcast(standardize_province_names(df_gk))
 
     # --- FILTER TAHUN KRITIS ---
     MIN_TAHUN = CONFIG['MIN_TAHUN'] 
@@ -270,9 +394,10 @@ def create_master_dataframe():
     df_master = df_master.merge(df_gk, on=['Provinsi', 'Tahun'], how='left')
     df_master = df_master.merge(df_tpt, on=['Provinsi', 'Tahun'], how='left')
     
-    # 3. Menambahkan Feature Lag P0 
+    # 3. Menambahkan Feature Lag P0 (lag tepat 1 tahun pada tensor provinsi x tahun)
     df_master.sort_values(by=['Provinsi', 'Tahun'], inplace=True)
-    df_master['P0_Lag1'] = df_master.groupby('Provinsi')['P0'].shift(1)
+    panel = PanelTensor.from_long(df_master, ['P0'])
+    df_master['P0_Lag1'] = panel.lag(1).values_at(df_master)[:, 0]
     
     # 4. Filter Data Master (Menghapus baris dengan nilai hilang/NaN)
     df_master.dropna(inplace=True) 
@@ -280,19 +405,21 @@ def create_master_dataframe():
     # 5. Pilih dan atur ulang kolom final
     df_master = df_master[['Provinsi', 'Tahun', 'P0', 'P0_Lag1', 'TPT_Tahunan', 'GK_Tahunan', 'P1', 'P2']]
 
-    return df_master
+    return downcast(df_master, label='Data master ML')
 
 # ====================================================
 # MAIN EXECUTION
 # ====================================================
 
 def main():
+    # Folder output dibuat saat dijalankan (bukan saat import), agar modul aman diimpor oleh CLI
+    os.makedirs(CONFIG['CLEANED_DIR'], exist_ok=True)
     
     # Step 1
     df_tpt_final = process_tpt_data()
     if not df_tpt_final.empty:
         final_path = os.path.join(CONFIG['CLEANED_DIR'], 'tpt_master_final.csv')
-        df_tpt_final.to_csv(final_path, index=False)
+        to_csv_atomic(df_tpt_final, final_path, index=False)
         print(f"\n[DONE] TPT Master (Rows: {len(df_tpt_final)}) disimpan.")
 
     # Step 2
@@ -300,16 +427,35 @@ def main():
         df_cleaned = process_p_data(key, directory)
         if not df_cleaned.empty:
             final_path = os.path.join(CONFIG['CLEANED_DIR'], f'{key}_master_final.csv')
-            df_cleaned.to_csv(final_path, index=False)
+            to_csv_atomic(df_cleaned, final_path, index=False)
             print(f"[DONE] {key} Master (Rows: {len(df_cleaned)}) disimpan.")
 
     # Step 3
     df_gk_final = process_gk_data_final()
     if not df_gk_final.empty:
         final_path = os.path.join(CONFIG['CLEANED_DIR'], 'gk_master_final.csv')
-        df_gk_final.to_csv(final_path, index=False)
+        to_csv_atomic(df_gk_final, final_path, index=False)
         print(f"[DONE] GK Master (Rows: {len(df_gk_final)}) disimpan.")
 
+    # Step 3B
+    df_kab_final = process_kabupaten_data()
+    if not df_kab_final.empty:
+        final_path = os.path.join(CONFIG['CLEANED_DIR'], 'P0_kabupaten_master_final.csv')
+        to_csv_atomic(df_kab_final, final_path, index=False)
+        print(f"[DONE] P0 Kabupaten/Kota Master (Rows: {len(df_kab_final)}) disimpan.")
+
+    df_nasional_final = process_nasional_data()
+    if not df_nasional_final.empty:
+        final_path = os.path.join(CONFIG['CLEANED_DIR'], 'P0_nasional_master_final.csv')
+        to_csv_atomic(df_nasional_final, final_path, index=False)
+        print(f"[DONE] P0 Nasional Master (Rows: {len(df_nasional_final)}) disimpan.")
+
+    # Step 3C
+    df_pop_final = process_population_data()
+    if not df_pop_final.empty:
+        final_path = os.path.join(CONFIG['CLEANED_DIR'], 'populasi_master_final.csv')
+        to_csv_atomic(df_pop_final, final_path, index=False)
+        print(f"[DONE] Jumlah Penduduk Master (Rows: {len(df_pop_final)}) disimpan.")
 
     # Step 4: Membuat Data Master ML
     df_master_ml = create_master_dataframe()
@@ -322,11 +468,17 @@ def main():
         print(df_master_ml.head())
         
         final_path = os.path.join(CONFIG['CLEANED_DIR'], 'data_master_ml.csv')
-        df_master_ml.to_csv(final_path, index=False)
+        to_csv_atomic(df_master_ml, final_path, index=False)
         print(f"\n[FINAL] Data Master ML berhasil disimpan ke '{final_path}'")
     else:
         print("PENTING: Penggabungan Data Master ML GAGAL atau menghasilkan DataFrame kosong. Cek inkonsistensi nama Provinsi atau rentang Tahun.")
     print("=================================================")
 
+    # Step 5: Profil kualitas data seluruh output ingestion (provinsi, kabupaten, nasional)
+    df_anomali, df_gap, _ = profile_ingested(CONFIG['CLEANED_DIR'])
+    print(f"\n[PROFIL] {len(df_anomali)} anomali dan {len(df_gap)} celah tahun dicatat "
+          f"(lihat Control Panel > Data Status).")
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    with stage('01_data_ingestion_cleaning'):
+        main()
\ No newline at end of file
@@ -1,8 +1,8 @@
 import pandas as pd
 import datetime
 import os
-import snscrape.modules.twitter as sntwitter
 import itertools
+from utils.atomic_io import to_csv_atomic
 
 CLEANED_DIR = 'cleaned_data/'
 KEYWORD_LIST = [
@@ -27,6 +27,8 @@ START_YEAR = 2013
 END_YEAR = 2024 
 
 def scrape_tweets(max_tweets_per_year_province=500):
+    import snscrape.modules.twitter as sntwitter
+    
     all_tweet_data = []
     total_scraped = 0
     
@@ -71,7 +73,7 @@ if __name__ == '__main__':
     
     if not df_sentiment_raw.empty:
         df_sentiment_raw['Tahun'] = df_sentiment_raw['Tahun_Scrape']
-        df_sentiment_raw.to_csv(os.path.join(CLEANED_DIR, 'sentiment_raw.csv'), index=False)
+        to_csv_atomic(df_sentiment_raw, os.path.join(CLEANED_DIR, 'sentiment_raw.csv'), index=False)
         print(f"\n[DONE] Data Mentah Sentimen (Rows: {len(df_sentiment_raw)}) disimpan ke '{os.path.join(CLEANED_DIR, 'sentiment_raw.csv')}'")
     else:
         print("\n[GAGAL] Tidak ada data sentimen yang berhasil diambil. Cek instalasi snscrape Anda.")
\ No newline at end of file
@@ -1,11 +1,11 @@
 import pandas as pd
 import os
+from utils.atomic_io import to_csv_atomic
+from utils.instrumentation import instrumented, stage, record_rows
 
-PATH_KONTEN = '/home/ardwind/Project/BigDataProject/Data_Source/sosialresponse/kontentiktok.csv'
-PATH_KOMEN = '/home/ardwind/Project/BigDataProject/Data_Source/sosialresponse/komentiktok.csv'
-OUTPUT_DIR = 'cleaned_data/'
-
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+PATH_KONTEN = 'Data_Source/sosialresponse/kontentiktok.csv'
+PATH_KOMEN = 'Data_Source/sosialresponse/komentiktok.csv'
+OUTPUT_DIR = 'cleaned_data/'  # dibuat oleh to_csv_atomic saat output ditulis
 
 KATA_POSITIF = ['daftar', 'minat', 'siap', 'bantu', 'upgrade', 'lirik', 'semangat', 'solusi', 'berhasil', 'kerja', 'terima']
 KATA_NEGATIF = ['phk', 'susah', 'nganggur', 'belum', 'habis', 'sulit', 'menjerit', 'penjilat', 'parah', 'gagal', 'miskin']
@@ -20,6 +20,7 @@ def get_sentiment_label(text):
         if kata in text: score -= 1
     return 1 if score > 0 else (-1 if score < 0 else 0)
 
+@instrumented
 def process_tiktok_data():
     print("🚀 [03] Memulai Pemrosesan Sentimen...")
     try:
@@ -36,19 +37,23 @@ def process_tiktok_data():
     df2 = df_komen[['Teks Konten', 'Tahun']].copy()
     df_combined = pd.concat([df1, df2], ignore_index=True)
 
-    df_combined['Score'] = df_combined['Teks Konten'].apply(get_sentiment_label)
+    with stage('sentiment_scoring', kind='function') as rec:
+        df_combined['Score'] = df_combined['Teks Konten'].apply(get_sentiment_label)
+        rec.rows(rows_in=len(df_combined), rows_out=len(df_combined))
     
     df_combined['Tahun'] = pd.to_numeric(df_combined['Tahun'], errors='coerce')
     df_combined = df_combined.dropna(subset=['Tahun'])
     df_combined['Tahun'] = df_combined['Tahun'].astype(int)
 
     df_yearly = df_combined.groupby('Tahun')['Score'].mean().reset_index()
+    record_rows(rows_in=len(df_combined), rows_out=len(df_yearly))
     
     output_path = os.path.join(OUTPUT_DIR, 'sentiment_per_year.csv')
-    df_yearly.to_csv(output_path, index=False)
+    to_csv_atomic(df_yearly, output_path, index=False)
     
     print(f"✅ [03] Berhasil menyimpan sentimen tahunan ke: {output_path}")
     print(df_yearly)
 
 if __name__ == '__main__':
-    process_tiktok_data()
\ No newline at end of file
+    with stage('03_sentiment_processor'):
+        process_tiktok_data()
\ No newline at end of file
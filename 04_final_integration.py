@@ -1,11 +1,16 @@
 import pandas as pd
 import os
+from utils.atomic_io import to_csv_atomic
+from utils.dtypes import downcast, read_compact
+from utils.spatial import add_spatial_features, morans_i, SPATIAL_FEATURES
+from utils.instrumentation import instrumented, stage, record_rows
 
 # --- KONFIGURASI PATH ---
 MASTER_BPS_PATH = 'cleaned_data/data_master_ml.csv'
 SENTIMENT_CSV_PATH = 'cleaned_data/sentiment_per_year.csv'
 OUTPUT_FINAL = 'cleaned_data/dataset_final_untuk_ml.csv'
 
+@instrumented
 def integrate_final_dataset():
     print("🚀 [04] Memulai Integrasi Dataset Final...")
     
@@ -14,7 +19,7 @@ def integrate_final_dataset():
         return
 
     # 1. Load Data Master
-    df = pd.read_csv(MASTER_BPS_PATH)
+    df = read_compact(MASTER_BPS_PATH)
     
     # 2. Standarisasi Nama Kolom (PENTING!)
     # Kita ubah nama kolom yang mengandung 'TPT' atau 'GK' menjadi nama baku
@@ -28,7 +33,7 @@ def integrate_final_dataset():
 
     # 3. Gabungkan dengan Sentimen
     if os.path.exists(SENTIMENT_CSV_PATH):
-        df_sent = pd.read_csv(SENTIMENT_CSV_PATH)
+        df_sent = read_compact(SENTIMENT_CSV_PATH)
         df_final = pd.merge(df, df_sent, on='Tahun', how='left')
         
         # Jika kolom dari Skrip 03 bernama 'Score', ubah ke 'Sentimen_Global'
@@ -41,9 +46,25 @@ def integrate_final_dataset():
         df_final = df.copy()
         df_final['Sentimen_Global'] = 0
 
-    # 4. Simpan Dataset Final
-    df_final.to_csv(OUTPUT_FINAL, index=False)
+    # 4. Fitur Spasial: rata-rata P0 tahun lalu dan TPT provinsi tetangga (GeoJSON)
+    df_final = add_spatial_features(df_final)
+    df_final[list(SPATIAL_FEATURES)] = df_final[list(SPATIAL_FEATURES)].round(4)
+    print("   Log: Moran's I per tahun (autokorelasi spasial P0 / TPT):")
+    df_moran = morans_i(df_final, 'P0')[['Tahun', 'Moran_I', 'p_value', 'Graf_Berubah']].merge(
+        morans_i(df_final, 'TPT')[['Tahun', 'Moran_I', 'p_value']], on='Tahun', suffixes=('_P0', '_TPT'))
+    print(df_moran.round(4).to_string(index=False))
+    changed = df_moran.loc[df_moran['Graf_Berubah'], 'Tahun'].tolist()
+    if changed:
+        print(f"   ⚠️ Himpunan provinsi berubah mulai tahun {changed}: Moran's I sebelum/sesudahnya tidak sebanding.")
+
+    # Merge/rename bisa mengembalikan kolom ke dtype lebar (mis. kolom hasil rename)
+    df_final = downcast(df_final, label='Dataset final')
+
+    # 5. Simpan Dataset Final
+    to_csv_atomic(df_final, OUTPUT_FINAL, index=False)
+    record_rows(rows_in=len(df), rows_out=len(df_final))
     print(f"✅ [04] Dataset Final berhasil dibuat dengan kolom: {df_final.columns.tolist()}")
 
 if __name__ == '__main__':
-    integrate_final_dataset()
\ No newline at end of file
+    with stage('04_final_integration'):
+        integrate_final_dataset()
\ No newline at end of file
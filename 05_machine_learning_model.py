@@ -1,17 +1,83 @@
 import pandas as pd
 import numpy as np
-import joblib
-import matplotlib.pyplot as plt
 import os
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
+from utils.explainability import build_explanations
+from utils.atomic_io import savefig_atomic
+from utils.dtypes import read_compact, LABEL_SCHEMA
+from utils.instrumentation import instrumented, stage, record_rows
+from utils.panel_tensor import PanelTensor
+from utils.model_registry import (
+    register_model, promote, get_champion, load_index, timed_fit,
+    cross_validate_metrics, backtest_champion_vs_challenger, holdout_start
+)
 
 # --- KONFIGURASI PATH ---
+# Model & daftar fitur disimpan per versi di cleaned_data/model_registry/
 DATA_PATH = 'cleaned_data/dataset_final_untuk_ml.csv'
-MODEL_OUT = 'cleaned_data/model_kemiskinan_final.pkl'
-FEATURES_OUT = 'cleaned_data/feature_names.pkl' # Penting untuk Dashboard
 
+# 'if_better' = challenger dipromosikan jika data berubah atau MAE backtest-nya lebih kecil
+# 'always'    = setiap model baru langsung menjadi champion
+PROMOTE_POLICY = 'if_better'
+
+# Indikator yang diprediksi bersama oleh model multi-output (vektor t -> vektor t+1)
+INDIKATOR = ['P0', 'P1', 'P2', 'TPT', 'Garis_Kemiskinan']
+
+# sklearn dan matplotlib diimpor di dalam fungsi (setelah cek data), sehingga
+# skrip yang berhenti lebih awal tidak membayar waktu impor keduanya
+
+def save_prediction_plot(y_test, y_pred, path='cleaned_data/plot_prediksi.png'):
+    """
+    Scatter aktual vs prediksi ke PNG. Figure dibuat langsung di canvas Agg
+    (tanpa pyplot/GUI backend), jadi aman dijalankan headless dari subprocess.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.scatter(y_test, y_pred, alpha=0.5, color='blue')
+    ax.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--', lw=2)
+    ax.set_title('Akurasi Model: Aktual vs Prediksi')
+    savefig_atomic(fig, path)
+
+def publish_version(version):
+    """Memutuskan apakah versi baru (challenger) dipromosikan menjadi champion"""
+    index = load_index()
+    meta = index['versions'][version]
+    champion = get_champion(meta['family'])
+    
+    if champion == version:
+        print(f"ℹ️ Data dan konfigurasi tidak berubah, {version} tetap champion.")
+        return
+    if champion is None or PROMOTE_POLICY == 'always':
+        promote(version)
+        print(f"🏆 {version} dipromosikan menjadi champion.")
+        return
+    
+    champ_meta = index['versions'][champion]
+    if champ_meta['data_fingerprint'] != meta['data_fingerprint']:
+        promote(version)
+        print(f"🏆 Data latih berubah, {version} menggantikan {champion} sebagai champion.")
+        return
+    
+    # Data sama, konfigurasi beda: backtest rolling-origin kedua konfigurasi pada tahun historis
+    df_bt = backtest_champion_vs_challenger(version, DATA_PATH)
+    if df_bt is None or df_bt.empty:
+        promote(version)
+        print(f"🏆 {champion} tidak bisa dibandingkan (fitur/tahun historis tidak tersedia), {version} menggantikannya.")
+        return
+    print("\nBacktest Champion vs Challenger (rolling-origin, MAE P0 per tahun):")
+    print(df_bt.round(4).to_string(index=False))
+    score_champ, score_chal = df_bt['MAE champion'].mean(), df_bt['MAE challenger'].mean()
+    
+    if score_chal < score_champ:
+        promote(version)
+        print(f"🏆 {version} dipromosikan (MAE {score_chal:.4f} < {score_champ:.4f}).")
+    else:
+        print(f"ℹ️ {champion} tetap champion (MAE {score_champ:.4f} <= {score_chal:.4f}).")
+
+@instrumented
 def build_machine_learning_model():
     print("🚀 [05] Memasuki tahap Pelatihan Model...")
     
@@ -19,11 +85,12 @@ def build_machine_learning_model():
         print(f"🛑 Error: File {DATA_PATH} tidak ditemukan! Jalankan skrip 04 dulu.")
         return None
     
-    df = pd.read_csv(DATA_PATH)
+    df = read_compact(DATA_PATH, LABEL_SCHEMA, label='Dataset latih')
     
     # 1. PEMILIHAN FITUR (Disamakan dengan output skrip 04)
     # Pastikan nama kolom ini ada di dataset_final_untuk_ml.csv
-    features = ['P0_Lag1', 'TPT', 'Garis_Kemiskinan', 'Sentimen_Global', 'P1', 'P2']
+    # P0_Lag1_Spasial / TPT_Spasial: rata-rata provinsi tetangga (utils/spatial.py)
+    features = ['P0_Lag1', 'TPT', 'Garis_Kemiskinan', 'Sentimen_Global', 'P1', 'P2', 'P0_Lag1_Spasial', 'TPT_Spasial']
     target = 'P0'
     
     # Validasi keberadaan kolom sebelum lanjut
@@ -32,11 +99,18 @@ def build_machine_learning_model():
         print(f"🛑 Error: Kolom berikut tidak ada di dataset: {missing_cols}")
         return None
 
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error, r2_score
+    
     X = df[features]
     y = df[target]
     
-    # 2. SPLIT DATA
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # 2. SPLIT DATA: tahun terakhir menjadi holdout, hanya untuk evaluasi di langkah 4
+    holdout_from = holdout_start(df['Tahun'])
+    is_test = (df['Tahun'] >= holdout_from).to_numpy()
+    X_train, X_test, y_train, y_test = X[~is_test], X[is_test], y[~is_test], y[is_test]
+    print(f"Holdout: tahun {holdout_from}-{df['Tahun'].max()} ({is_test.sum()} baris)")
+    record_rows(rows_in=len(df), rows_out=len(X))
     
     # 3. TRAINING MODEL
     print(f"Melatih Random Forest dengan {len(X_train)} data...")
@@ -61,20 +135,101 @@ def build_machine_learning_model():
     print(feat_imp)
     
     # 6. VISUALISASI
-    plt.figure(figsize=(10, 6))
-    plt.scatter(y_test, y_pred, alpha=0.5, color='blue')
-    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--', lw=2)
-    plt.title('Akurasi Model: Aktual vs Prediksi')
-    plt.savefig('cleaned_data/plot_prediksi.png')
+    save_prediction_plot(y_test, y_pred)
+    
+    # 7. LATIH ULANG DENGAN SEMUA TAHUN: model produksi (skrip 07) harus melihat tahun terakhir
+    print(f"\nMelatih ulang dengan seluruh {len(X)} data (termasuk holdout)...")
+    training_time = timed_fit(model, X, y)
+    
+    # 8. SIMPAN KE MODEL REGISTRY (model + daftar fitur + metadata)
+    cv_metrics = cross_validate_metrics(RandomForestRegressor(n_estimators=100, random_state=42), X, y)
+    version = register_model(model, features, 'p0', DATA_PATH, cv_metrics, training_time)
+    print(f"\n✅ Model terdaftar di registry sebagai: {version} (CV MAE: {cv_metrics['mae']:.4f})")
+    publish_version(version)
+    
+    # 9. PENJELASAN MODEL (kontribusi per prediksi + grid partial dependence, di-cache per hash model)
+    model_path = load_index()['versions'][version]['model_path']
+    explain = build_explanations(model_path, X, id_cols=df[['Provinsi', 'Tahun']])
+    mean_contrib = explain['contributions'][features].abs().mean().sort_values(ascending=False)
+    print("\nRata-rata |Kontribusi| per Fitur (jalur pohon):")
+    print(mean_contrib.round(4).to_string())
+    print(f"✅ Cache penjelasan model disimpan (hash: {explain['model_hash']})")
+    
+    return model
+
+@instrumented
+def build_multioutput_model():
+    """Melatih satu model yang memprediksi seluruh vektor indikator tahun t+1 dari vektor tahun t"""
+    print("\n🚀 [05] Melatih Model Multi-Output (P0, P1, P2, TPT, GK)...")
     
-    # 7. SIMPAN MODEL & DAFTAR FITUR
-    joblib.dump(model, MODEL_OUT)
-    joblib.dump(features, FEATURES_OUT) # Menyimpan urutan kolom fitur
+    if not os.path.exists(DATA_PATH):
+        print(f"🛑 Error: File {DATA_PATH} tidak ditemukan! Jalankan skrip 04 dulu.")
+        return None
+    
+    df = read_compact(DATA_PATH, LABEL_SCHEMA)
+    missing_cols = [c for c in INDIKATOR if c not in df.columns]
+    if missing_cols:
+        print(f"🛑 Error: Kolom berikut tidak ada di dataset: {missing_cols}")
+        return None
+    
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.compose import TransformedTargetRegressor
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.metrics import mean_absolute_error, r2_score
+    
+    # 1. PASANGAN (t, t+1) PER PROVINSI
+    # Lag -1 pada sumbu tahun tensor = tepat tahun berikutnya, jadi loncatan tahun tidak dianggap 1 langkah
+    df = df.sort_values(['Provinsi', 'Tahun'])
+    next_values = PanelTensor.from_long(df, INDIKATOR).lag(-1).values_at(df)
+    mask = ~np.isnan(next_values).any(axis=1)
+    
+    # Target = perubahan (t+1 - t), sehingga tren seperti kenaikan GK tetap bisa
+    # diteruskan; Random Forest tidak bisa mengekstrapolasi level di luar data latih
+    X = df.loc[mask, INDIKATOR]
+    y = pd.DataFrame(next_values[mask], index=X.index, columns=INDIKATOR) - X
+    
+    # Holdout evaluasi per tahun target (t+1)
+    target_years = df.loc[mask, 'Tahun'].to_numpy() + 1
+    is_test = target_years >= holdout_start(target_years)
+    X_train, X_test, y_train, y_test = X[~is_test], X[is_test], y[~is_test], y[is_test]
+    record_rows(rows_in=len(df), rows_out=len(X))
+    
+    # 2. TRAINING (satu kali fit untuk semua target)
+    # Target distandarisasi agar skala GK (ratusan ribu) tidak mendominasi kriteria split
+    print(f"Melatih Random Forest Multi-Output dengan {len(X_train)} pasangan tahun...")
+    model = TransformedTargetRegressor(
+        regressor=RandomForestRegressor(n_estimators=100, random_state=42),
+        transformer=StandardScaler()
+    )
+    model.fit(X_train, y_train)
+    
+    # 3. EVALUASI PER TARGET (satu kali predict untuk semua target)
+    # Evaluasi dilakukan pada level (t + perubahan) agar sebanding dengan model P0
+    y_pred = X_test.to_numpy() + model.predict(X_test)
+    y_true = X_test + y_test
+    print("\n=================================================")
+    print("HASIL EVALUASI MODEL MULTI-OUTPUT")
+    for k, col in enumerate(INDIKATOR):
+        mae = mean_absolute_error(y_true[col], y_pred[:, k])
+        r2 = r2_score(y_true[col], y_pred[:, k])
+        print(f"{col:<18} MAE: {mae:,.4f} | R2: {r2*100:.2f}%")
+    print("=================================================")
     
-    print(f"\n✅ Model disimpan di: {MODEL_OUT}")
-    print(f"✅ Daftar fitur disimpan di: {FEATURES_OUT}")
+    # 4. LATIH ULANG DENGAN SEMUA PASANGAN TAHUN, lalu simpan ke registry (urutan fitur = urutan target)
+    print(f"\nMelatih ulang dengan seluruh {len(X)} pasangan tahun (termasuk holdout)...")
+    training_time = timed_fit(model, X, y)
+    cv_model = TransformedTargetRegressor(
+        regressor=RandomForestRegressor(n_estimators=100, random_state=42),
+        transformer=StandardScaler()
+    )
+    cv_metrics = cross_validate_metrics(cv_model, X, y, output='P0')
+    version = register_model(model, INDIKATOR, 'multi', DATA_PATH, cv_metrics, training_time)
+    print(f"\n✅ Model multi-output terdaftar di registry sebagai: {version}")
+    publish_version(version)
     
     return model
 
 if __name__ == '__main__':
-    build_machine_learning_model()
\ No newline at end of file
+    with stage('05_machine_learning_model'):
+        build_machine_learning_model()
+        build_multioutput_model()
\ No newline at end of file
@@ -1,13 +1,12 @@
-import joblib
 import pandas as pd
+from utils.model_registry import resolve_current_model
 
-# 1. Muat model yang sudah disimpan
-try:
-    model = joblib.load('cleaned_data/model_kemiskinan_final.pkl')
-    print("✅ Model berhasil dimuat.")
-except:
+# 1. Muat model champion dari model registry
+model, features, version = resolve_current_model('p0')
+if model is None:
     print("❌ Model tidak ditemukan. Jalankan script 05 terlebih dahulu.")
     exit()
+print(f"✅ Model berhasil dimuat ({version}).")
 
 # 2. Input Data Manual (Simulasi)
 print("\n--- Simulasi Prediksi Kemiskinan ---")
@@ -19,8 +18,7 @@ p1 = float(input("Masukkan Indeks Kedalaman (P1) (contoh 1.2): "))
 p2 = float(input("Masukkan Indeks Keparahan (P2) (contoh 0.3): "))
 
 # 3. Masukkan ke DataFrame
-data_simulasi = pd.DataFrame([[p0_lalu, tpt, gk, sentimen, p1, p2]], 
-                            columns=['P0_Lag1', 'TPT_Tahunan', 'GK_Tahunan', 'Sentimen_Global', 'P1', 'P2'])
+data_simulasi = pd.DataFrame([[p0_lalu, tpt, gk, sentimen, p1, p2]], columns=features)
 
 # 4. Prediksi
 hasil = model.predict(data_simulasi)
@@ -1,53 +1,100 @@
 import pandas as pd
-import joblib
-import os
+from utils.forecast_interval import forecast_buffer, buffer_to_frame, simulate_trajectories, summarize_quantiles
+from utils.model_registry import resolve_current_model
+from utils.atomic_io import to_csv_atomic
+from utils.dtypes import read_compact, LABEL_SCHEMA
+from utils.spatial import spatial_weights, SPATIAL_FEATURES
+from utils.population import load_population, population_weights, weighted_mean, national_mean
+from utils.instrumentation import instrumented, stage, record_rows
 
 # --- KONFIGURASI PATH ---
+# Model dipilih dari champion di model registry (skrip 05)
 DATA_FINAL_PATH = 'cleaned_data/dataset_final_untuk_ml.csv'
-MODEL_PATH = 'cleaned_data/model_kemiskinan_final.pkl'
-FEATURES_PATH = 'cleaned_data/feature_names.pkl'
 OUTPUT_FORECAST = 'cleaned_data/data_forecasting_2026_2027.csv'
+OUTPUT_BAND_NASIONAL = 'cleaned_data/data_forecasting_band_nasional.csv'
+POPULASI_PATH = 'cleaned_data/populasi_master_final.csv'
 
+# --- KONFIGURASI INTERVAL PREDIKSI ---
+HORIZON = 5
+N_TRAJECTORIES = 500   # Jumlah trajektori sampel per provinsi
+BATCH_SIZE = 100       # Trajektori per batch (membatasi memori kerja)
+
+# 'multi' = semua indikator maju bersama (model multi-output skrip 05)
+# 'single' = hanya P0 yang diprediksi, indikator lain tetap di nilai tahun terakhir
+MODEL_FAMILY = 'multi'
+
+def load_forecast_model():
+    """Memuat champion sesuai MODEL_FAMILY, fallback ke model target tunggal jika multi-output belum ada"""
+    if MODEL_FAMILY == 'multi':
+        model, features, version = resolve_current_model('multi')
+        if model is not None:
+            return 'multi', model, features, version
+    model, features, version = resolve_current_model('p0')
+    return 'single', model, features, version
+
+@instrumented
 def run_forecasting():
     print("🚀 [07] Memulai Peramalan Kemiskinan 5 Tahun Kedepan...")
     
-    if not os.path.exists(MODEL_PATH) or not os.path.exists(FEATURES_PATH):
+    # 1. Muat Model dan Data
+    family, model, features, version = load_forecast_model()
+    if model is None:
         print("🛑 Error: Model atau Daftar Fitur tidak ditemukan. Jalankan skrip 05 dulu.")
         return
-
-    # 1. Muat Model dan Data
-    model = joblib.load(MODEL_PATH)
-    features = joblib.load(FEATURES_PATH)
-    df = pd.read_csv(DATA_FINAL_PATH)
+    print(f"   Model: {'Multi-Output (semua indikator)' if family == 'multi' else 'Target Tunggal (P0)'} [{version}]")
+    # Indikator tetap float64: forecast rekursif memakai hasil tahun sebelumnya sebagai input
+    df = read_compact(DATA_FINAL_PATH, LABEL_SCHEMA, label='Dataset forecast')
     
     # 2. Ambil data tahun terakhir sebagai basis
     latest_year = df['Tahun'].max()
-    df_latest = df[df['Tahun'] == latest_year].copy()
+    df_base = df[df['Tahun'] == latest_year]
+    # Fitur spasial (rata-rata tetangga) ikut dihitung ulang setiap tahun forecast
+    weights = spatial_weights(df_base['Provinsi']) if any(c in df_base.columns for c in SPATIAL_FEATURES) else None
     
-    forecast_results = []
-
-    # 3. Loop untuk 5 tahun kedepan
-    for i in range(1, 6):  # 1, 2, 3, 4, 5
-        year_target = latest_year + i
-        print(f"   Memproses Prediksi Tahun {year_target}...")
-        
-        # Siapkan data input (menggunakan P0 tahun sebelumnya sebagai P0_Lag1)
-        df_latest['P0_Lag1'] = df_latest['P0']
-        df_latest['Tahun'] = year_target
-        
-        # Lakukan Prediksi
-        X_input = df_latest[features]
-        df_latest['P0'] = model.predict(X_input)
-        
-        forecast_results.append(df_latest.copy())
-
-    # 4. Gabungkan dan Simpan
-    df_forecast = pd.concat(forecast_results, ignore_index=True)
-    df_forecast.to_csv(OUTPUT_FORECAST, index=False)
+    # 3. Forecast rekursif 5 tahun kedepan ke buffer (tahun x provinsi x kolom)
+    # 'multi': satu predict memajukan seluruh vektor indikator (model memprediksi perubahan)
+    print(f"   Memproses Prediksi Tahun {latest_year + 1}-{latest_year + HORIZON}...")
+    outputs, delta = (features, True) if family == 'multi' else (['P0'], False)
+    buffer, columns = forecast_buffer(model, df_base, features, outputs, HORIZON, delta, weights)
+
+    # 4. Satu DataFrame di akhir
+    df_forecast = buffer_to_frame(buffer, columns, df_base)
+
+    # 5. Interval Prediksi dari Trajektori Per-Pohon
+    print(f"   Menghitung interval prediksi ({N_TRAJECTORIES} trajektori/provinsi)...")
+    feedback = {col: col for col in features} if family == 'multi' else {'P0': 'P0_Lag1'}
+    samples = simulate_trajectories(model, df_base, features, HORIZON,
+                                    feedback=feedback, delta=(family == 'multi'),
+                                    n_trajectories=N_TRAJECTORIES, batch_size=BATCH_SIZE,
+                                    weights=weights)['P0']
+
+    # Urutan baris df_forecast = tahun x provinsi, sama dengan sumbu (horizon, provinsi)
+    for name, band in summarize_quantiles(samples).items():
+        df_forecast[f'P0_{name}'] = band.reshape(-1).round(4)
+
+    # Pita nasional: rata-rata tertimbang penduduk per trajektori (satu einsum untuk
+    # semua tahun x trajektori), lalu kuantil. Tanpa tabel penduduk = rata-rata biasa.
+    population = load_population(POPULASI_PATH)
+    if population is None:
+        print("   ⚠️ Tabel penduduk belum tersedia, agregat nasional = rata-rata provinsi.")
+    forecast_years = range(latest_year + 1, latest_year + HORIZON + 1)
+    pop_weights = population_weights(population, df_base['Provinsi'], forecast_years)
+    band_nasional = summarize_quantiles(weighted_mean(samples, pop_weights.T))
+    df_band = pd.DataFrame({'Tahun': forecast_years})
+    for name, band in band_nasional.items():
+        df_band[f'P0_{name}'] = band.round(4)
+
+    to_csv_atomic(df_forecast, OUTPUT_FORECAST, index=False)
+    to_csv_atomic(df_band, OUTPUT_BAND_NASIONAL, index=False)
+    record_rows(rows_in=len(df), rows_out=len(df_forecast))
     
     print(f"✅ [07] Peramalan selesai! Hasil disimpan di: {OUTPUT_FORECAST}")
-    print(f"Tahun forecast: {latest_year+1} - {latest_year+5}")
-    print(f"Rata-rata Prediksi Nasional {latest_year+1}: {df_forecast[df_forecast['Tahun']==latest_year+1]['P0'].mean():.2f}%")
+    print(f"✅ [07] Pita prediksi nasional disimpan di: {OUTPUT_BAND_NASIONAL}")
+    print(f"Tahun forecast: {latest_year+1} - {latest_year+HORIZON}")
+    df_nasional = national_mean(df_forecast, ['P0'], population)
+    basis = "tertimbang penduduk" if population is not None else "rata-rata provinsi"
+    print(f"Rata-rata Prediksi Nasional {latest_year+1} ({basis}): {df_nasional['P0'].iloc[0]:.2f}%")
 
 if __name__ == '__main__':
-    run_forecasting()
\ No newline at end of file
+    with stage('07_forecasting'):
+        run_forecasting()
\ No newline at end of file
@@ -0,0 +1,126 @@
+import pandas as pd
+import numpy as np
+import os
+from utils.hierarchy import (build_summing_matrix, reconcile, damped_drift_forecast, naive_error_variance,
+                             aggregate_history, base_interval)
+from utils.columnar_store import write_table
+from utils.population import load_population, population_weights
+from utils.dtypes import read_compact, LABEL_SCHEMA
+from utils.instrumentation import stage
+
+# --- KONFIGURASI PATH ---
+KAB_PATH = 'cleaned_data/P0_kabupaten_master_final.csv'
+NASIONAL_PATH = 'cleaned_data/P0_nasional_master_final.csv'
+PROV_FORECAST_PATH = 'cleaned_data/data_forecasting_2026_2027.csv'
+POPULASI_PATH = 'cleaned_data/populasi_master_final.csv'
+OUTPUT_TABLE = 'forecast_hierarki'
+
+# 'wls' = rekonsiliasi gaya MinT (varians diagonal), 'bottom_up' = agregasi dari kabupaten
+RECONCILE_METHOD = 'wls'
+
+def load_population_weights(provinces, year):
+    """Bobot penduduk per provinsi pada `year` (tahun terdekat yang tersedia); None jika tabel penduduk belum diingest"""
+    population = load_population(POPULASI_PATH)
+    if population is None:
+        return None
+    return population_weights(population, provinces, [year])[:, 0]
+
+def run_hierarchical_forecast():
+    print("🚀 [08] Memulai Forecast Hierarki (Kabupaten/Kota -> Provinsi -> Nasional)...")
+
+    for path in [KAB_PATH, PROV_FORECAST_PATH]:
+        if not os.path.exists(path):
+            print(f"🛑 Error: {path} tidak ditemukan. Jalankan skrip 01 dan 07 dulu.")
+            return
+
+    df_kab = read_compact(KAB_PATH, LABEL_SCHEMA, label='P0 kabupaten')
+    df_prov_fc = read_compact(PROV_FORECAST_PATH, LABEL_SCHEMA)
+    years = sorted(df_prov_fc['Tahun'].unique())
+    horizon = len(years)
+
+    # 1. Series level bawah: kabupaten/kota yang punya data di tahun terakhir
+    pivot_kab = df_kab.pivot_table(index=['Provinsi', 'Kabupaten'], columns='Tahun', values='P0', observed=True)
+    pivot_kab = pivot_kab[pivot_kab.iloc[:, -1].notna()]
+    # Label series kecil (satu baris per kabupaten/kota), dipakai sebagai string biasa
+    bottom = pivot_kab.index.to_frame(index=False).astype(str)
+
+    # 2. Bobot penduduk: penduduk provinsi dibagi rata ke kabupaten/kota di dalamnya
+    provinces = sorted(bottom['Provinsi'].unique())
+    pop_prov = load_population_weights(provinces, int(pivot_kab.columns[-1]))
+    if pop_prov is None:
+        print("   ⚠️ Tabel penduduk belum tersedia, memakai bobot seragam.")
+        bottom_weights = None
+    else:
+        n_kab = bottom.groupby('Provinsi').size().reindex(provinces).to_numpy()
+        per_kab = pd.Series(pop_prov / n_kab, index=provinces)
+        bottom_weights = bottom['Provinsi'].map(per_kab).to_numpy()
+
+    S, prov_order = build_summing_matrix(bottom['Provinsi'], bottom_weights)
+    print(f"   Hierarki: 1 nasional, {len(prov_order)} provinsi, {len(bottom)} kabupaten/kota (nnz S = {S.nnz})")
+
+    # 3. Forecast dasar tiap level
+    # Kabupaten/Kota: damped drift vektor untuk seluruh series sekaligus
+    base_kab = damped_drift_forecast(pivot_kab, horizon)
+
+    # Provinsi: hasil model ML skrip 07, fallback ke drift dari baris agregat tertimbang
+    prov_fc = df_prov_fc.pivot_table(index='Provinsi', columns='Tahun', values='P0', observed=True).reindex(prov_order)
+    hist_prov = aggregate_history(S[1:1 + len(prov_order)], pivot_kab).set_axis(prov_order)
+    base_prov = prov_fc.reindex(columns=years).to_numpy(dtype=float)
+    fallback = damped_drift_forecast(hist_prov, horizon)
+    base_prov = np.where(np.isnan(base_prov), fallback, base_prov)
+
+    # Nasional: drift dari series nasional BPS (atau agregat tertimbang jika tidak ada)
+    if os.path.exists(NASIONAL_PATH):
+        hist_nat = pd.read_csv(NASIONAL_PATH).set_index('Tahun')['P0'].to_frame().T
+    else:
+        hist_nat = aggregate_history(S[:1], pivot_kab)
+    base_nat = damped_drift_forecast(hist_nat, horizon)
+
+    y_base = np.vstack([base_nat, base_prov, base_kab])
+
+    # 4. Rekonsiliasi: forecast nasional BPS masuk sebagai forecast dasar level atas
+    # dengan variansnya sendiri, penyesuaiannya dibagi WLS ke semua level
+    variances = np.concatenate([
+        naive_error_variance(hist_nat),
+        naive_error_variance(hist_prov),
+        naive_error_variance(pivot_kab)
+    ])
+    y_rec = reconcile(S, y_base, method=RECONCILE_METHOD, variances=variances)
+
+    # Cek koherensi: hasil rekonsiliasi tiap series terhadap interval P10-P90 forecast
+    # dasarnya sendiri. Series tanpa forecast dasar/varians tidak dicek (NaN)
+    lower, upper = base_interval(y_base, variances)
+    checkable = np.isfinite(lower) & np.isfinite(upper)
+    inside = (y_rec >= lower) & (y_rec <= upper)
+    n_levels = [('Nasional', 1), ('Provinsi', len(prov_order)), ('Kabupaten/Kota', len(bottom))]
+    start = 0
+    for name, n in n_levels:
+        rows = slice(start, start + n)
+        start += n
+        n_out = int((checkable[rows] & ~inside[rows]).any(axis=1).sum())
+        mark = "⚠️" if n_out else "✅"
+        print(f"   {mark} {name}: {n_out} dari {n} series keluar dari interval P10-P90 forecast dasar")
+
+    # 5. Susun tabel output (long) dan simpan ke columnar store
+    labels = pd.concat([
+        pd.DataFrame({'Level': 'Nasional', 'Provinsi': ['INDONESIA'], 'Kabupaten': [None]}),
+        pd.DataFrame({'Level': 'Provinsi', 'Provinsi': prov_order, 'Kabupaten': None}),
+        bottom.assign(Level='Kabupaten')[['Level', 'Provinsi', 'Kabupaten']]
+    ], ignore_index=True)
+
+    n_series = len(labels)
+    df_out = labels.loc[labels.index.repeat(horizon)].reset_index(drop=True)
+    df_out['Tahun'] = np.tile(years, n_series)
+    df_out['P0_Base'] = y_base.reshape(-1).round(4)
+    df_out['P0'] = y_rec.reshape(-1).round(4)
+    df_out['Dalam_Interval_Dasar'] = pd.array(np.where(checkable, inside, None).reshape(-1), dtype='boolean')
+
+    path = write_table(df_out, OUTPUT_TABLE)
+    print(f"✅ [08] Forecast hierarki koheren ({RECONCILE_METHOD}) disimpan di: {path}")
+    nat = df_out[df_out['Level'] == 'Nasional']
+    for _, row in nat.iterrows():
+        print(f"   Nasional {int(row['Tahun'])}: dasar (drift series nasional) {row['P0_Base']:.2f}% -> rekonsiliasi {row['P0']:.2f}%")
+
+if __name__ == '__main__':
+    with stage('08_hierarchical_forecast'):
+        run_hierarchical_forecast()
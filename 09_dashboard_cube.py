@@ -0,0 +1,34 @@
+import os
+from utils.dashboard_cube import build_dashboard_cube, CUBE_TABLE
+from utils.population import load_population
+from utils.columnar_store import write_table
+from utils.dtypes import read_compact, LABEL_SCHEMA
+from utils.instrumentation import stage
+
+# --- KONFIGURASI PATH ---
+DATA_PATH = 'cleaned_data/dataset_final_untuk_ml.csv'
+FORECAST_PATH = 'cleaned_data/data_forecasting_2026_2027.csv'
+POPULASI_PATH = 'cleaned_data/populasi_master_final.csv'
+
+def run_dashboard_cube():
+    print("🚀 [09] Membangun Kubus Agregat Dashboard...")
+
+    if not os.path.exists(DATA_PATH):
+        print(f"🛑 Error: {DATA_PATH} tidak ditemukan. Jalankan skrip 04 dulu.")
+        return
+
+    df_hist = read_compact(DATA_PATH, LABEL_SCHEMA)
+    df_forecast = read_compact(FORECAST_PATH, LABEL_SCHEMA) if os.path.exists(FORECAST_PATH) else None
+    population = load_population(POPULASI_PATH)
+    if population is None:
+        print("   ⚠️ Tabel penduduk belum tersedia, rata-rata tertimbang = rata-rata biasa.")
+
+    cube = build_dashboard_cube(df_hist, df_forecast, population)
+    path = write_table(cube, CUBE_TABLE)
+
+    print(f"✅ [09] Kubus agregat ({len(cube)} baris) disimpan di: {path}")
+    print(cube.groupby(['Level', 'Sumber']).size().to_string())
+
+if __name__ == '__main__':
+    with stage('09_dashboard_cube'):
+        run_dashboard_cube()
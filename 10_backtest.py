@@ -0,0 +1,42 @@
+import os
+from utils.backtest import run_backtest, ORIGINS, HORIZON
+from utils.columnar_store import write_table
+from utils.dtypes import read_compact, LABEL_SCHEMA
+from utils.instrumentation import instrumented, stage, record_rows
+
+# --- KONFIGURASI PATH ---
+DATA_FINAL_PATH = 'cleaned_data/dataset_final_untuk_ml.csv'
+OUTPUT_DETAIL = 'backtest_forecast'
+OUTPUT_MATRIX = 'backtest_mae'
+
+# Family model yang di-backtest, sama dengan MODEL_FAMILY skrip 07
+MODEL_FAMILY = 'multi'
+
+@instrumented
+def run_backtesting():
+    print("🚀 [10] Memulai Backtest Forecast Rekursif...")
+
+    if not os.path.exists(DATA_FINAL_PATH):
+        print(f"🛑 Error: {DATA_FINAL_PATH} tidak ditemukan. Jalankan skrip 04 dulu.")
+        return
+
+    df = read_compact(DATA_FINAL_PATH, LABEL_SCHEMA)
+    print(f"   Origin {ORIGINS[0]}-{ORIGINS[-1]}, horizon 1-{HORIZON} tahun, model '{MODEL_FAMILY}' (paralel per origin)...")
+    df_detail, df_matrix = run_backtest(df, family=MODEL_FAMILY)
+    if df_detail.empty:
+        print("🛑 Error: Tidak ada origin yang bisa diskor (data historis terlalu pendek).")
+        return
+
+    write_table(df_detail, OUTPUT_DETAIL)
+    path = write_table(df_matrix.reset_index(), OUTPUT_MATRIX)
+    record_rows(rows_in=len(df), rows_out=len(df_detail))
+
+    print(f"✅ [10] Matriks error (horizon x provinsi) disimpan di: {path}")
+    print("\nMAE per horizon (rata-rata provinsi):")
+    summary = df_detail.assign(AbsError=df_detail['Error'].abs()).groupby('Horizon').agg(
+        MAE=('AbsError', 'mean'), Bias=('Error', 'mean'), N=('Error', 'size'))
+    print(summary.round(4).to_string())
+
+if __name__ == '__main__':
+    with stage('10_backtest'):
+        run_backtesting()
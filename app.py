@@ -1,17 +1,32 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import json
 import os
 import subprocess
-import joblib
+from utils.data_version import data_version_token
 
 # --- KONFIGURASI PATH ---
 DATA_PATH = 'cleaned_data/dataset_final_untuk_ml.csv'
 MAP_DATA_PATH = 'Data_Source/indonesia_simple.geojson'
-MODEL_PATH = 'cleaned_data/model_kemiskinan_final.pkl'
+MAP_DETAIL_LEVEL = 'sedang'
+REGISTRY_INDEX = 'cleaned_data/model_registry/registry.json'
 FORECAST_PATH = 'cleaned_data/forecast_results.csv'
+FORECAST_FILE = 'cleaned_data/data_forecasting_2026_2027.csv'
+BAND_FILE = 'cleaned_data/data_forecasting_band_nasional.csv'
+POPULASI_FILE = 'cleaned_data/populasi_master_final.csv'
+
+# Penyelarasan nama provinsi dataset dengan properti 'Propinsi' di GeoJSON
+MAPPING_SINKRON = {
+    "DI YOGYAKARTA": "DAERAH ISTIMEWA YOGYAKARTA",
+    "JAKARTA": "DKI JAKARTA",
+    "NUSA TENGGARA BARAT": "NUSATENGGARA BARAT",
+    "NUSA TENGGARA TIMUR": "NUSATENGGARA TIMUR",
+    "KEP. BANGKA BELITUNG": "KEPULAUAN BANGKA BELITUNG",
+    "KEP. RIAU": "KEPULAUAN RIAU",
+    "SUMATRA BARAT": "SUMATERA BARAT",
+    "SUMATRA SELATAN": "SUMATERA SELATAN",
+    "SUMATRA UTARA": "SUMATERA UTARA",
+    "PAPUA": "IRIAN JAYA TIMUR"
+}
 
 # --- SETTING HALAMAN ---
 st.set_page_config(
@@ -21,8 +36,13 @@ st.set_page_config(
 )
 
 # --- FUNGSI HELPER ---
-@st.cache_data
-def load_data():
+# Semua loader menerima `data_token` (hash manifest output pipeline) sebagai kunci cache:
+# cache tetap hangat selama output tidak berubah dan otomatis diperbarui setelah pipeline jalan.
+# max_entries membatasi cache ke versi data terbaru, sehingga kubus/model/koneksi DuckDB versi
+# lama dilepas setelah pipeline jalan (tidak menumpuk selama server hidup).
+@st.cache_data(max_entries=1)
+def load_data(data_token):
+    from utils.dtypes import downcast, LABEL_SCHEMA
     if os.path.exists(DATA_PATH):
         df = pd.read_csv(DATA_PATH)
         # Penyesuaian nama kolom agar sinkron dengan hasil skrip 04 & 05 terbaru
@@ -32,30 +52,226 @@ def load_data():
                 df[col] = pd.to_numeric(df[col], errors='coerce')
         
         df['Provinsi'] = df['Provinsi'].str.upper().str.strip()
-        
-        mapping_sinkron = {
-            "DI YOGYAKARTA": "DAERAH ISTIMEWA YOGYAKARTA",
-            "JAKARTA": "DKI JAKARTA",
-            "NUSA TENGGARA BARAT": "NUSATENGGARA BARAT",
-            "NUSA TENGGARA TIMUR": "NUSATENGGARA TIMUR",
-            "KEP. BANGKA BELITUNG": "KEPULAUAN BANGKA BELITUNG",
-            "KEP. RIAU": "KEPULAUAN RIAU",
-            "SUMATRA BARAT": "SUMATERA BARAT",
-            "SUMATRA SELATAN": "SUMATERA SELATAN",
-            "SUMATRA UTARA": "SUMATERA UTARA",
-            "PAPUA": "IRIAN JAYA TIMUR"
-        }
-        df['Provinsi'] = df['Provinsi'].replace(mapping_sinkron)
-        return df
+        df['Provinsi'] = df['Provinsi'].replace(MAPPING_SINKRON)
+        return downcast(df, LABEL_SCHEMA)
     return None
 
-def load_geojson():
-    if os.path.exists(MAP_DATA_PATH):
-        try:
-            with open(MAP_DATA_PATH, 'r') as f:
-                return json.load(f)
-        except: return None
-    return None
+@st.cache_resource(max_entries=1)
+def load_cube(data_token):
+    """
+    Kubus agregat dashboard (skrip 09). Dibangun di memori jika belum dimaterialisasi
+    atau lebih lama dari dataset/forecast (mis. setelah menjalankan skrip secara terpisah).
+    """
+    from utils.columnar_store import read_table, table_path
+    from utils.dashboard_cube import build_dashboard_cube, index_cube, CUBE_TABLE
+    from utils.population import load_population
+    from utils.dtypes import read_compact, LABEL_SCHEMA
+    mtime = lambda p: os.path.getmtime(p) if os.path.exists(p) else 0
+    is_fresh = mtime(table_path(CUBE_TABLE)) >= max(mtime(DATA_PATH), mtime(FORECAST_FILE), mtime(POPULASI_FILE))
+    cube = read_table(CUBE_TABLE) if is_fresh else None
+    if cube is None:
+        if not os.path.exists(DATA_PATH):
+            return None
+        df_fc = read_compact(FORECAST_FILE, LABEL_SCHEMA) if os.path.exists(FORECAST_FILE) else None
+        cube = build_dashboard_cube(read_compact(DATA_PATH, LABEL_SCHEMA), df_fc, load_population(POPULASI_FILE))
+    is_prov = cube['Level'] == 'Provinsi'
+    cube.loc[is_prov, 'Wilayah'] = cube.loc[is_prov, 'Wilayah'].str.upper().str.strip().replace(MAPPING_SINKRON)
+    # Diindeks sekali per versi data: filter level/wilayah memakai pencarian biner
+    return index_cube(cube)
+
+# Frame forecast di-cache sebagai resource (dibagi antar sesi, tidak disalin per rerun)
+# dan sudah diindeks; halaman hanya membaca potongan lewat select(), tidak pernah mengubahnya.
+@st.cache_resource(max_entries=1)
+def load_forecast(data_token):
+    """Forecast per provinsi (skrip 07, index Provinsi/Tahun) dan pita interval nasional; None jika belum ada"""
+    from utils.dtypes import read_compact, LABEL_SCHEMA
+    from utils.frame_index import build_index
+    df_forecast = build_index(read_compact(FORECAST_FILE, LABEL_SCHEMA), ['Provinsi', 'Tahun']) if os.path.exists(FORECAST_FILE) else None
+    df_band = pd.read_csv(BAND_FILE) if os.path.exists(BAND_FILE) else None
+    return df_forecast, df_band
+
+@st.cache_resource(max_entries=1)
+def load_hierarchy(data_token):
+    """Forecast hierarki koheren (skrip 08) dari columnar store, index Level/Provinsi"""
+    from utils.columnar_store import read_table
+    from utils.frame_index import build_index
+    df_hier = read_table('forecast_hierarki')
+    return None if df_hier is None else build_index(df_hier, ['Level', 'Provinsi'])
+
+@st.cache_data(max_entries=1)
+def load_backtest(data_token):
+    """Detail dan matriks MAE (horizon x provinsi) backtest skrip 10; (None, None) jika belum ada"""
+    from utils.columnar_store import read_table
+    df_matrix = read_table('backtest_mae')
+    if df_matrix is None:
+        return None, None
+    return read_table('backtest_forecast'), df_matrix.set_index('Horizon')
+
+@st.cache_data(max_entries=1)
+def load_panel_analysis(data_token):
+    """Analisis panel TPT -> P0 (FE, Granger, korelasi silang + bootstrap), dihitung sekali per versi data"""
+    from utils.panel_analysis import panel_report
+    df = load_data(data_token)
+    if df is None or not {'P0', 'TPT'}.issubset(df.columns):
+        return None
+    return panel_report(df, y='P0', x='TPT')
+
+@st.cache_data(max_entries=1)
+def load_spatial_autocorrelation(data_token):
+    """Moran's I per tahun untuk P0 dan TPT (ketetanggaan provinsi dari GeoJSON)"""
+    from utils.spatial import morans_i
+    df = load_data(data_token)
+    if df is None:
+        return None
+    return {col: morans_i(df, col) for col in ['P0', 'TPT'] if col in df.columns}
+
+@st.cache_data(max_entries=1)
+def province_options(data_token):
+    """Daftar provinsi untuk filter sidebar, dihitung sekali per versi data"""
+    df = load_data(data_token)
+    return [] if df is None else sorted(df['Provinsi'].dropna().unique())
+
+def has_population():
+    """True jika tabel penduduk sudah diingest (syarat agregat tertimbang penduduk)"""
+    return os.path.exists(POPULASI_FILE)
+
+def cube_view(cube, level, wilayah=None, sumber=None, weighted=None):
+    """
+    Potongan kubus; jika weighted, kolom indikator diganti versi tertimbang penduduk.
+    Default (None): tertimbang hanya jika tabel penduduk ada, sama seperti skrip 07
+    """
+    from utils.dashboard_cube import slice_cube, INDIKATOR
+    view = slice_cube(cube, level, wilayah, sumber)
+    if weighted is None:
+        weighted = has_population()
+    if weighted:
+        cols = [c for c in INDIKATOR if f'{c}_W' in view.columns]
+        view = view.drop(columns=cols).rename(columns={f'{c}_W': c for c in cols})
+    return view
+
+@st.cache_resource
+def load_map_spec(level):
+    """Figure choropleth dasar (geometri tersederhanakan + ID provinsi), dibangun sekali per level"""
+    from utils.geo_service import get_geometry, feature_ids, build_choropleth_spec
+    if not os.path.exists(MAP_DATA_PATH):
+        return None, None
+    try:
+        geo = get_geometry(level, MAP_DATA_PATH)
+    except (OSError, ValueError):
+        return None, None
+    ids = feature_ids(geo)
+    return build_choropleth_spec(geo, ids), ids
+
+@st.cache_resource(max_entries=1)
+def load_map_frames(level, data_token):
+    """Figure peta P0 dengan frame per tahun (hanya array warna), di-cache per versi data"""
+    from utils.geo_service import choropleth_year_frames
+    spec, ids = load_map_spec(level)
+    data = load_data(data_token)
+    if spec is None or data is None:
+        return None
+    from utils.panel_tensor import PanelTensor
+    return choropleth_year_frames(spec, ids, PanelTensor.from_long(data, ['P0']).frame('P0'))
+
+@st.cache_resource(max_entries=2)
+def load_current_model(family, data_token):
+    """Model 'current' (champion) dari model registry: (model, fitur, versi, path)"""
+    import joblib
+    from utils.model_registry import resolve_model_paths
+    model_path, features_path, version = resolve_model_paths(family)
+    if model_path is None:
+        return None, None, None, None
+    return joblib.load(model_path), joblib.load(features_path), version, model_path
+
+@st.cache_resource(max_entries=1)
+def load_explanations(model_path, data_token):
+    """Paket penjelasan model (kontribusi + partial dependence) dari cache skrip 05"""
+    from utils.explainability import load_cached_explanations
+    return load_cached_explanations(model_path)
+
+@st.cache_data(max_entries=1)
+def load_quality_profile(data_token):
+    """Profil kualitas data hasil ingestion (anomali, gap, ringkasan) dari store"""
+    from utils.data_profiler import load_profile
+    return load_profile()
+
+@st.cache_data(max_entries=1)
+def load_perf_metrics(mtime):
+    """Record metrik performa pipeline (JSONL); di-cache per mtime file metrik"""
+    from utils.instrumentation import load_metrics
+    return load_metrics()
+
+@st.cache_resource(max_entries=1)
+def get_query_engine(data_token):
+    """Koneksi DuckDB dengan view di atas seluruh output pipeline; None jika duckdb tidak tersedia"""
+    from utils.query_engine import has_duckdb, connect
+    return connect() if has_duckdb() else None
+
+@st.cache_resource
+def get_job_manager():
+    """Job manager bersama untuk seluruh sesi (satu worker pool per server)"""
+    from utils.data_processor import DataProcessor
+    from utils.job_manager import JobManager
+    return JobManager(DataProcessor)
+
+STATUS_ICON = {'queued': '⏳', 'running': '🔄', 'done': '✅', 'failed': '❌', 'cancelled': '🛑'}
+
+@st.fragment(run_every=1)
+def render_job_monitor(jobs):
+    """Panel pemantau job: status, progres, durasi per stage dan log yang mengalir (polling tiap 1 detik)"""
+    st.subheader("📡 Job Pipeline")
+    all_jobs = jobs.jobs()
+    if not all_jobs:
+        st.caption("Belum ada job yang dijalankan.")
+        return
+
+    options = {f"{STATUS_ICON[j.status]} {j.label} ({j.job_id}, {j.created_at.strftime('%H:%M:%S')})": j.job_id
+               for j in all_jobs}
+    selected = st.session_state.get('pipeline_job')
+    ids = list(options.values())
+    index = ids.index(selected) if selected in ids else 0
+    choice = st.selectbox("Pilih job", list(options.keys()), index=index, key="job_select")
+    job = jobs.get(options[choice])
+    st.session_state['pipeline_job'] = job.job_id
+
+    col_s, col_c = st.columns([4, 1])
+    with col_s:
+        stage = f" — stage: {job.current_stage}" if job.current_stage else ""
+        st.progress(job.progress, text=f"{STATUS_ICON[job.status]} {job.status}{stage}")
+    with col_c:
+        if job.is_active and st.button("🛑 Batalkan", use_container_width=True, key=f"cancel_{job.job_id}"):
+            jobs.cancel(job.job_id)
+
+    if job.error:
+        st.error(f"❌ {job.error}")
+    if job.timings:
+        st.dataframe(pd.DataFrame({'Stage': list(job.timings), 'Durasi (s)': list(job.timings.values())}),
+                     use_container_width=True, hide_index=True)
+    st.code("\n".join(job.tail(200)) or "(belum ada output)")
+
+def validate_upload(uploaded_file, schema_code):
+    """
+    Validasi file upload per chunk. Hasil disimpan di session per (file, skema)
+    sehingga rerun halaman tidak memvalidasi ulang file besar.
+    """
+    from utils.validation_engine import SCHEMAS, validate_stream
+    key = ('upload_report', uploaded_file.file_id, schema_code)
+    if key not in st.session_state:
+        with st.spinner(f"Memvalidasi {uploaded_file.name}..."):
+            st.session_state[key] = validate_stream(uploaded_file, SCHEMAS[schema_code])
+    return st.session_state[key]
+
+def render_validation_errors(report):
+    """Ringkasan error per kolom/alasan dan tabel baris/kolom yang bermasalah"""
+    st.error("❌ Validasi data gagal!")
+    if report['missing_columns']:
+        st.error(f"• Kolom yang hilang: {', '.join(report['missing_columns'])}")
+    if report['n_errors']:
+        st.error(f"• {report['n_errors']} nilai bermasalah di {report['n_rows']} baris")
+        st.dataframe(report['error_counts'], use_container_width=True, hide_index=True)
+        shown = len(report['errors'])
+        with st.expander(f"🔎 Detail baris bermasalah ({shown} dari {report['n_errors']})", expanded=True):
+            st.dataframe(report['errors'], use_container_width=True, hide_index=True)
 
 def run_script(script_name):
     try:
@@ -73,17 +289,22 @@ def run_script(script_name):
         return False
 
 # --- LOAD DATA ---
-df = load_data()
+DATA_VERSION = data_version_token()
+df = load_data(DATA_VERSION)
+cube = load_cube(DATA_VERSION)
 
 # --- SIDEBAR NAVIGASI ---
 st.sidebar.title("🚀 Menu Utama")
 menu = st.sidebar.radio("Pilih Halaman:", 
-    ["🏠 Dashboard", "📈 Prediksi Masa Depan", "🔮 Prediksi Manual", "⚙️ Control Panel"])
+    ["🏠 Dashboard", "📈 Prediksi Masa Depan", "🔮 Prediksi Manual", "🧠 Penjelasan Model", "🔬 Analisis Panel", "⚙️ Control Panel"])
 
 # ==========================================
 # HALAMAN 1: DASHBOARD
 # ==========================================
 if menu == "🏠 Dashboard":
+    # plotly hanya diimpor di halaman yang menggambar grafik (startup app lebih cepat)
+    import plotly.express as px
+    import plotly.graph_objects as go
     st.title("📊 Dashboard Analisis Kemiskinan")
     
     if df is not None:
@@ -113,8 +334,14 @@ if menu == "🏠 Dashboard":
                 **Sumber Data:** BPS Indonesia (P0 & TPT) dan Ekstraksi Metadata TikTok (Sentimen).
                 """)
 
-            # Agregasi Data (Penyesuaian nama kolom TPT)
-            df_nat = df.groupby('Tahun').agg({'P0':'mean', 'TPT':'mean', 'Sentimen_Global':'mean'}).reset_index()
+            # Agregat nasional dari kubus (tertimbang penduduk atau rata-rata antar provinsi)
+            with_population = has_population()
+            if not with_population:
+                st.warning("⚠️ Tabel penduduk belum tersedia (upload PENDUDUK di Control Panel lalu jalankan "
+                           "ingestion): agregat nasional dan pulau = rata-rata antar provinsi.")
+            weighted = st.toggle("Rata-rata tertimbang penduduk", value=with_population,
+                                 disabled=not with_population, key="nat_weighted") and with_population
+            df_nat = cube_view(cube, 'Nasional', sumber='Historis', weighted=weighted)
 
             col_g1, col_g2 = st.columns(2)
             with col_g1:
@@ -181,6 +408,12 @@ if menu == "🏠 Dashboard":
                 df_display['Sentimen_Global'] = df_display['Sentimen_Global'].round(2)
                 st.dataframe(df_display, use_container_width=True, hide_index=True)
 
+            with st.expander("🏝️ Tren P0 per Pulau", expanded=False):
+                df_pulau = cube_view(cube, 'Pulau', sumber='Historis', weighted=weighted)
+                fig_pulau = px.line(df_pulau, x='Tahun', y='P0', color='Wilayah', markers=True)
+                fig_pulau.update_layout(height=350, yaxis_title="P0 (%)", legend_title="Pulau")
+                st.plotly_chart(fig_pulau, use_container_width=True)
+
 # TAB 2: DETAIL PROVINSI
         with tab2:
             st.title("📍 Detail Indikator Ekonomi & Kemiskinan Provinsi")
@@ -200,10 +433,9 @@ if menu == "🏠 Dashboard":
 
             st.sidebar.markdown("---")
             st.sidebar.subheader("Filter Detail Provinsi")
-            sel_prov = st.sidebar.selectbox("Pilih Provinsi", sorted(df['Provinsi'].unique()))
-            sel_year = st.sidebar.slider("Pilih Tahun Peta", int(df['Tahun'].min()), int(df['Tahun'].max()), int(df['Tahun'].max()))
+            sel_prov = st.sidebar.selectbox("Pilih Provinsi", province_options(DATA_VERSION))
             
-            df_prov = df[df['Provinsi'] == sel_prov].sort_values('Tahun')
+            df_prov = cube_view(cube, 'Provinsi', wilayah=sel_prov, sumber='Historis').rename(columns={'Wilayah': 'Provinsi'})
 
             col_l, col_r = st.columns(2)
             with col_l:
@@ -220,51 +452,98 @@ if menu == "🏠 Dashboard":
                 fig_gk.update_layout(yaxis_title="Rupiah (Rp)")
                 st.plotly_chart(fig_gk, use_container_width=True)
             
-            st.subheader(f"🗺️ Peta Sebaran P0 - {sel_year}")
-            geo = load_geojson()
-            if geo:
-                df_map = df[df['Tahun'] == sel_year]
-                fig_map = px.choropleth(df_map, geojson=geo, locations='Provinsi', 
-                                        featureidkey="properties.Propinsi",
-                                        color='P0', color_continuous_scale="YlOrRd",
-                                        height=400)
-                fig_map.update_geos(
-                    fitbounds="locations", 
-                    visible=False,
-                    projection_scale=1.8,
-                )
-                fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
+            st.subheader("🗺️ Peta Sebaran P0")
+            st.caption("Geser slider tahun di bawah peta untuk berpindah tahun.")
+            fig_map = load_map_frames(MAP_DETAIL_LEVEL, DATA_VERSION)
+            if fig_map:
                 st.plotly_chart(fig_map, use_container_width=True)
 
             st.subheader(f"📋 Tabel Data Detail: {sel_prov}")
-            cols_to_show = ['Tahun', 'Provinsi', 'P0', 'P1', 'P2', 'TPT', 'Garis_Kemiskinan']
-            df_display = df_prov[cols_to_show].copy()
-            for col in ['P0', 'P1', 'P2', 'TPT']:
-                df_display[col] = df_display[col].round(2)
-            df_display['Garis_Kemiskinan'] = df_display['Garis_Kemiskinan'].apply(lambda x: f"Rp {x:,.0f}")
+            cols_to_show = ['Tahun', 'Provinsi', 'P0', 'P1', 'P2', 'TPT', 'Garis_Kemiskinan_Rp']
+            df_display = df_prov[cols_to_show].round(2).rename(columns={'Garis_Kemiskinan_Rp': 'Garis_Kemiskinan'})
             st.dataframe(df_display, use_container_width=True, hide_index=True)
 
 elif menu == "📈 Prediksi Masa Depan":
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from utils.frame_index import select, index_values
     st.title("📈 Proyeksi Kemiskinan 5 Tahun Kedepan")
     
-    forecast_file = 'cleaned_data/data_forecasting_2026_2027.csv'
-    
-    if os.path.exists(forecast_file):
-        df_forecast = pd.read_csv(forecast_file)
-        df_hist = df.groupby('Tahun')['P0'].mean().reset_index()
-        df_fore = df_forecast.groupby('Tahun')['P0'].mean().reset_index()
+    df_forecast, df_band = load_forecast(DATA_VERSION)
+
+    if df_forecast is not None:
+        df_hist = cube_view(cube, 'Nasional', sumber='Historis')[['Tahun', 'P0']]
+        df_fore = cube_view(cube, 'Nasional', sumber='Forecast')[['Tahun', 'P0']]
         df_all = pd.concat([df_hist, df_fore])
-        
+        if not has_population():
+            st.caption("ℹ️ Tabel penduduk belum tersedia: P0 nasional = rata-rata antar provinsi (tidak tertimbang penduduk).")
+
         last_hist_year = df_hist['Tahun'].max()
-        
+
         fig = px.line(df_all, x='Tahun', y='P0', title="Prediksi P0 Nasional (5 Tahun Kedepan)", markers=True)
-        fig.add_vrect(x0=last_hist_year + 0.5, x1=df_all['Tahun'].max() + 0.5, 
+
+        # Pita ketidakpastian P10-P90 dari trajektori per-pohon (skrip 07)
+        if df_band is not None:
+            fig.add_trace(go.Scatter(x=df_band['Tahun'], y=df_band['P0_P90'], mode='lines',
+                                     line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=df_band['Tahun'], y=df_band['P0_P10'], mode='lines',
+                                     line=dict(width=0), fill='tonexty', fillcolor='rgba(34,139,34,0.25)',
+                                     name="Interval P10-P90"))
+            fig.add_trace(go.Scatter(x=df_band['Tahun'], y=df_band['P0_P50'], mode='lines',
+                                     line=dict(dash='dot', color='green'), name="Median (P50)"))
+
+        fig.add_vrect(x0=last_hist_year + 0.5, x1=df_all['Tahun'].max() + 0.5,
                       fillcolor="green", opacity=0.1, annotation_text="Forecast")
         st.plotly_chart(fig, use_container_width=True)
-        
+
         df_display = df_fore.copy()
-        df_display['P0'] = df_display['P0'].round(2)
-        st.dataframe(df_display, use_container_width=True, hide_index=True)
+        if df_band is not None:
+            df_display = df_display.merge(df_band, on='Tahun', how='left')
+        st.dataframe(df_display.round(2), use_container_width=True, hide_index=True)
+
+        # Pita per provinsi
+        if 'P0_P10' in df_forecast.columns:
+            st.markdown("##### 📍 Interval Prediksi per Provinsi")
+            sel_prov_fc = st.selectbox("Pilih Provinsi", index_values(df_forecast, 'Provinsi'), key="fc_prov")
+            df_fc_prov = select(df_forecast, Provinsi=sel_prov_fc)
+
+            fig_prov = go.Figure()
+            fig_prov.add_trace(go.Scatter(x=df_fc_prov['Tahun'], y=df_fc_prov['P0_P90'], mode='lines',
+                                          line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig_prov.add_trace(go.Scatter(x=df_fc_prov['Tahun'], y=df_fc_prov['P0_P10'], mode='lines',
+                                          line=dict(width=0), fill='tonexty', fillcolor='rgba(178,34,34,0.2)',
+                                          name="Interval P10-P90"))
+            fig_prov.add_trace(go.Scatter(x=df_fc_prov['Tahun'], y=df_fc_prov['P0'], mode='lines+markers',
+                                          line=dict(color='firebrick'), name="Prediksi P0"))
+            fig_prov.update_layout(height=350, yaxis_title="P0 (%)", legend=dict(orientation="h", y=1.1))
+            st.plotly_chart(fig_prov, use_container_width=True)
+
+        # Forecast hierarki koheren (skrip 08)
+        df_hier = load_hierarchy(DATA_VERSION)
+        if df_hier is not None:
+            with st.expander("🏛️ Forecast Hierarki Koheren (Kabupaten → Provinsi → Nasional)", expanded=False):
+                level = st.radio("Level", ["Nasional", "Provinsi", "Kabupaten"], horizontal=True, key="hier_level")
+                df_lvl = select(df_hier, Level=level)
+                if level != "Nasional":
+                    prov_h = st.selectbox("Provinsi", sorted(df_lvl['Provinsi'].unique()), key="hier_prov")
+                    df_lvl = select(df_hier, Level=level, Provinsi=prov_h)
+                st.caption("P0_Base = forecast dasar per level, P0 = hasil rekonsiliasi yang koheren antar level")
+                st.dataframe(df_lvl.drop(columns=['Level']).round(2), use_container_width=True, hide_index=True)
+
+        # Backtest historis forecast rekursif (skrip 10)
+        df_bt_detail, df_bt_matrix = load_backtest(DATA_VERSION)
+        if df_bt_matrix is not None:
+            with st.expander("🧪 Backtest Historis: Seberapa Akurat Forecast 1-5 Tahun?", expanded=False):
+                origins = df_bt_detail['Origin']
+                st.caption(f"Model dilatih ulang per tahun origin ({origins.min()}-{origins.max()}) hanya dengan data "
+                           "sampai tahun tersebut, lalu forecast-nya dibandingkan dengan P0 aktual.")
+                summary = df_bt_detail.assign(AbsError=df_bt_detail['Error'].abs()).groupby('Horizon').agg(
+                    MAE=('AbsError', 'mean'), Bias=('Error', 'mean'), N=('Error', 'size')).reset_index()
+                st.dataframe(summary.round(3), use_container_width=True, hide_index=True)
+                fig_bt = px.imshow(df_bt_matrix.T, aspect='auto', color_continuous_scale='Reds',
+                                   labels=dict(x="Horizon (tahun)", y="Provinsi", color="MAE P0"))
+                fig_bt.update_layout(height=max(400, 18 * df_bt_matrix.shape[1]))
+                st.plotly_chart(fig_bt, use_container_width=True)
     else:
         st.warning("Data forecasting belum tersedia.")
 
@@ -273,51 +552,168 @@ elif menu == "📈 Prediksi Masa Depan":
 # ==========================================
 elif menu == "🔮 Prediksi Manual":
     st.title("🔮 Simulasi Prediksi Manual")
-    if os.path.exists(MODEL_PATH):
-        model = joblib.load(MODEL_PATH)
+    model, model_features, model_version, _ = load_current_model('p0', DATA_VERSION)
+    if model is not None:
+        st.caption(f"Model aktif: {model_version}")
         with st.form("manual_form"):
             c1, c2 = st.columns(2)
             with c1:
                 p0_l = st.number_input("P0 Tahun Lalu", value=9.0)
                 tpt = st.number_input("TPT (%)", value=5.0)
                 gk = st.number_input("Garis Kemiskinan", value=500000.0)
+                p0_nb = st.number_input("P0 Tahun Lalu Provinsi Tetangga (rata-rata)", value=9.0)
             with c2:
                 p1 = st.number_input("P1", value=1.5)
                 p2 = st.number_input("P2", value=0.4)
                 sent = st.number_input("Skor Sentimen (-1 s/d 1)", value=0.0)
+                tpt_nb = st.number_input("TPT Provinsi Tetangga (rata-rata, %)", value=5.0)
             
             if st.form_submit_button("Prediksi Sekarang"):
-                # Urutan sesuai skrip 05: P0_Lag1, TPT, Garis_Kemiskinan, Sentimen_Global, P1, P2
-                features = [[p0_l, tpt, gk, sent, p1, p2]]
+                # Kolom dipilih sesuai daftar fitur model (model lama tanpa fitur spasial tetap bisa dipakai)
+                inputs = {'P0_Lag1': p0_l, 'TPT': tpt, 'Garis_Kemiskinan': gk, 'Sentimen_Global': sent,
+                          'P1': p1, 'P2': p2, 'P0_Lag1_Spasial': p0_nb, 'TPT_Spasial': tpt_nb}
+                features = pd.DataFrame([inputs])[model_features]
                 res = model.predict(features)
                 st.success(f"### Hasil Prediksi P0: {res[0]:.2f}%")
     else: st.error("Model .pkl tidak ditemukan.")
 
 # ==========================================
-# HALAMAN 4: CONTROL PANEL
+# HALAMAN 4: PENJELASAN MODEL
+# ==========================================
+elif menu == "🧠 Penjelasan Model":
+    import plotly.express as px
+    import plotly.graph_objects as go
+    st.title("🧠 Mengapa Prediksi Berubah?")
+    _, _, model_version, model_path = load_current_model('p0', DATA_VERSION)
+    explain = load_explanations(model_path, DATA_VERSION) if model_path is not None else None
+
+    if explain is None:
+        st.warning("Penjelasan model belum tersedia. Jalankan 'ML Model Training' di Control Panel.")
+    else:
+        st.caption(f"Model: {model_version} (hash {explain['model_hash']}) | Nilai dasar (rata-rata model): {explain['bias']:.2f}%")
+        df_contrib = explain['contributions']
+        feat_cols = [c for c in df_contrib.columns if c not in ('Provinsi', 'Tahun')]
+
+        st.subheader("📍 Kontribusi Fitur per Provinsi")
+        c1, c2 = st.columns(2)
+        with c1:
+            prov_x = st.selectbox("Pilih Provinsi", sorted(df_contrib['Provinsi'].unique()), key="explain_prov")
+        df_px = df_contrib[df_contrib['Provinsi'] == prov_x]
+        with c2:
+            year_x = st.selectbox("Pilih Tahun", sorted(df_px['Tahun'].unique(), reverse=True), key="explain_year")
+
+        row = df_px[df_px['Tahun'] == year_x][feat_cols].iloc[0]
+        df_bar = row.rename('Kontribusi').reset_index().rename(columns={'index': 'Fitur'})
+        df_bar = df_bar.reindex(df_bar['Kontribusi'].abs().sort_values().index)
+        fig_c = px.bar(df_bar, x='Kontribusi', y='Fitur', orientation='h',
+                       color='Kontribusi', color_continuous_scale="RdYlGn_r")
+        fig_c.update_layout(height=350, coloraxis_showscale=False,
+                            title=f"Prediksi P0 = {explain['bias']:.2f} + {row.sum():.2f} = {explain['bias'] + row.sum():.2f}%")
+        st.plotly_chart(fig_c, use_container_width=True)
+
+        st.subheader("📉 Partial Dependence: TPT & Garis Kemiskinan")
+        grids = explain['pd_grids']
+        cols_pd = st.columns(2)
+        for col_pd, feat in zip(cols_pd, [f for f in ['TPT', 'Garis_Kemiskinan'] if f in grids]):
+            with col_pd:
+                fig_pd = px.line(x=grids[feat]['grid'], y=grids[feat]['pd'], labels={'x': feat, 'y': 'Rata-rata Prediksi P0 (%)'})
+                fig_pd.update_layout(height=300, title=f"Efek {feat} terhadap P0")
+                st.plotly_chart(fig_pd, use_container_width=True)
+
+        if 'surface' in grids:
+            surf = grids['surface']
+            fig_s = go.Figure(go.Heatmap(x=surf['y'], y=surf['x'], z=surf['pd'], colorscale="YlOrRd",
+                                         colorbar=dict(title="P0 (%)")))
+            fig_s.update_layout(height=400, xaxis_title=surf['features'][1], yaxis_title=surf['features'][0],
+                                title="Permukaan Partial Dependence (TPT x GK)")
+            st.plotly_chart(fig_s, use_container_width=True)
+
+# ==========================================
+# HALAMAN 5: ANALISIS PANEL TPT -> P0
+# ==========================================
+elif menu == "🔬 Analisis Panel":
+    import plotly.express as px
+    import plotly.graph_objects as go
+    st.title("🔬 Apakah Pengangguran Mendorong Kemiskinan?")
+    with st.spinner("Menghitung regresi panel & bootstrap (sekali per versi data)..."):
+        report = load_panel_analysis(DATA_VERSION)
+
+    if report is None:
+        st.warning("Dataset final belum tersedia. Jalankan pipeline di Control Panel.")
+    else:
+        meta = report['meta']
+        st.caption(f"Panel {meta['n_provinsi']} provinsi, {meta['tahun'][0]}-{meta['tahun'][1]} ({meta['n_obs']} observasi). "
+                   f"Fixed effects provinsi + tahun, SE cluster-robust per provinsi, CI 95% bootstrap klaster ({meta['n_boot']} replikasi).")
+
+        st.subheader("📐 Regresi Fixed Effects: P0 terhadap TPT ber-lag")
+        df_lag = report['lag_regression']
+        fig_l = go.Figure(go.Scatter(
+            x=df_lag['Lag'], y=df_lag['Koefisien'], mode='markers',
+            error_y=dict(type='data', symmetric=False,
+                         array=df_lag['CI_Atas'] - df_lag['Koefisien'],
+                         arrayminus=df_lag['Koefisien'] - df_lag['CI_Bawah'])))
+        fig_l.add_hline(y=0, line_dash="dash", line_color="gray")
+        fig_l.update_layout(height=350, xaxis_title="Lag TPT (tahun)", yaxis_title="Efek 1 poin TPT ke P0 (poin %)")
+        st.plotly_chart(fig_l, use_container_width=True)
+        st.dataframe(df_lag.round(4), use_container_width=True, hide_index=True)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            st.subheader("🔁 Uji Granger Panel")
+            df_gr = report['granger'].copy()
+            df_gr['Signifikan (5%)'] = df_gr['p_value'] < 0.05
+            st.dataframe(df_gr.round(4), use_container_width=True, hide_index=True)
+        with c2:
+            st.subheader("〰️ Korelasi Silang (within)")
+            fig_x = px.bar(report['xcorr'], x='Lag', y='Korelasi', color='Korelasi',
+                           color_continuous_scale="RdBu_r", range_color=[-1, 1])
+            fig_x.update_layout(height=300, coloraxis_showscale=False,
+                                xaxis_title="Lag k (k > 0: TPT mendahului P0)")
+            st.plotly_chart(fig_x, use_container_width=True)
+        st.caption("Catatan: lag P0 dalam regresi fixed effects dengan T pendek membawa bias Nickell; "
+                   "hasil Granger dibaca sebagai indikasi arah, bukan bukti kausal.")
+
+        moran = load_spatial_autocorrelation(DATA_VERSION)
+        if moran:
+            st.subheader("🗺️ Autokorelasi Spasial (Moran's I)")
+            # Garis diputus di tahun yang himpunan provinsinya berubah (graf berbeda, I tidak sebanding)
+            df_moran = pd.concat([m.assign(Indikator=col, Graf=m['Graf_Berubah'].cumsum())
+                                  for col, m in moran.items()], ignore_index=True)
+            fig_m = px.line(df_moran, x='Tahun', y='Moran_I', color='Indikator', line_group='Graf', markers=True,
+                            hover_data=['p_value', 'N'])
+            fig_m.add_hline(y=0, line_dash="dash", line_color="gray")
+            for year in sorted(df_moran.loc[df_moran['Graf_Berubah'], 'Tahun'].unique()):
+                fig_m.add_vline(x=year - 0.5, line_dash="dot", line_color="orange")
+            fig_m.update_layout(height=300, yaxis_title="Moran's I (tetangga, bobot baris)")
+            st.plotly_chart(fig_m, use_container_width=True)
+            st.caption("I > 0: provinsi bertetangga cenderung punya nilai serupa (p-value dari 999 permutasi). "
+                       "Garis oranye: himpunan provinsi berubah (mis. pemekaran), nilai sebelum dan sesudahnya "
+                       "dihitung pada graf berbeda. Rata-rata tetangga P0 tahun lalu dan TPT dipakai sebagai fitur model P0.")
+
+# ==========================================
+# HALAMAN 6: CONTROL PANEL
 # ==========================================
 else:
     st.title("⚙️ Control Panel - Data Management")
     
     # Import utils
-    from utils import (
-        validate_tpt_data, validate_p_data, validate_gk_data,
-        validate_tiktok_content, validate_tiktok_comment,
-        get_data_summary, DataProcessor, check_data_files
-    )
+    from utils import DataProcessor, check_data_files, save_upload, merge_upload, SCHEMAS
     
     # Tabs untuk berbagai fungsi
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
         "📤 Upload Data BPS", 
         "📱 Upload Data TikTok", 
         "🔄 Re-Process Data",
-        "📊 Data Status"
+        "📊 Data Status",
+        "🗂️ Model Registry",
+        "⏱️ Performance",
+        "🔎 Query SQL"
     ])
     
     # ========== TAB 1: UPLOAD DATA BPS ==========
     with tab1:
         st.header("📤 Upload Data BPS")
-        st.markdown("Upload file CSV untuk data BPS (TPT, P0, P1, P2, GK)")
+        st.markdown("Upload file CSV untuk data BPS (TPT, P0, P1, P2, GK, Jumlah Penduduk)")
         
         data_type = st.selectbox(
             "Pilih Jenis Data:",
@@ -325,7 +721,8 @@ else:
              "P0 (Persentase Penduduk Miskin)",
              "P1 (Indeks Kedalaman Kemiskinan)",
              "P2 (Indeks Keparahan Kemiskinan)",
-             "GK (Garis Kemiskinan)"]
+             "GK (Garis Kemiskinan)",
+             "PENDUDUK (Jumlah Penduduk, Ribu Jiwa)"]
         )
         
         year = st.number_input("Tahun Data:", min_value=2000, max_value=2030, value=2025, step=1)
@@ -338,36 +735,26 @@ else:
         
         if uploaded_file is not None:
             try:
-                # Read uploaded file
-                df_upload = pd.read_csv(uploaded_file, header=3)
+                # Validate data (streaming per chunk, file tidak dimuat utuh)
+                data_code = data_type.split()[0]  # TPT, P0, P1, P2, GK, atau PENDUDUK
+                report = validate_upload(uploaded_file, data_code)
                 
                 st.success(f"✅ File berhasil dibaca: {uploaded_file.name}")
                 
-                # Validate data
-                data_code = data_type.split()[0]  # TPT, P0, P1, P2, atau GK
-                
-                if data_code == "TPT":
-                    is_valid, errors = validate_tpt_data(df_upload)
-                elif data_code in ["P0", "P1", "P2"]:
-                    is_valid, errors = validate_p_data(df_upload, data_code)
-                else:  # GK
-                    is_valid, errors = validate_gk_data(df_upload)
-                
-                if is_valid:
+                if report['is_valid']:
                     st.success("✅ Validasi data berhasil!")
                     
                     # Preview data
                     with st.expander("👁️ Preview Data", expanded=True):
-                        st.dataframe(df_upload.head(10), use_container_width=True)
-                        summary = get_data_summary(df_upload)
+                        uploaded_file.seek(0)
+                        st.dataframe(pd.read_csv(uploaded_file, header=3, nrows=10), use_container_width=True)
                         col1, col2, col3 = st.columns(3)
                         with col1:
-                            st.metric("Total Baris", summary['total_rows'])
+                            st.metric("Total Baris", report['n_rows'])
                         with col2:
-                            st.metric("Total Kolom", summary['total_columns'])
+                            st.metric("Total Kolom", len(SCHEMAS[data_code]['columns']))
                         with col3:
-                            if 'province_count' in summary:
-                                st.metric("Jumlah Provinsi", summary['province_count'])
+                            st.metric("Jumlah Provinsi", len(report['provinces']))
                     
                     # Save button
                     if st.button("💾 Simpan Data", type="primary"):
@@ -383,6 +770,9 @@ else:
                                 filename = f"Indeks Kedalaman Kemiskinan (P1) Menurut Provinsi dan Daerah, {year}.csv"
                             else:
                                 filename = f"Indeks Keparahan Kemiskinan (P2) Menurut Provinsi dan Daerah, {year}.csv"
+                        elif data_code == "PENDUDUK":
+                            save_dir = "Data_Source/Jumlah Penduduk/"
+                            filename = f"Jumlah Penduduk Menurut Provinsi, {year}.csv"
                         else:  # GK
                             save_dir = "Data_Source/Persentase Penduduk Miskin/Garis Kemiskinan (Rupiah_Kapita_Bulan) Menurut Provinsi dan Daerah/"
                             filename = f"Garis Kemiskinan (Rupiah_Kapita_Bulan) Menurut Provinsi dan Daerah , {year}.csv"
@@ -391,14 +781,12 @@ else:
                         os.makedirs(save_dir, exist_ok=True)
                         save_path = os.path.join(save_dir, filename)
                         
-                        # Save file
-                        df_upload.to_csv(save_path, index=False)
+                        # Save file (byte asli template BPS, agar skrip 01 membacanya seperti biasa)
+                        save_upload(uploaded_file, save_path)
                         st.success(f"✅ Data berhasil disimpan ke: {save_path}")
                         st.info("💡 Jangan lupa jalankan 'Re-Process Data' untuk memperbarui dataset!")
                 else:
-                    st.error("❌ Validasi data gagal!")
-                    for error in errors:
-                        st.error(f"• {error}")
+                    render_validation_errors(report)
                         
             except Exception as e:
                 st.error(f"❌ Error membaca file: {str(e)}")
@@ -422,34 +810,30 @@ else:
         
         if uploaded_tiktok is not None:
             try:
-                # Determine skiprows based on type
-                skiprows = 4 if "Konten" in tiktok_type else 1
-                df_tiktok = pd.read_csv(uploaded_tiktok, skiprows=skiprows)
+                # Determine skema & skiprows based on type
+                schema_code = "TIKTOK_KONTEN" if "Konten" in tiktok_type else "TIKTOK_KOMENTAR"
+                skiprows = SCHEMAS[schema_code]['read']['skiprows']
+                report = validate_upload(uploaded_tiktok, schema_code)
                 
                 st.success(f"✅ File berhasil dibaca: {uploaded_tiktok.name}")
                 
-                # Validate
-                if "Konten" in tiktok_type:
-                    is_valid, errors = validate_tiktok_content(df_tiktok)
-                else:
-                    is_valid, errors = validate_tiktok_comment(df_tiktok)
-                
-                if is_valid:
+                if report['is_valid']:
                     st.success("✅ Validasi data berhasil!")
                     
                     # Preview
                     with st.expander("👁️ Preview Data", expanded=True):
-                        st.dataframe(df_tiktok.head(10), use_container_width=True)
-                        summary = get_data_summary(df_tiktok)
+                        uploaded_tiktok.seek(0)
+                        st.dataframe(pd.read_csv(uploaded_tiktok, skiprows=skiprows, nrows=10), use_container_width=True)
+                        years = report['years']
                         col1, col2, col3 = st.columns(3)
                         with col1:
-                            st.metric("Total Baris", summary['total_rows'])
+                            st.metric("Total Baris", report['n_rows'])
                         with col2:
-                            if 'year_range' in summary:
-                                st.metric("Rentang Tahun", summary['year_range'])
+                            if years:
+                                st.metric("Rentang Tahun", f"{years[0]} - {years[-1]}")
                         with col3:
-                            if 'years' in summary:
-                                st.write("**Tahun:**", ", ".join(map(str, summary['years'])))
+                            if years:
+                                st.write("**Tahun:**", ", ".join(map(str, years)))
                     
                     # Save button
                     if st.button("💾 Simpan Data TikTok", type="primary"):
@@ -457,48 +841,26 @@ else:
                         os.makedirs(save_dir, exist_ok=True)
                         
                         if "Konten" in tiktok_type:
-                            # Read existing file to preserve header
                             save_path = os.path.join(save_dir, "kontentiktok.csv")
-                            # Append to existing file
-                            if os.path.exists(save_path):
-                                existing_df = pd.read_csv(save_path, skiprows=4)
-                                combined_df = pd.concat([existing_df, df_tiktok], ignore_index=True)
-                                # Remove duplicates based on ID Unik
-                                combined_df = combined_df.drop_duplicates(subset=['ID Unik'], keep='last')
-                                # Save with header
-                                with open(save_path, 'w') as f:
-                                    f.write("DATA EKSTERNAL (DATA MEDIA SOSIAL) TIKTOK,,,,,,,,,,,,,\n")
-                                    f.write("DATA KONTEN UTAMA DAN BALASAN KOMENTAR,,,,,,,,,,,,,\n")
-                                    f.write(",,,,,,,,,,,,,\n")
-                                    f.write("Data Postingan Utama (Content Nodes),,,,,,,,,,,,,\n")
-                                combined_df.to_csv(save_path, mode='a', index=False)
-                            else:
-                                with open(save_path, 'w') as f:
-                                    f.write("DATA EKSTERNAL (DATA MEDIA SOSIAL) TIKTOK,,,,,,,,,,,,,\n")
-                                    f.write("DATA KONTEN UTAMA DAN BALASAN KOMENTAR,,,,,,,,,,,,,\n")
-                                    f.write(",,,,,,,,,,,,,\n")
-                                    f.write("Data Postingan Utama (Content Nodes),,,,,,,,,,,,,\n")
-                                df_tiktok.to_csv(save_path, mode='a', index=False)
+                            header_lines = [
+                                "DATA EKSTERNAL (DATA MEDIA SOSIAL) TIKTOK,,,,,,,,,,,,,\n",
+                                "DATA KONTEN UTAMA DAN BALASAN KOMENTAR,,,,,,,,,,,,,\n",
+                                ",,,,,,,,,,,,,\n",
+                                "Data Postingan Utama (Content Nodes),,,,,,,,,,,,,\n"
+                            ]
                         else:
                             save_path = os.path.join(save_dir, "komentiktok.csv")
-                            if os.path.exists(save_path):
-                                existing_df = pd.read_csv(save_path, skiprows=1)
-                                combined_df = pd.concat([existing_df, df_tiktok], ignore_index=True)
-                                combined_df = combined_df.drop_duplicates(subset=['ID Unik'], keep='last')
-                                with open(save_path, 'w') as f:
-                                    f.write("Data Komentar Balasan (Edge/Reply Nodes),,,,,,,,,,,,,\n")
-                                combined_df.to_csv(save_path, mode='a', index=False)
-                            else:
-                                with open(save_path, 'w') as f:
-                                    f.write("Data Komentar Balasan (Edge/Reply Nodes),,,,,,,,,,,,,\n")
-                                df_tiktok.to_csv(save_path, mode='a', index=False)
+                            header_lines = ["Data Komentar Balasan (Edge/Reply Nodes),,,,,,,,,,,,,\n"]
+                        
+                        # Gabung dengan file lama per chunk (ID Unik yang sama diganti versi upload),
+                        # ditulis atomik: file lama utuh jika penulisan gagal
+                        with st.spinner("Menggabungkan dengan data lama..."):
+                            n_saved = merge_upload(uploaded_tiktok, save_path, SCHEMAS[schema_code], header_lines)
                         
-                        st.success(f"✅ Data TikTok berhasil disimpan!")
+                        st.success(f"✅ Data TikTok berhasil disimpan! ({n_saved:,} baris di {save_path})")
                         st.info("💡 Jangan lupa jalankan 'Re-Process Data' untuk memperbarui sentimen!")
                 else:
-                    st.error("❌ Validasi data gagal!")
-                    for error in errors:
-                        st.error(f"• {error}")
+                    render_validation_errors(report)
                         
             except Exception as e:
                 st.error(f"❌ Error membaca file: {str(e)}")
@@ -506,92 +868,45 @@ else:
     # ========== TAB 3: RE-PROCESS DATA ==========
     with tab3:
         st.header("🔄 Re-Process Data")
-        st.markdown("Jalankan ulang proses data setelah upload data baru")
+        st.markdown("Jalankan ulang proses data setelah upload data baru. "
+                    "Proses berjalan di background; halaman tetap bisa dipakai dan "
+                    "pengguna lain melihat run yang sama.")
         
-        processor = DataProcessor()
+        jobs = get_job_manager()
         
-        # Layout tombol yang lebih rapi dan simetris (3 kolom x 2 baris)
+        # Layout tombol yang lebih rapi dan simetris (3 kolom per baris)
         st.subheader("🔧 Individual Scripts")
         
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if st.button("1️⃣ Data Ingestion & Cleaning", use_container_width=True, key="btn_ingest"):
-                with st.spinner("Memproses..."):
-                    success, output = processor.run_data_ingestion()
-                    if success:
-                        st.success("✅ Data Ingestion selesai!")
-                    else:
-                        st.error("❌ Gagal!")
-                    with st.expander("📋 Log Output"):
-                        st.code(processor.get_logs())
-        
-        with col2:
-            if st.button("2️⃣ Sentiment Processing", use_container_width=True, key="btn_sentiment"):
-                with st.spinner("Memproses..."):
-                    success, output = processor.run_sentiment_processor()
-                    if success:
-                        st.success("✅ Sentiment Processing selesai!")
-                    else:
-                        st.error("❌ Gagal!")
-                    with st.expander("📋 Log Output"):
-                        st.code(processor.get_logs())
-        
-        with col3:
-            if st.button("3️⃣ Final Integration", use_container_width=True, key="btn_integration"):
-                with st.spinner("Memproses..."):
-                    success, output = processor.run_final_integration()
-                    if success:
-                        st.success("✅ Final Integration selesai!")
-                    else:
-                        st.error("❌ Gagal!")
-                    with st.expander("📋 Log Output"):
-                        st.code(processor.get_logs())
-        
-        # Baris kedua
-        col4, col5, col6 = st.columns(3)
-        
-        with col4:
-            if st.button("4️⃣ ML Model Training", use_container_width=True, key="btn_ml"):
-                with st.spinner("Memproses..."):
-                    success, output = processor.run_ml_training()
-                    if success:
-                        st.success("✅ ML Training selesai!")
-                    else:
-                        st.error("❌ Gagal!")
-                    with st.expander("📋 Log Output"):
-                        st.code(processor.get_logs())
-        
-        with col5:
-            if st.button("5️⃣ Forecasting 5 Tahun Kedepan", use_container_width=True, key="btn_forecast"):
-                with st.spinner("Memproses..."):
-                    success, output = processor.run_forecasting()
-                    if success:
-                        st.success("✅ Forecasting selesai!")
-                    else:
-                        st.error("❌ Gagal!")
-                    with st.expander("📋 Log Output"):
-                        st.code(processor.get_logs())
-        
-        with col6:
-            # Kolom kosong untuk simetri, atau bisa ditambahkan tombol lain di masa depan
-            st.write("")
+        individual = [
+            ("1️⃣ Data Ingestion & Cleaning", 'ingestion', "btn_ingest"),
+            ("2️⃣ Sentiment Processing", 'sentiment', "btn_sentiment"),
+            ("3️⃣ Final Integration", 'integration', "btn_integration"),
+            ("4️⃣ ML Model Training", 'ml', "btn_ml"),
+            ("5️⃣ Forecasting 5 Tahun Kedepan", 'forecast', "btn_forecast"),
+            ("6️⃣ Forecast Hierarki", 'hierarchy', "btn_hierarchy"),
+            ("7️⃣ Backtest Forecast", 'backtest', "btn_backtest_stage")
+        ]
+        for row in [individual[i:i + 3] for i in range(0, len(individual), 3)]:
+            for col, (label, stage, key) in zip(st.columns(3), row):
+                with col:
+                    if st.button(label, use_container_width=True, key=key):
+                        job, is_new = jobs.submit(stage, [(stage, False)], label=DataProcessor.STAGES[stage][1])
+                        st.session_state['pipeline_job'] = job.job_id
+                        if not is_new:
+                            st.info(f"ℹ️ {job.label} sedang berjalan, menampilkan run yang sama.")
         
         st.markdown("---")
         st.subheader("🚀 Full Pipeline")
-        st.markdown("Jalankan semua proses secara berurutan (Data Ingestion → Sentiment → Integration → ML → Forecasting)")
+        st.markdown("Jalankan semua proses secara berurutan (Data Ingestion → Sentiment → Integration → ML → Forecasting → Hierarki → Kubus Dashboard)")
         
         if st.button("▶️ Jalankan Full Pipeline", type="primary", use_container_width=True, key="btn_full"):
-            with st.spinner("Menjalankan full pipeline... Ini mungkin memakan waktu beberapa menit."):
-                success, output = processor.run_full_pipeline(include_sentiment=True)
-                if success:
-                    st.success("🎉 Full Pipeline selesai!")
-                    st.balloons()
-                else:
-                    st.error("❌ Pipeline gagal!")
-                
-                with st.expander("📋 Full Log Output", expanded=True):
-                    st.code(processor.get_logs())
+            job, is_new = jobs.submit('full_pipeline', DataProcessor.FULL_PIPELINE, label="Full Pipeline")
+            st.session_state['pipeline_job'] = job.job_id
+            if not is_new:
+                st.info("ℹ️ Full Pipeline sedang berjalan, menampilkan run yang sama.")
+        
+        st.markdown("---")
+        render_job_monitor(jobs)
     
     # ========== TAB 4: DATA STATUS ==========
     with tab4:
@@ -625,7 +940,7 @@ else:
         processed_files = {
             'Data Master ML': 'cleaned_data/data_master_ml.csv',
             'Dataset Final ML': 'cleaned_data/dataset_final_untuk_ml.csv',
-            'Model PKL': 'cleaned_data/model_kemiskinan_final.pkl',
+            'Model Registry': REGISTRY_INDEX,
             'Forecast Results': 'cleaned_data/forecast_results.csv'
         }
         
@@ -634,4 +949,165 @@ else:
                 file_size = os.path.getsize(path) / 1024  # KB
                 st.success(f"✅ {name}: {file_size:.1f} KB")
             else:
-                st.warning(f"⚠️ {name}: Belum tersedia")
\ No newline at end of file
+                st.warning(f"⚠️ {name}: Belum tersedia")
+
+        st.markdown("---")
+        st.subheader("🩺 Profil Kualitas Data")
+        profile = load_quality_profile(DATA_VERSION)
+        if profile is None:
+            st.info("Profil belum tersedia. Jalankan 'Data Ingestion' untuk membuat profil kualitas data.")
+        else:
+            df_anomali, df_gap, df_ringkasan = profile
+            jenis_counts = df_anomali['Jenis'].value_counts()
+            cols = st.columns(4)
+            for col, jenis in zip(cols, ['Lonjakan YoY', 'Outlier antar wilayah', 'Salah satuan', 'Duplikat']):
+                col.metric(jenis, int(jenis_counts.get(jenis, 0)))
+
+            st.dataframe(df_ringkasan, use_container_width=True, hide_index=True)
+
+            col_lvl, col_jenis, col_ind = st.columns(3)
+            with col_lvl:
+                f_level = st.selectbox("Level", ['Semua'] + sorted(df_anomali['Level'].unique()), key="prof_level")
+            with col_jenis:
+                f_jenis = st.selectbox("Jenis Anomali", ['Semua'] + sorted(df_anomali['Jenis'].unique()), key="prof_jenis")
+            with col_ind:
+                f_ind = st.selectbox("Indikator", ['Semua'] + sorted(df_anomali['Indikator'].unique()), key="prof_ind")
+
+            mask = pd.Series(True, index=df_anomali.index)
+            for col, value in [('Level', f_level), ('Jenis', f_jenis), ('Indikator', f_ind)]:
+                if value != 'Semua':
+                    mask &= df_anomali[col] == value
+            st.dataframe(df_anomali[mask], use_container_width=True, hide_index=True)
+
+            with st.expander(f"📅 Celah Tahun ({len(df_gap)} deret)"):
+                st.dataframe(df_gap, use_container_width=True, hide_index=True)
+
+    # ========== TAB 5: MODEL REGISTRY ==========
+    with tab5:
+        st.header("🗂️ Model Registry")
+        from utils.model_registry import (
+            list_versions, promote, rollback, backtest_champion_vs_challenger
+        )
+
+        df_versions = list_versions()
+        if df_versions.empty:
+            st.info("Registry masih kosong. Jalankan 'ML Model Training' untuk mendaftarkan model.")
+        else:
+            st.dataframe(df_versions, use_container_width=True, hide_index=True)
+
+            col_r1, col_r2, col_r3 = st.columns(3)
+            with col_r1:
+                sel_version = st.selectbox("Pilih Versi", df_versions['Versi'].tolist()[::-1], key="reg_version")
+                if st.button("🏆 Promote ke Champion", use_container_width=True, key="btn_promote"):
+                    promote(sel_version)
+                    st.success(f"✅ {sel_version} sekarang menjadi champion.")
+                    st.rerun()
+            with col_r2:
+                sel_family = st.selectbox("Family", sorted(df_versions['Family'].unique()), key="reg_family")
+                if st.button("⏪ Rollback Champion", use_container_width=True, key="btn_rollback"):
+                    try:
+                        st.success(f"✅ Champion {sel_family} dikembalikan ke {rollback(sel_family)}.")
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+            with col_r3:
+                st.write("")
+                st.write("")
+                if st.button("⚖️ Backtest vs Champion", use_container_width=True, key="btn_backtest"):
+                    with st.spinner("Backtest champion & challenger per tahun historis (dilatih ulang per origin)..."):
+                        df_bt = backtest_champion_vs_challenger(sel_version, DATA_PATH)
+                    if df_bt is None:
+                        st.info("Tidak ada pembanding: versi ini sudah champion, atau fitur salah satu versi "
+                                "tidak ada di dataset saat ini.")
+                    else:
+                        st.caption(f"Champion: {df_bt.attrs['champion']} vs Challenger: {df_bt.attrs['challenger']} "
+                                   "(rolling-origin: dilatih dengan data sampai tahun sebelumnya, MAE P0 per tahun)")
+                        st.dataframe(df_bt.round(4), use_container_width=True, hide_index=True)
+
+    # ========== TAB 6: PERFORMANCE ==========
+    with tab6:
+        st.header("⏱️ Performance Pipeline")
+        st.markdown("Waktu, CPU, memori dan jumlah baris per stage/fungsi, "
+                    "dicatat setiap skrip dijalankan (`cleaned_data/metrics/metrics.jsonl`).")
+        from utils.instrumentation import METRICS_PATH
+
+        df_metrics = load_perf_metrics(os.path.getmtime(METRICS_PATH) if os.path.exists(METRICS_PATH) else None)
+        if df_metrics.empty:
+            st.info("Belum ada metrik. Jalankan pipeline dari tab 'Re-Process Data'.")
+        else:
+            df_stage = df_metrics[df_metrics['kind'] == 'stage']
+            metric_label = {'wall_s': 'Wall time (s)', 'cpu_s': 'CPU time (s)', 'peak_rss_mb': 'Peak RSS (MB)'}
+            perf_metric = st.radio("Metrik", list(metric_label), format_func=metric_label.get,
+                                   horizontal=True, key="perf_metric")
+
+            if perf_metric != 'wall_s' and 'scope' in df_stage.columns:
+                # Stage paralel (pipeline --workers > 1) berbagi proses: CPU/RSS-nya bukan angka per stage
+                n_shared = int((df_stage['scope'] == 'process').sum())
+                df_stage = df_stage[df_stage['scope'] != 'process']
+                if n_shared:
+                    st.caption(f"ℹ️ {n_shared} record stage dari run paralel (scope 'process') tidak ditampilkan: "
+                               "CPU dan RSS-nya gabungan seluruh stage yang berjalan bersamaan.")
+
+            if not df_stage.empty:
+                import plotly.express as px
+                st.subheader("📈 Tren per Stage")
+                fig_perf = px.line(df_stage.sort_values('ts'), x='ts', y=perf_metric, color='name', markers=True,
+                                   labels={'ts': 'Waktu Run', perf_metric: metric_label[perf_metric], 'name': 'Stage'})
+                st.plotly_chart(fig_perf, use_container_width=True)
+
+            st.subheader("🔍 Detail per Run")
+            runs = df_metrics.groupby('run_id')['ts'].min().sort_values(ascending=False)
+            sel_run = st.selectbox("Run", runs.index.tolist(),
+                                   format_func=lambda r: f"{runs[r]:%Y-%m-%d %H:%M:%S} ({r})", key="perf_run")
+            df_run = df_metrics[df_metrics['run_id'] == sel_run]
+            cols = ['script', 'name', 'kind', 'status', 'scope', 'wall_s', 'cpu_s', 'rss_mb', 'rss_delta_mb',
+                    'peak_rss_mb', 'rows_in', 'rows_out', 'error']
+            st.dataframe(df_run[[c for c in cols if c in df_run.columns]], use_container_width=True, hide_index=True)
+
+            df_func = df_metrics[df_metrics['kind'] == 'function']
+            if not df_func.empty:
+                st.subheader("🧮 Ringkasan per Fungsi (semua run)")
+                summary = df_func.groupby('name').agg(
+                    Panggilan=('wall_s', 'size'), Median_Wall_s=('wall_s', 'median'),
+                    Terakhir_Wall_s=('wall_s', 'last'), Maks_Peak_RSS_MB=('peak_rss_mb', 'max'),
+                    Baris_Keluar_Terakhir=('rows_out', 'last')
+                ).sort_values('Median_Wall_s', ascending=False)
+                st.dataframe(summary, use_container_width=True)
+
+    # ========== TAB 7: QUERY SQL ==========
+    with tab7:
+        st.header("🔎 Query SQL Data Hasil Pipeline")
+        st.markdown("Query ad-hoc (DuckDB, in-process) langsung ke file di `cleaned_data/`: "
+                    "setiap CSV dan tabel store tersedia sebagai view, plus `indikator_panjang` "
+                    "(Level, Indikator, Wilayah, Tahun, Nilai) untuk seluruh indikator BPS.")
+        con = get_query_engine(DATA_VERSION)
+        if con is None:
+            st.info("duckdb belum terinstall. Jalankan `pip install duckdb` untuk mengaktifkan query SQL.")
+        else:
+            from utils.query_engine import list_views, run_query
+
+            with st.expander("📚 Daftar View & Kolom"):
+                st.dataframe(list_views(con), use_container_width=True, hide_index=True)
+
+            sql = st.text_area("SQL", height=150, key="sql_query", value=(
+                "SELECT d.Provinsi, d.Tahun, d.P0, d.TPT, t.TPT_Tahunan\n"
+                "FROM dataset_final_untuk_ml d\n"
+                "JOIN tpt_master_final t USING (Provinsi, Tahun)\n"
+                "ORDER BY d.Tahun DESC, d.P0 DESC"))
+            max_rows = st.number_input("Maks. baris ditampilkan", 10, 100000, 1000, step=100, key="sql_max_rows")
+            if st.button("▶️ Jalankan Query", type="primary", key="sql_run"):
+                try:
+                    st.session_state['sql_result'] = run_query(con, sql, max_rows=int(max_rows))
+                    st.session_state['sql_error'] = None
+                except Exception as e:
+                    st.session_state['sql_result'] = None
+                    st.session_state['sql_error'] = str(e)
+
+            if st.session_state.get('sql_error'):
+                st.error(f"❌ {st.session_state['sql_error']}")
+            df_sql = st.session_state.get('sql_result')
+            if df_sql is not None:
+                st.caption(f"{len(df_sql)} baris" + (" (dibatasi)" if len(df_sql) >= max_rows else ""))
+                st.dataframe(df_sql, use_container_width=True, hide_index=True)
+                st.download_button("💾 Download CSV", df_sql.to_csv(index=False), "hasil_query.csv",
+                                   "text/csv", key="sql_download")
@@ -0,0 +1,233 @@
+"""
+Benchmark Pipeline
+Mengukur waktu tiap stage pipeline (01, 03, 04, 05, 07) dan app.load_data
+pada data sintetis berformat BPS/TikTok di skala 10x-1000x, sepenuhnya offline.
+Setiap skala dijalankan di workspace sementara (Data_Source/ sintetis +
+symlink skrip dan utils/), jadi cleaned_data/ asli tidak tersentuh.
+
+Hasil ditambahkan ke benchmarks/results/history.jsonl bersama commit git,
+sehingga regresi bisa dibandingkan antar commit:
+
+    python benchmarks/run_benchmarks.py --scales 10 100
+    python benchmarks/run_benchmarks.py --compare HEAD~1
+"""
+
+import os
+import sys
+import ast
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from synthetic_data import generate_dataset  # noqa: E402
+from utils.instrumentation import RUN_ID_ENV, METRICS_PATH  # noqa: E402
+
+RESULTS_PATH = os.path.join(BENCH_DIR, 'results', 'history.jsonl')
+
+# Kunci stage -> skrip, dijalankan berurutan karena saling bergantung (04 butuh 01 & 03, dst.)
+STAGES = {
+    '01': '01_data_ingestion_cleaning.py',
+    '03': '03_sentiment_processor.py',
+    '04': '04_final_integration.py',
+    '05': '05_machine_learning_model.py',
+    '07': '07_forecasting.py'
+}
+DEFAULT_SCALES = [10, 100]
+REGRESSION_RATIO = 1.2   # lebih lambat >20% dianggap regresi
+
+def git_revision():
+    """(commit pendek, dirty) dari repo; ('unknown', False) jika bukan repo git"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+def resolve_commit(ref):
+    """Commit pendek untuk ref git (mis. HEAD~1)"""
+    return subprocess.run(['git', 'rev-parse', '--short', ref], cwd=REPO_DIR,
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+def prepare_workspace(scale, seed):
+    """Workspace sementara: data sintetis + symlink skrip pipeline, utils/ dan peta GeoJSON"""
+    workspace = tempfile.mkdtemp(prefix=f'bench_x{scale}_')
+    stats = generate_dataset(workspace, scale=scale, seed=seed)
+    for name in list(STAGES.values()) + ['utils', 'Data_Source/indonesia_simple.geojson']:
+        os.symlink(os.path.join(REPO_DIR, name), os.path.join(workspace, name))
+    return workspace, stats
+
+def _stage_metrics(workspace, run_id, script):
+    """Record stage dari instrumentasi skrip (cpu_s, peak_rss_mb) untuk run ini"""
+    path = os.path.join(workspace, METRICS_PATH)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get('run_id') == run_id and rec.get('kind') == 'stage' and rec.get('script') == script:
+                return {'cpu_s': rec.get('cpu_s'), 'peak_rss_mb': rec.get('peak_rss_mb')}
+    return {}
+
+def run_stage(workspace, script, run_id, timeout):
+    """Menjalankan satu skrip di workspace; return dict hasil pengukuran"""
+    env = {**os.environ, RUN_ID_ENV: run_id, 'MPLBACKEND': 'Agg', 'PYTHONPATH': REPO_DIR}
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run([sys.executable, script], cwd=workspace, env=env,
+                              capture_output=True, text=True, timeout=timeout)
+        status = 'ok' if proc.returncode == 0 else 'failed'
+        error = proc.stderr.strip().splitlines()[-1] if status == 'failed' and proc.stderr.strip() else None
+    except subprocess.TimeoutExpired:
+        status, error = 'timeout', f'> {timeout}s'
+    wall = time.perf_counter() - start
+    return {'wall_s': round(wall, 3), 'status': status, 'error': error,
+            **_stage_metrics(workspace, run_id, script)}
+
+def _extract_app_function(name, constants):
+    """
+    Mengambil fungsi `name` dan konstanta modul dari app.py tanpa menjalankan
+    halaman Streamlit (dekorator cache dibuang), agar yang diukur adalah kode
+    loader itu sendiri.
+    """
+    with open(os.path.join(REPO_DIR, 'app.py')) as f:
+        tree = ast.parse(f.read())
+    nodes = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == name:
+            node.decorator_list = []
+            nodes.append(node)
+        elif isinstance(node, ast.Assign) and any(getattr(t, 'id', None) in constants for t in node.targets):
+            nodes.append(node)
+    namespace = {'pd': pd, 'os': os}
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), 'app.py', 'exec'), namespace)
+    return namespace[name]
+
+def run_load_data(workspace, repeat=3):
+    """Waktu app.load_data (tanpa cache) di workspace; median dari beberapa ulangan"""
+    load_data = _extract_app_function('load_data', {'DATA_PATH', 'MAPPING_SINKRON'})
+    cwd = os.getcwd()
+    os.chdir(workspace)
+    try:
+        timings, df = [], None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = load_data(None)
+            timings.append(time.perf_counter() - start)
+    finally:
+        os.chdir(cwd)
+    status = 'ok' if df is not None else 'failed'
+    return {'wall_s': round(sorted(timings)[len(timings) // 2], 4), 'status': status,
+            'error': None if df is not None else 'dataset_final_untuk_ml.csv tidak ada',
+            'rows_out': None if df is None else len(df)}
+
+def append_results(records, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        for rec in records:
+            f.write(json.dumps(rec) + '\n')
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True, dtype={'commit': str})
+
+def run_benchmarks(scales, stages, seed=42, timeout=1800, keep=False, load_repeat=3):
+    """Menjalankan benchmark untuk setiap skala; return list record hasil"""
+    commit, dirty = git_revision()
+    session = datetime.now().strftime('%Y%m%d-%H%M%S')
+    env_info = {'python': platform.python_version(), 'pandas': pd.__version__,
+                'machine': platform.machine(), 'cpus': os.cpu_count()}
+    records = []
+    for scale in scales:
+        print(f"\n🧪 Skala {scale}x: membuat data sintetis...")
+        start = time.perf_counter()
+        workspace, stats = prepare_workspace(scale, seed)
+        n_files = sum(s['files'] for s in stats.values())
+        n_rows = sum(s['rows'] for s in stats.values())
+        print(f"   {n_files} file, {n_rows:,} baris ({time.perf_counter() - start:.1f}s) di {workspace}")
+        run_id = f'bench-{session}-x{scale}'
+        try:
+            for stage_key in stages:
+                if stage_key == 'load_data':
+                    result = run_load_data(workspace, load_repeat)
+                else:
+                    result = run_stage(workspace, STAGES[stage_key], run_id, timeout)
+                icon = '✅' if result['status'] == 'ok' else '❌'
+                print(f"   {icon} {stage_key:<9} {result['wall_s']:>9.3f}s"
+                      + (f"  peak {result['peak_rss_mb']:.0f} MB" if result.get('peak_rss_mb') else '')
+                      + (f"  ({result['error']})" if result.get('error') else ''))
+                records.append({'session': session, 'commit': commit, 'dirty': dirty, 'scale': scale,
+                                'stage': stage_key, 'input_files': n_files, 'input_rows': n_rows,
+                                'seed': seed, **env_info, **result})
+        finally:
+            if keep:
+                print(f"   Workspace disimpan: {workspace}")
+            else:
+                shutil.rmtree(workspace, ignore_errors=True)
+    return records
+
+def compare(baseline_ref, current_ref='HEAD', threshold=REGRESSION_RATIO, path=RESULTS_PATH):
+    """
+    Membandingkan median wall time per (skala, stage) dua commit dari riwayat.
+    Return: (DataFrame perbandingan, ada_regresi)
+    """
+    df = load_results(path)
+    if df.empty:
+        raise SystemExit("Belum ada hasil benchmark. Jalankan benchmark dulu.")
+    base, cur = resolve_commit(baseline_ref), resolve_commit(current_ref)
+    df = df[df['status'] == 'ok']
+    med = df.groupby(['commit', 'scale', 'stage'])['wall_s'].median()
+    if base not in med.index.get_level_values(0) or cur not in med.index.get_level_values(0):
+        raise SystemExit(f"Riwayat tidak punya hasil untuk {base} dan/atau {cur}.")
+    table = pd.concat({base: med.loc[base], cur: med.loc[cur]}, axis=1).dropna()
+    table['rasio'] = (table[cur] / table[base]).round(3)
+    table['regresi'] = table['rasio'] > threshold
+    return table, bool(table['regresi'].any())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark pipeline pada data sintetis (offline)')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='Faktor skala (1 = ukuran data asli, 38 provinsi)')
+    parser.add_argument('--stages', nargs='+', default=list(STAGES) + ['load_data'],
+                        choices=list(STAGES) + ['load_data'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=int, default=1800, help='Batas detik per stage')
+    parser.add_argument('--keep', action='store_true', help='Jangan hapus workspace sementara')
+    parser.add_argument('--no-record', action='store_true', help='Jangan simpan ke riwayat hasil')
+    parser.add_argument('--compare', metavar='REF',
+                        help='Bandingkan HEAD dengan commit REF dari riwayat (tanpa menjalankan benchmark)')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_RATIO)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        table, regressed = compare(args.compare, threshold=args.threshold)
+        print(table.to_string())
+        print("\n❌ Ada regresi performa" if regressed else "\n✅ Tidak ada regresi")
+        return 1 if regressed else 0
+
+    records = run_benchmarks(args.scales, args.stages, args.seed, args.timeout, args.keep)
+    if not args.no_record:
+        append_results(records)
+        print(f"\n📝 {len(records)} hasil ditambahkan ke {os.path.relpath(RESULTS_PATH, REPO_DIR)}")
+    return 0 if all(r['status'] == 'ok' for r in records) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
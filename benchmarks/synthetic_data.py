@@ -0,0 +1,208 @@
+"""
+Synthetic Data Generator
+Membuat pohon Data_Source/ sintetis dengan format persis seperti file BPS
+(layout header=3, kolom Maret/September/Tahunan, placeholder '-') dan ekspor
+TikTok, pada skala yang bisa diatur. Skala 1 ~ ukuran data asli (38 provinsi);
+skala N = 38*N provinsi sintetis. Deterministik untuk seed yang sama.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+BASE_PROVINCES = 38
+KAB_PER_PROVINCE = 14
+
+# Direktori & pola nama file sama dengan CONFIG di skrip 01
+TPT_DIR = 'Data_Source/Tingkat Pengangguran Terbuka/'
+P_DIRS = {
+    'P0': ('Data_Source/Persentase Penduduk Miskin/(P0) Menurut Provinsi/',
+           'Persentase Penduduk Miskin (P0) Menurut Provinsi dan Daerah, {year}.csv'),
+    'P1': ('Data_Source/Persentase Penduduk Miskin/(P1) Menurut Provinsi/',
+           'Indeks Kedalaman Kemiskinan (P1) Menurut Provinsi dan Daerah, {year}.csv'),
+    'P2': ('Data_Source/Persentase Penduduk Miskin/(P2) Menurut Provinsi/',
+           'Indeks Keparahan Kemiskinan (P2) Menurut Provinsi dan Daerah, {year}.csv')
+}
+GK_DIR = 'Data_Source/Persentase Penduduk Miskin/Garis Kemiskinan (Rupiah_Kapita_Bulan) Menurut Provinsi dan Daerah/'
+KAB_DIR = 'Data_Source/Persentase Penduduk Miskin/(P0) Menurut Kabupaten_Kota/'
+NASIONAL_DIR = 'Data_Source/Persentase Penduduk Miskin/(P0) Menurut Daerah/'
+POP_DIR = 'Data_Source/Jumlah Penduduk/'
+TIKTOK_DIR = 'Data_Source/sosialresponse/'
+
+YEARS = {
+    'TPT': range(2007, 2026),
+    'P': range(2007, 2026),
+    'GK': range(2013, 2026),
+    'KAB': range(2004, 2026),
+    'NASIONAL': range(1996, 2026),
+    'POP': range(2010, 2026)
+}
+
+SEMESTER_HEADER = 'Semester 1 (Maret),Semester 2 (September),Tahunan'
+
+TIKTOK_COLUMNS = ['ID Unik', 'Jenis Konten', 'Tautan Konten', 'Username', 'Teks Konten', 'Sentimen',
+                  'Jumlah Views', 'Jumlah Likes', 'Jumlah Komentar', 'Jumlah Shares', 'Tahun',
+                  'Balasan ID Komentar', 'Platform', 'Lokasi']
+TIKTOK_TEXTS = [
+    'Lowongan kerja terbaru, minat? Daftar di sini',
+    'Setelah satu bulan di PHK, begini ceritanya',
+    'Upgrade surat lamaran kerja biar dilirik HRD',
+    'Harga sembako naik terus, makin susah',
+    'Semangat, pasti ada solusi dan berhasil',
+    'Masih nganggur, cari kerja sulit banget',
+    'Terima kasih infonya, sangat bantu',
+    'Video biasa tanpa kata kunci'
+]
+
+def province_names(scale):
+    """Nama provinsi sintetis (HURUF BESAR, seperti file BPS)"""
+    return [f'PROVINSI SINTETIS {i:05d}' for i in range(BASE_PROVINCES * scale)]
+
+def _fmt(values, placeholder_mask, decimals=2):
+    """Angka -> string, '-' di posisi placeholder (vektor)"""
+    rounded = np.round(values, decimals)
+    text = (rounded.astype(np.int64) if decimals == 0 else rounded).astype(str)
+    return np.where(placeholder_mask, '-', text)
+
+def _write(path, preamble, body):
+    """Menulis baris pembuka template BPS lalu isi tabel tanpa header"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(preamble) + '\n')
+        body.to_csv(f, header=False, index=False)
+
+def _semesters(rng, base, n, p_missing, decimals=2):
+    """Tiga kolom (Maret, September, Tahunan) untuk satu kelompok daerah"""
+    mar = base * rng.normal(1.0, 0.03, n)
+    sep = base * rng.normal(0.98, 0.03, n)
+    mar_ph = rng.random(n) < p_missing
+    sep_ph = rng.random(n) < p_missing * 3
+    tahunan_ph = rng.random(n) < 0.8  # BPS jarang mengisi kolom Tahunan
+    return [_fmt(mar, mar_ph, decimals), _fmt(sep, sep_ph, decimals), _fmt((mar + sep) / 2, tahunan_ph, decimals)]
+
+def generate_dataset(root, scale=1, seed=42, p_missing=0.05):
+    """
+    Menulis Data_Source/ sintetis di bawah `root`.
+    Return: dict jumlah file dan baris data per jenis.
+    """
+    rng = np.random.default_rng(seed)
+    provinces = province_names(scale)
+    n = len(provinces)
+    # Level dasar per provinsi + tren tahunan, agar data punya struktur panel yang wajar
+    level = {
+        'TPT': rng.uniform(2, 10, n), 'P0': rng.uniform(4, 28, n),
+        'GK': rng.uniform(350_000, 900_000, n)
+    }
+    level['P1'] = level['P0'] * rng.uniform(0.12, 0.22, n)
+    level['P2'] = level['P1'] * rng.uniform(0.2, 0.35, n)
+    trend = rng.normal(-0.02, 0.01, n)
+    stats = {}
+
+    def factor(year, start):
+        return np.exp(trend * (year - start)) * rng.normal(1.0, 0.02, n)
+
+    # TPT: Provinsi, Februari, Agustus, Tahunan
+    for year in YEARS['TPT']:
+        cols = _semesters(rng, level['TPT'] * factor(year, 2007), n, p_missing)
+        body = pd.DataFrame({'Provinsi': provinces + ['INDONESIA'],
+                             **{i: np.append(c, '-') for i, c in enumerate(cols)}})
+        _write(os.path.join(root, TPT_DIR, f'Tingkat Pengangguran Terbuka Menurut Provinsi, {year}.csv'),
+               [f'{n} Provinsi,,,', ',Tingkat Pengangguran Terbuka Menurut Provinsi (Persen),,',
+                f',{year},,', ',Februari,Agustus,Tahunan'], body)
+    stats['TPT'] = (len(YEARS['TPT']), len(YEARS['TPT']) * n)
+
+    # P0/P1/P2: Provinsi, [Perkotaan x3], [Perdesaan x3], [Perkotaan+Perdesaan x3]
+    for code, (directory, pattern) in P_DIRS.items():
+        for year in YEARS['P']:
+            base = level[code] * factor(year, 2007)
+            cols = (_semesters(rng, base * 0.7, n, p_missing) + _semesters(rng, base * 1.3, n, p_missing) +
+                    _semesters(rng, base, n, p_missing))
+            body = pd.DataFrame({'Provinsi': [''] + provinces,
+                                 **{i: np.insert(c.astype(object), 0, h) for i, (c, h) in
+                                    enumerate(zip(cols, SEMESTER_HEADER.split(',') * 3))}})
+            _write(os.path.join(root, directory, pattern.format(year=year)),
+                   [f'{n} Provinsi,,,,,,,,,', f',{code} Menurut Provinsi dan Daerah (Persen),,,,,,,,',
+                    ',Perkotaan,,,Perdesaan,,,Perkotaan+Perdesaan,,', f',{year},,,{year},,,{year},,'], body)
+        stats[code] = (len(YEARS['P']), len(YEARS['P']) * n)
+
+    # GK: Provinsi, [Perkotaan x3], [Perdesaan x3]
+    for year in YEARS['GK']:
+        base = level['GK'] * np.exp(0.05 * (year - 2013))
+        cols = _semesters(rng, base * 1.05, n, p_missing, 0) + _semesters(rng, base * 0.95, n, p_missing, 0)
+        body = pd.DataFrame({'Provinsi': [''] + provinces,
+                             **{i: np.insert(c.astype(object), 0, h) for i, (c, h) in
+                                enumerate(zip(cols, SEMESTER_HEADER.split(',') * 2))}})
+        _write(os.path.join(root, GK_DIR,
+                            f'Garis Kemiskinan (Rupiah_Kapita_Bulan) Menurut Provinsi dan Daerah , {year}.csv'),
+               [f'{n} Provinsi,,,,,,', ',Garis Kemiskinan (Rupiah/Kapita/Bulan) Menurut Provinsi dan Daerah,,,,,',
+                ',Perkotaan,,,Perdesaan,,', f',{year},,,{year},,'], body)
+    stats['GK'] = (len(YEARS['GK']), len(YEARS['GK']) * n)
+
+    # P0 Kabupaten/Kota: baris HURUF BESAR = provinsi, diikuti kabupaten/kota (huruf campuran)
+    kab_names = np.array([f'Kabupaten Sintetis {i:05d}-{k:02d}' for i in range(n) for k in range(KAB_PER_PROVINCE)])
+    kab_level = np.repeat(level['P0'], KAB_PER_PROVINCE) * rng.uniform(0.6, 1.6, n * KAB_PER_PROVINCE)
+    for year in YEARS['KAB']:
+        prov_vals = level['P0'] * factor(year, 2004)
+        kab_vals = kab_level * np.exp(np.repeat(trend, KAB_PER_PROVINCE) * (year - 2004))
+        names = np.insert(kab_names.astype(object), np.arange(n) * KAB_PER_PROVINCE, provinces)
+        values = np.insert(kab_vals, np.arange(n) * KAB_PER_PROVINCE, prov_vals)
+        body = pd.DataFrame({'Wilayah': names, 'P0': np.round(values, 2)})
+        _write(os.path.join(root, KAB_DIR, f'Persentase Penduduk Miskin (P0) Menurut Kabupaten_Kota, {year}.csv'),
+               ['Nama Wilayah,', ',Persentase Penduduk Miskin (P0) Menurut Kabupaten/Kota (Persen)', f',{year}'], body)
+    stats['KAB'] = (len(YEARS['KAB']), len(YEARS['KAB']) * n * KAB_PER_PROVINCE)
+
+    # P0 Nasional: baris Kota, Desa, Kota+Desa
+    for year in YEARS['NASIONAL']:
+        base = 18 * np.exp(-0.03 * (year - 1996))
+        rows = [[w] + list(c) for w, c in
+                zip(['Kota', 'Desa', 'Kota+Desa'],
+                    zip(*_semesters(rng, np.array([base * 0.7, base * 1.3, base]), 3, p_missing)))]
+        _write(os.path.join(root, NASIONAL_DIR, f'Persentase Penduduk Miskin (P0) Menurut Daerah, {year}.csv'),
+               ['Wilayah,,,', ',Persentase Penduduk Miskin (P0) Menurut Daerah,,', f',{year},,',
+                ',' + SEMESTER_HEADER], pd.DataFrame(rows))
+    stats['NASIONAL'] = (len(YEARS['NASIONAL']), len(YEARS['NASIONAL']) * 3)
+
+    # Jumlah Penduduk (ribu jiwa): Provinsi, nilai; baris INDONESIA = total.
+    # Generator terpisah agar data indikator lain tetap sama untuk seed yang sama.
+    pop_level = np.random.default_rng([seed, 1]).lognormal(np.log(4_000), 0.9, n)
+    for year in YEARS['POP']:
+        values = pop_level * np.exp(0.011 * (year - 2010))
+        body = pd.DataFrame({'Provinsi': provinces + ['INDONESIA'],
+                             'Penduduk': np.round(np.append(values, values.sum()), 1)})
+        _write(os.path.join(root, POP_DIR, f'Jumlah Penduduk Menurut Provinsi, {year}.csv'),
+               [f'{n} Provinsi,', ',Jumlah Penduduk Menurut Provinsi (Ribu Jiwa)', f',{year}', ',Jumlah Penduduk'], body)
+    stats['POP'] = (len(YEARS['POP']), len(YEARS['POP']) * n)
+
+    # TikTok: konten (4 baris pembuka) dan komentar balasan (1 baris pembuka)
+    n_konten, n_komen = 60 * scale, 600 * scale
+    konten = _tiktok_frame(rng, n_konten, 'Postingan Utama', start_id=1)
+    komen = _tiktok_frame(rng, n_komen, 'Komentar Balasan', start_id=n_konten + 1)
+    komen['Balasan ID Komentar'] = rng.choice(konten['ID Unik'].to_numpy(), n_komen)
+    pad = ',' * (len(TIKTOK_COLUMNS) - 1)
+    _write(os.path.join(root, TIKTOK_DIR, 'kontentiktok.csv'),
+           [f'DATA EKSTERNAL (DATA MEDIA SOSIAL) TIKTOK{pad}', f'DATA KONTEN UTAMA DAN BALASAN KOMENTAR{pad}',
+            pad, f'Data Postingan Utama (Content Nodes){pad}', ','.join(TIKTOK_COLUMNS)], konten)
+    _write(os.path.join(root, TIKTOK_DIR, 'komentiktok.csv'),
+           [f'Data Komentar Balasan (Edge/Reply Nodes){pad}', ','.join(TIKTOK_COLUMNS)], komen)
+    stats['TIKTOK'] = (2, n_konten + n_komen)
+
+    return {name: {'files': files, 'rows': rows} for name, (files, rows) in stats.items()}
+
+def _tiktok_frame(rng, n, jenis, start_id):
+    """Baris ekspor TikTok sintetis dengan kolom lengkap"""
+    return pd.DataFrame({
+        'ID Unik': [f'T{i:07d}' for i in range(start_id, start_id + n)],
+        'Jenis Konten': jenis,
+        'Tautan Konten': 'https://vt.tiktok.com/sintetis/',
+        'Username': 'user_sintetis',
+        'Teks Konten': rng.choice(TIKTOK_TEXTS, n),
+        'Sentimen': '',
+        'Jumlah Views': rng.integers(1_000, 5_000_000, n),
+        'Jumlah Likes': rng.integers(0, 500_000, n),
+        'Jumlah Komentar': rng.integers(0, 5_000, n),
+        'Jumlah Shares': rng.integers(0, 20_000, n),
+        'Tahun': rng.integers(2019, 2026, n),
+        'Balasan ID Komentar': '',
+        'Platform': 'TikTok',
+        'Lokasi': 'Indonesia'
+    })[TIKTOK_COLUMNS]
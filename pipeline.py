@@ -0,0 +1,81 @@
+"""
+Pipeline CLI
+Satu entry point untuk menjalankan stage pipeline di dalam proses (tanpa
+subprocess per skrip), misalnya di container atau node batch:
+
+    python pipeline.py run                                   # inkremental, semua stage
+    python pipeline.py run --stages ingestion,sentiment --workers 2
+    python pipeline.py run --stages 05,07 --force --data-root /data/bigdata
+    python pipeline.py run --dry-run
+    python pipeline.py stages
+
+Mode default inkremental: stage dilewati jika seluruh output-nya lebih baru
+dari input dan skripnya. --force menjalankan ulang semua stage terpilih.
+"""
+
+import sys
+import argparse
+
+from utils.pipeline_runner import (
+    PipelineConfig, STAGE_SPECS, DATA_ROOT_ENV, resolve_stages, plan_stages, run_pipeline
+)
+
+STATUS_ICON = {'ok': '✅', 'skipped': '⏭️', 'failed': '❌', 'blocked': '🛑', 'planned': '📋'}
+
+def print_result(result):
+    wall = f"{result['wall_s']:>8.2f}s" if result.get('wall_s') is not None else ' ' * 9
+    reason = f"  ({result['reason']})" if result.get('reason') else ''
+    print(f"{STATUS_ICON[result['status']]} {result['stage']:<12} {result['status']:<8} {wall}{reason}", flush=True)
+
+def cmd_stages(args):
+    config = PipelineConfig(args.data_root)
+    print(f"Root data: {config.data_root}\n")
+    for p in plan_stages(config, list(STAGE_SPECS)):
+        spec = STAGE_SPECS[p['stage']]
+        icon = '🔄' if p['run'] else '✅'
+        print(f"{icon} {p['stage']:<12} {spec['script']:<32} {p['reason']}")
+    return 0
+
+def cmd_run(args):
+    config = PipelineConfig(args.data_root)
+    try:
+        stages = resolve_stages(args.stages.split(','))
+    except ValueError as e:
+        print(f"🛑 {e}")
+        return 2
+
+    mode = 'dry run' if args.dry_run else ('force' if args.force else 'inkremental')
+    print(f"🚀 Pipeline ({mode}, {args.workers} worker) di {config.data_root}: {', '.join(stages)}")
+    results = run_pipeline(config, stages, workers=args.workers, force=args.force, dry_run=args.dry_run,
+                           on_event=print_result)
+    if args.dry_run:
+        for result in results:
+            print_result(result)
+        return 0
+
+    failed = [r['stage'] for r in results if r['status'] in ('failed', 'blocked')]
+    print("\n🎉 Pipeline selesai!" if not failed else f"\n❌ Gagal: {', '.join(failed)}")
+    return 1 if failed else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Menjalankan pipeline data kemiskinan')
+    parser.add_argument('--data-root', default=None,
+                        help=f'Folder berisi Data_Source/ dan cleaned_data/ (default: ${DATA_ROOT_ENV} atau folder proyek)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='Menjalankan stage pipeline')
+    run.add_argument('--stages', default='all',
+                     help=f"Daftar stage dipisah koma: {', '.join(STAGE_SPECS)}, nomor skrip (01-10) atau all")
+    run.add_argument('--workers', type=int, default=1, help='Jumlah stage independen yang dijalankan paralel')
+    run.add_argument('--force', action='store_true', help='Jalankan ulang walaupun output sudah up-to-date')
+    run.add_argument('--dry-run', action='store_true', help='Hanya tampilkan rencana run')
+    run.set_defaults(func=cmd_run)
+
+    stages = sub.add_parser('stages', help='Daftar stage dan status up-to-date')
+    stages.set_defaults(func=cmd_stages)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
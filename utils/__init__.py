@@ -1,25 +1,154 @@
 # Utils Package
-from .data_validator import (
-    validate_tpt_data,
-    validate_p_data,
-    validate_gk_data,
-    validate_tiktok_content,
-    validate_tiktok_comment,
-    get_data_summary
-)
+# Submodul dimuat saat nama pertama kali diakses (PEP 562), sehingga
+# `from utils.atomic_io import ...` di skrip pipeline tidak ikut memuat
+# scipy, plotly, joblib, dst. dari submodul lain.
+import importlib
 
-from .data_processor import (
-    DataProcessor,
-    check_data_files
-)
+_EXPORTS = {
+    'data_validator': [
+        'validate_tpt_data',
+        'validate_p_data',
+        'validate_gk_data',
+        'validate_tiktok_content',
+        'validate_tiktok_comment',
+        'get_data_summary'
+    ],
+    'validation_engine': [
+        'SCHEMAS',
+        'validate_stream',
+        'save_upload',
+        'merge_upload'
+    ],
+    'data_profiler': [
+        'profile_long_table',
+        'profile_ingested',
+        'load_profile'
+    ],
+    'instrumentation': [
+        'instrumented',
+        'stage',
+        'record_rows',
+        'load_metrics'
+    ],
+    'data_processor': [
+        'DataProcessor',
+        'check_data_files'
+    ],
+    'pipeline_runner': [
+        'PipelineConfig',
+        'resolve_stages',
+        'plan_stages',
+        'run_pipeline'
+    ],
+    'forecast_interval': [
+        'forecast_buffer',
+        'buffer_to_frame',
+        'predict_per_tree',
+        'simulate_trajectories',
+        'summarize_quantiles'
+    ],
+    'backtest': [
+        'build_feature_table',
+        'run_backtest',
+        'compare_models'
+    ],
+    'panel_analysis': [
+        'within',
+        'fe_ols',
+        'granger_test',
+        'cross_correlation',
+        'panel_report'
+    ],
+    'panel_tensor': [
+        'PanelTensor'
+    ],
+    'spatial': [
+        'adjacency_matrix',
+        'spatial_weights',
+        'spatial_lag',
+        'add_spatial_features',
+        'morans_i'
+    ],
+    'hierarchy': [
+        'build_summing_matrix',
+        'reconcile'
+    ],
+    'explainability': [
+        'tree_contributions',
+        'build_explanations',
+        'load_cached_explanations'
+    ],
+    'model_registry': [
+        'register_model',
+        'promote',
+        'rollback',
+        'list_versions',
+        'resolve_current_model',
+        'backtest_champion_vs_challenger'
+    ],
+    'columnar_store': [
+        'write_table',
+        'read_table'
+    ],
+    'query_engine': [
+        'connect',
+        'run_query',
+        'list_views',
+        'grouped_means'
+    ],
+    'dtypes': [
+        'downcast',
+        'read_compact',
+        'frame_mb'
+    ],
+    'frame_index': [
+        'build_index',
+        'index_values',
+        'select'
+    ],
+    'population': [
+        'load_population',
+        'population_weights',
+        'weighted_mean',
+        'national_mean'
+    ],
+    'dashboard_cube': [
+        'build_dashboard_cube',
+        'index_cube',
+        'slice_cube',
+        'format_rupiah'
+    ],
+    'atomic_io': [
+        'to_csv_atomic',
+        'dump_atomic',
+        'file_lock'
+    ],
+    'job_manager': [
+        'Job',
+        'JobManager'
+    ],
+    'data_version': [
+        'data_version_token'
+    ],
+    'geo_service': [
+        'get_geometry',
+        'feature_ids',
+        'build_choropleth_spec',
+        'choropleth_year_frames'
+    ]
+}
 
-__all__ = [
-    'validate_tpt_data',
-    'validate_p_data',
-    'validate_gk_data',
-    'validate_tiktok_content',
-    'validate_tiktok_comment',
-    'get_data_summary',
-    'DataProcessor',
-    'check_data_files'
-]
+_NAME_TO_MODULE = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_NAME_TO_MODULE)
+
+def __getattr__(name):
+    module = _NAME_TO_MODULE.get(name)
+    if module is None:
+        raise AttributeError(f"module 'utils' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,144 @@
+"""
+Atomic IO Module
+Penulisan output pipeline secara atomik (file sementara + os.replace) dan
+file lock antar proses, agar pembaca tidak pernah melihat CSV/pickle yang
+setengah tertulis dan dua run pipeline tidak menulis file yang sama bersamaan
+"""
+
+import os
+import json
+import time
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+PIPELINE_LOCK_PATH = 'cleaned_data/.pipeline.lock'
+
+# mkstemp membuat file 0600; hasil akhir mengikuti umask seperti open() biasa
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+@contextmanager
+def atomic_path(path):
+    """
+    Memberikan path sementara di direktori yang sama dengan `path`.
+    Jika blok selesai tanpa error, file sementara menggantikan `path` secara atomik;
+    jika gagal, file sementara dihapus dan `path` lama tetap utuh.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def to_csv_atomic(df, path, **kwargs):
+    """DataFrame.to_csv yang atomik"""
+    with atomic_path(path) as tmp:
+        df.to_csv(tmp, **kwargs)
+    return path
+
+def to_parquet_atomic(df, path, **kwargs):
+    """DataFrame.to_parquet yang atomik"""
+    with atomic_path(path) as tmp:
+        df.to_parquet(tmp, **kwargs)
+    return path
+
+def dump_atomic(obj, path):
+    """joblib.dump yang atomik (model, daftar fitur, cache)"""
+    import joblib
+    with atomic_path(path) as tmp:
+        joblib.dump(obj, tmp)
+    return path
+
+def write_json_atomic(obj, path, **kwargs):
+    """json.dump yang atomik"""
+    with atomic_path(path) as tmp:
+        with open(tmp, 'w') as f:
+            json.dump(obj, f, **kwargs)
+    return path
+
+def savefig_atomic(fig, path, **kwargs):
+    """Figure.savefig yang atomik (format diambil dari ekstensi path tujuan)"""
+    fmt = kwargs.pop('format', os.path.splitext(path)[1].lstrip('.') or None)
+    with atomic_path(path) as tmp:
+        fig.savefig(tmp, format=fmt, **kwargs)
+    return path
+
+class LockTimeout(Exception):
+    """Lock tidak berhasil didapat dalam batas waktu"""
+
+def read_lock_holder(lock_path=PIPELINE_LOCK_PATH):
+    """Info pemegang lock (dict, mis. {'key', 'pid', 'since'}) atau None"""
+    try:
+        with open(lock_path, 'r') as f:
+            content = f.read().strip()
+        return json.loads(content) if content else None
+    except (OSError, ValueError):
+        return None
+
+def _try_lock(f):
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+    import msvcrt
+    try:
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def file_lock(lock_path=PIPELINE_LOCK_PATH, holder=None, timeout=None, poll=0.5, on_wait=None):
+    """
+    Lock eksklusif antar proses dan antar thread (flock per file descriptor).
+
+    holder: dict info pemegang yang ditulis ke file lock (dibaca proses lain).
+    timeout: detik maksimal menunggu (None = tunggu terus); LockTimeout jika lewat.
+    on_wait: callback(holder_lain) dipanggil sekali ketika harus menunggu.
+    """
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    f = open(lock_path, 'a+')
+    start = time.time()
+    waited = False
+    try:
+        while not _try_lock(f):
+            if not waited and on_wait is not None:
+                on_wait(read_lock_holder(lock_path))
+            waited = True
+            if timeout is not None and time.time() - start > timeout:
+                raise LockTimeout(f"Lock {lock_path} masih dipegang proses lain")
+            time.sleep(poll)
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(dict(holder or {}, pid=os.getpid(), since=time.time())))
+        f.flush()
+        try:
+            yield
+        finally:
+            f.seek(0)
+            f.truncate()
+            f.flush()
+            _unlock(f)
+    finally:
+        f.close()
@@ -0,0 +1,168 @@
+"""
+Backtest Module
+Replay historis forecast rekursif skrip 07: untuk setiap tahun origin, model
+dilatih hanya dengan data sampai tahun tersebut, memforecast 1-5 tahun ke
+depan dengan engine yang sama (forecast_buffer), lalu dibandingkan dengan
+data aktual. Fitur dan target dihitung sekali lalu dipotong per origin, dan
+origin dijalankan paralel di beberapa proses (joblib). Tabel yang sama dipakai
+untuk perbandingan champion vs challenger model registry (compare_models).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .forecast_interval import forecast_buffer
+from .panel_tensor import PanelTensor
+from .spatial import spatial_weights, SPATIAL_FEATURES
+
+ORIGINS = range(2015, 2024)
+HORIZON = 5
+
+# Fitur per family, sama dengan skrip 05
+P0_FEATURES = ['P0_Lag1', 'TPT', 'Garis_Kemiskinan', 'Sentimen_Global', 'P1', 'P2', 'P0_Lag1_Spasial', 'TPT_Spasial']
+INDIKATOR = ['P0', 'P1', 'P2', 'TPT', 'Garis_Kemiskinan']
+
+def make_model(family, n_estimators=100, random_state=42):
+    """Estimator yang sama dengan skrip 05 untuk family 'p0' atau 'multi'"""
+    from sklearn.ensemble import RandomForestRegressor
+    forest = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state)
+    if family == 'p0':
+        return forest
+    from sklearn.compose import TransformedTargetRegressor
+    from sklearn.preprocessing import StandardScaler
+    return TransformedTargetRegressor(regressor=forest, transformer=StandardScaler())
+
+def build_feature_table(df):
+    """
+    Fitur dan target seluruh tahun, dihitung sekali untuk semua origin:
+    values (kolom numerik, urut Provinsi-Tahun), next_delta (perubahan
+    indikator ke tahun berikutnya, target model multi; NaN jika tahun
+    berikutnya tidak ada), serta label provinsi dan tahun per baris.
+    Isinya array NumPy, jadi dibagi ke proses worker lewat memmap joblib.
+    """
+    df = df.sort_values(['Provinsi', 'Tahun']).reset_index(drop=True)
+    columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+
+    panel = PanelTensor.from_long(df, INDIKATOR)
+    next_delta = panel.lag(-1).values_at(df) - panel.values_at(df)
+    next_delta[np.isnan(next_delta).any(axis=1)] = np.nan
+
+    return {
+        'columns': columns,
+        'values': df[columns].to_numpy(dtype=np.float64),
+        'next_delta': next_delta,
+        'provinsi': df['Provinsi'].astype(str).to_numpy(),
+        'tahun': df['Tahun'].to_numpy(dtype=np.int64)
+    }
+
+def _backtest_origin(table, family, origin, horizon, n_estimators):
+    """
+    Satu origin: latih pada data <= origin, forecast `horizon` tahun dari baris
+    tahun origin. Return: (origin, provinsi, array P0 forecast (horizon, n_provinsi))
+    """
+    columns, values, tahun = table['columns'], table['values'], table['tahun']
+    col = {c: k for k, c in enumerate(columns)}
+
+    if family == 'p0':
+        features, outputs, delta = P0_FEATURES, ['P0'], False
+        train = tahun <= origin
+        y = values[train, col['P0']]
+    else:
+        # Pasangan (t, t+1) yang tahun targetnya masih <= origin
+        features, outputs, delta = INDIKATOR, INDIKATOR, True
+        train = (tahun + 1 <= origin) & ~np.isnan(table['next_delta']).any(axis=1)
+        y = table['next_delta'][train]
+    X = pd.DataFrame(values[train][:, [col[c] for c in features]], columns=features)
+    model = make_model(family, n_estimators).fit(X, y)
+
+    base = tahun == origin
+    df_base = pd.DataFrame(values[base], columns=columns)
+    weights = spatial_weights(table['provinsi'][base]) if any(c in col for c in SPATIAL_FEATURES) else None
+    buffer, buf_cols = forecast_buffer(model, df_base, features, outputs, horizon, delta, weights)
+    return origin, table['provinsi'][base], buffer[:, :, buf_cols.index('P0')]
+
+def run_backtest(df, family='multi', origins=ORIGINS, horizon=HORIZON, n_jobs=-1, n_estimators=100):
+    """
+    Backtest forecast rekursif untuk setiap origin yang ada di data.
+    Return: (df_detail, df_matrix)
+      df_detail: Origin, Horizon, Provinsi, Tahun, Forecast, Aktual, Error (forecast - aktual)
+      df_matrix: MAE per horizon (baris) x provinsi (kolom), rata-rata seluruh origin
+    Tahun target tanpa data aktual (mis. origin terakhir + 5) tidak diskor.
+    """
+    from joblib import Parallel, delayed
+
+    table = build_feature_table(df)
+    origins = [o for o in origins if o in set(table['tahun'])]
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_backtest_origin)(table, family, origin, horizon, n_estimators) for origin in origins
+    )
+
+    actual = pd.Series(table['values'][:, table['columns'].index('P0')],
+                       index=pd.MultiIndex.from_arrays([table['provinsi'], table['tahun']]))
+    parts = []
+    for origin, provinces, forecast in results:
+        for h in range(horizon):
+            year = origin + h + 1
+            parts.append(pd.DataFrame({
+                'Origin': origin, 'Horizon': h + 1, 'Provinsi': provinces, 'Tahun': year,
+                'Forecast': forecast[h],
+                'Aktual': actual.reindex(pd.MultiIndex.from_arrays([provinces, np.full(len(provinces), year)])).to_numpy()
+            }))
+    df_detail = pd.concat(parts, ignore_index=True).dropna(subset=['Aktual'])
+    df_detail['Error'] = df_detail['Forecast'] - df_detail['Aktual']
+
+    df_matrix = (df_detail.assign(AbsError=df_detail['Error'].abs())
+                 .pivot_table(index='Horizon', columns='Provinsi', values='AbsError', aggfunc='mean'))
+    return df_detail.reset_index(drop=True), df_matrix
+
+def _compare_origin(table, family, origin, candidates):
+    """
+    Satu origin perbandingan model: setiap kandidat (nama, estimator belum dilatih,
+    fitur) dilatih pada baris yang tahun targetnya <= origin lalu memprediksi P0
+    tahun origin + 1. Return: (tahun target, {nama: MAE P0})
+    """
+    columns, values, tahun = table['columns'], table['values'], table['tahun']
+    col = {c: k for k, c in enumerate(columns)}
+    p0 = values[:, col['P0']]
+
+    if family == 'p0':
+        train, test = tahun <= origin, tahun == origin + 1
+        y, actual = p0[train], p0[test]
+    else:
+        # Pasangan (t, t+1): target = perubahan indikator, P0 aktual = P0_t + perubahan
+        valid = ~np.isnan(table['next_delta']).any(axis=1)
+        train, test = valid & (tahun + 1 <= origin), valid & (tahun + 1 == origin + 1)
+        y = table['next_delta'][train]
+        actual = p0[test] + table['next_delta'][test, INDIKATOR.index('P0')]
+
+    scores = {}
+    for name, model, features in candidates:
+        idx = [col[c] for c in features]
+        model.fit(pd.DataFrame(values[train][:, idx], columns=features), y)
+        pred = model.predict(pd.DataFrame(values[test][:, idx], columns=features))
+        if family != 'p0':
+            pred = p0[test] + pred[:, INDIKATOR.index('P0')]
+        scores[name] = float(np.mean(np.abs(actual - pred)))
+    return origin + 1, scores
+
+def compare_models(df, family, candidates, origins=None, n_jobs=-1):
+    """
+    Perbandingan rolling-origin beberapa konfigurasi model pada tahun historis:
+    untuk setiap origin, semua kandidat dilatih ulang hanya dengan data sampai
+    origin dan diskor pada tahun berikutnya. Origin dijalankan paralel (joblib).
+    candidates: list (nama, estimator belum dilatih, daftar fitur).
+    origins: default dari ORIGINS[0] sampai tahun sebelum tahun terakhir.
+    Return: DataFrame Tahun + kolom 'MAE <nama>' per kandidat.
+    """
+    from joblib import Parallel, delayed
+
+    table = build_feature_table(df)
+    years = set(table['tahun'].tolist())
+    if origins is None:
+        origins = range(ORIGINS[0], max(years))
+    origins = [o for o in origins if o in years and o + 1 in years]
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_compare_origin)(table, family, origin, candidates) for origin in origins
+    )
+    rows = [{'Tahun': year, **{f'MAE {name}': mae for name, mae in scores.items()}} for year, scores in results]
+    return pd.DataFrame(rows, columns=['Tahun'] + [f'MAE {name}' for name, _, _ in candidates])
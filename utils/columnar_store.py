@@ -0,0 +1,46 @@
+"""
+Columnar Store Module
+Fungsi untuk menyimpan dan membaca tabel hasil pipeline dalam format kolumnar (Parquet)
+"""
+
+import os
+import pandas as pd
+
+from .atomic_io import to_csv_atomic, to_parquet_atomic
+
+STORE_DIR = 'cleaned_data/store/'
+
+def _has_parquet_engine():
+    """Cek apakah pyarrow tersedia untuk menulis Parquet"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def table_path(name, store_dir=STORE_DIR):
+    """Path file tabel; Parquet jika pyarrow tersedia, CSV jika tidak"""
+    ext = 'parquet' if _has_parquet_engine() else 'csv'
+    return os.path.join(store_dir, f'{name}.{ext}')
+
+def write_table(df, name, store_dir=STORE_DIR):
+    """Menyimpan DataFrame sebagai tabel kolumnar dengan nama tertentu (ditulis atomik)"""
+    os.makedirs(store_dir, exist_ok=True)
+    path = table_path(name, store_dir)
+    if path.endswith('.parquet'):
+        to_parquet_atomic(df, path, index=False)
+    else:
+        to_csv_atomic(df, path, index=False)
+    return path
+
+def read_table(name, columns=None, store_dir=STORE_DIR):
+    """Membaca tabel dari store (hanya kolom yang diminta); None jika belum ada"""
+    for ext in ('parquet', 'csv'):
+        path = os.path.join(store_dir, f'{name}.{ext}')
+        if not os.path.exists(path):
+            continue
+        if ext == 'parquet' and _has_parquet_engine():
+            return pd.read_parquet(path, columns=columns)
+        if ext == 'csv':
+            return pd.read_csv(path, usecols=columns)
+    return None
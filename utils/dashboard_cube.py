@@ -0,0 +1,147 @@
+"""
+Dashboard Cube Module
+Kubus agregat yang dimaterialisasi untuk dashboard: Nasional, Pulau dan Provinsi
+per tahun (historis + forecast), dengan rata-rata biasa dan tertimbang penduduk
+"""
+
+import pandas as pd
+
+from .panel_tensor import PanelTensor
+from .population import population_weights
+
+CUBE_TABLE = 'dashboard_cube'
+# Urutan index kubus untuk filter dashboard: Level dan Sumber selalu diketahui,
+# Wilayah opsional, sehingga setiap potongan adalah awalan index (pencarian biner)
+CUBE_INDEX = ['Level', 'Sumber', 'Wilayah', 'Tahun']
+INDIKATOR = ['P0', 'P1', 'P2', 'TPT', 'Garis_Kemiskinan', 'Sentimen_Global']
+
+# Prefiks nama provinsi (penamaan dataset hasil skrip 01/04) -> kelompok pulau
+PULAU_PREFIX = [
+    (('ACEH', 'SUMATRA', 'SUMATERA', 'RIAU', 'KEP. RIAU', 'KEPULAUAN RIAU', 'JAMBI',
+      'BENGKULU', 'LAMPUNG', 'KEP. BANGKA', 'KEPULAUAN BANGKA'), 'Sumatera'),
+    (('JAKARTA', 'DKI', 'JAWA', 'BANTEN', 'DI YOGYAKARTA', 'DAERAH ISTIMEWA'), 'Jawa'),
+    (('BALI', 'NUSA TENGGARA', 'NUSATENGGARA'), 'Bali & Nusa Tenggara'),
+    (('KALIMANTAN', 'KALIMATAN'), 'Kalimantan'),
+    (('SULAWESI', 'GORONTALO'), 'Sulawesi'),
+    (('MALUKU',), 'Maluku'),
+    (('PAPUA', 'IRIAN'), 'Papua')
+]
+
+def pulau_of(provinces):
+    """Kelompok pulau untuk Series nama provinsi (vektor, via str.startswith per prefiks)"""
+    provinces = pd.Series(provinces)
+    out = pd.Series('Lainnya', index=provinces.index)
+    assigned = pd.Series(False, index=provinces.index)
+    for prefixes, pulau in PULAU_PREFIX:
+        mask = provinces.str.startswith(prefixes) & ~assigned
+        out[mask] = pulau
+        assigned |= mask
+    return out
+
+def format_rupiah(values):
+    """Format 'Rp 1,234,567' secara vektor (tanpa lambda per baris); NaN menjadi string kosong"""
+    values = pd.Series(values)
+    digits = values.round().astype('Int64').astype('string')
+    grouped = digits.str.replace(r'\B(?=(\d{3})+(?!\d))', ',', regex=True)
+    return ('Rp ' + grouped).fillna('')
+
+def attach_population(df, population=None):
+    """
+    Menambahkan kolom Penduduk (bobot) per Provinsi-Tahun dari population_weights:
+    tahun tanpa data penduduk memakai tahun terdekat provinsi tersebut;
+    jika tabel penduduk tidak ada, bobot = 1 (rata-rata tertimbang = rata-rata biasa).
+    """
+    df = df.copy()
+    if population is None:
+        df['Penduduk'] = 1.0
+        return df
+    panel = PanelTensor.from_long(df, [])
+    weights = population_weights(population, panel.provinces, panel.years)
+    p, t = panel.codes(df)
+    df['Penduduk'] = weights[p, t]
+    return df
+
+def _aggregate_duckdb(df, indicators):
+    """Level Nasional, Pulau dan Provinsi lewat query engine (lebih cepat untuk grup sangat banyak)"""
+    from .query_engine import grouped_means
+    df = df.assign(Pulau=pulau_of(df['Provinsi']).to_numpy(), Nasional='INDONESIA')
+    levels = []
+    for level, col in [('Nasional', 'Nasional'), ('Pulau', 'Pulau'), ('Provinsi', 'Provinsi')]:
+        keys = [col, 'Tahun', 'Sumber']
+        agg = grouped_means(df[keys + indicators + ['Penduduk']], keys, indicators, weight='Penduduk')
+        levels.append(agg.rename(columns={col: 'Wilayah'}).assign(Level=level))
+    return pd.concat(levels, ignore_index=True)
+
+def _aggregate_levels(df, indicators):
+    """
+    Level Nasional, Pulau dan Provinsi dari satu PanelTensor per Sumber:
+    setiap level adalah agregasi sumbu provinsi (grup pulau/provinsi lewat
+    matriks one-hot sparse), biasa dan tertimbang Penduduk.
+    """
+    frames = []
+    for sumber, part in df.groupby('Sumber', sort=False):
+        panel = PanelTensor.from_long(part, indicators + ['Penduduk'])
+        values = panel.select(indicators)
+        weights = panel['Penduduk'][:, :, None]
+        pulau = pulau_of(pd.Series(panel.provinces)).tolist()
+        for level, groups, label in [('Nasional', None, 'INDONESIA'), ('Pulau', pulau, None),
+                                     ('Provinsi', panel.provinces, None)]:
+            plain = values.aggregate('provinsi', groups=groups, label=label).to_long('Wilayah')
+            weighted = values.aggregate('provinsi', weights=weights, groups=groups, label=label)
+            out = plain[['Wilayah', 'Tahun']].assign(Sumber=sumber)
+            w_values = weighted.values[weighted.present]
+            for k, ind in enumerate(indicators):
+                out[ind] = plain[ind].to_numpy()
+                out[f'{ind}_W'] = w_values[:, k]
+            frames.append(out.assign(Level=level))
+    return pd.concat(frames, ignore_index=True)
+
+def build_dashboard_cube(df_hist, df_forecast=None, population=None, backend='pandas'):
+    """
+    Membangun kubus agregat (long): kolom Level, Wilayah, Tahun, Sumber,
+    indikator (rata-rata biasa), indikator_W (tertimbang penduduk) dan
+    Garis_Kemiskinan_Rp (string siap tampil). backend: 'pandas' (PanelTensor
+    di memori) atau 'duckdb'.
+    """
+    frames = [df_hist.assign(Sumber='Historis')]
+    if df_forecast is not None:
+        frames.append(df_forecast.assign(Sumber='Forecast'))
+    df = pd.concat(frames, ignore_index=True)
+    indicators = [c for c in INDIKATOR if c in df.columns]
+    df[indicators] = df[indicators].apply(pd.to_numeric, errors='coerce')
+
+    df = attach_population(df, population)
+    cube = _aggregate_duckdb(df, indicators) if backend == 'duckdb' else _aggregate_levels(df, indicators)
+    if 'Garis_Kemiskinan' in indicators:
+        cube['Garis_Kemiskinan_Rp'] = format_rupiah(cube['Garis_Kemiskinan']).to_numpy()
+
+    cube = cube.sort_values(['Level', 'Wilayah', 'Tahun']).reset_index(drop=True)
+    return cube[['Level', 'Wilayah', 'Tahun', 'Sumber'] +
+                [c for c in cube.columns if c not in ('Level', 'Wilayah', 'Tahun', 'Sumber')]]
+
+def index_cube(cube):
+    """Kubus terurut dengan MultiIndex CUBE_INDEX, untuk slice_cube tanpa pemindaian penuh"""
+    from .frame_index import build_index
+    return build_index(cube, CUBE_INDEX)
+
+def slice_cube(cube, level, wilayah=None, sumber=None):
+    """
+    Potongan kubus untuk satu level (dan opsional wilayah/sumber), urut per tahun.
+    Kubus dari index_cube dipotong lewat index; kubus biasa difilter dengan mask.
+    """
+    if list(cube.index.names) == CUBE_INDEX:
+        from .frame_index import select
+        filters = {'Level': level}
+        if sumber is not None:
+            filters['Sumber'] = sumber
+        if wilayah is not None:
+            filters['Wilayah'] = wilayah
+        part = select(cube, **filters)
+        return part[['Level', 'Wilayah', 'Tahun', 'Sumber'] +
+                    [c for c in part.columns if c not in ('Level', 'Wilayah', 'Tahun', 'Sumber')]]
+    mask = cube['Level'].to_numpy() == level
+    if wilayah is not None:
+        mask &= cube['Wilayah'].to_numpy() == wilayah
+    if sumber is not None:
+        mask &= cube['Sumber'].to_numpy() == sumber
+    return cube[mask]
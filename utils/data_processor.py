@@ -5,89 +5,157 @@ Fungsi untuk menjalankan script processing data
 
 import subprocess
 import os
+import threading
 import time
 from datetime import datetime
 
+from .atomic_io import file_lock
+from .instrumentation import RUN_ID_ENV
+from .pipeline_runner import PipelineConfig, STAGE_SPECS
+
+SCRIPT_TIMEOUT = 300  # 5 menit per script
+
 class DataProcessor:
-    def __init__(self, project_dir='/home/ardwind/Project/BigDataProject'):
-        self.project_dir = project_dir
-        self.venv_python = os.path.join(project_dir, 'venv/bin/python3')
+    # Kunci stage -> (script, deskripsi); dipakai juga oleh job manager
+    STAGES = {key: (spec['script'], spec['description']) for key, spec in STAGE_SPECS.items()}
+    # Urutan full pipeline: (stage, opsional)
+    FULL_PIPELINE = [
+        ('ingestion', False), ('sentiment', True), ('integration', False),
+        ('ml', False), ('forecast', False), ('hierarchy', False), ('cube', False)
+    ]
+
+    def __init__(self, project_dir=None, config=None):
+        # project_dir = root data; default dari PIPELINE_DATA_ROOT atau folder proyek ini
+        self.config = config or PipelineConfig(project_dir)
+        self.project_dir = self.config.data_root
+        self.venv_python = self.config.python
+        self.lock_path = self.config.lock_path
+        # Semua skrip yang dijalankan processor ini mencatat metrik dengan run id yang sama
+        self.run_id = datetime.now().strftime('%Y%m%d-%H%M%S-') + os.urandom(3).hex()
         self.logs = []
     
-    def _run_script(self, script_name, description):
-        """Menjalankan script Python dan menangkap output"""
-        script_path = os.path.join(self.project_dir, script_name)
+    def _log(self, message, on_line=None):
+        line = f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
+        self.logs.append(line)
+        if on_line is not None:
+            on_line(line)
+
+    def _run_script(self, script_name, description, on_line=None, cancel_event=None):
+        """
+        Menjalankan script Python dan menangkap output.
+        Output di-stream per baris ke `on_line` (jika ada); `cancel_event` yang di-set
+        menghentikan proses yang sedang berjalan.
+        """
+        script_path = os.path.join(self.config.code_dir, script_name)
         
         if not os.path.exists(script_path):
+            self._log(f"❌ Script {script_name} tidak ditemukan", on_line)
             return False, f"Script {script_name} tidak ditemukan"
         
         try:
             start_time = time.time()
-            self.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] Memulai {description}...")
+            self._log(f"Memulai {description}...", on_line)
             
-            # Run script
-            result = subprocess.run(
-                [self.venv_python, script_path],
+            # Run script (stdout+stderr digabung, tanpa buffer agar log mengalir)
+            proc = subprocess.Popen(
+                [self.venv_python, '-u', script_path],
                 cwd=self.project_dir,
-                capture_output=True,
+                env={**os.environ, RUN_ID_ENV: self.run_id},
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
-                timeout=300  # 5 minutes timeout
+                bufsize=1
             )
             
+            state = {'timeout': False, 'cancelled': False}
+            def watch():
+                while proc.poll() is None:
+                    if cancel_event is not None and cancel_event.is_set():
+                        state['cancelled'] = True
+                        proc.terminate()
+                        return
+                    if time.time() - start_time > SCRIPT_TIMEOUT:
+                        state['timeout'] = True
+                        proc.kill()
+                        return
+                    time.sleep(0.2)
+            watcher = threading.Thread(target=watch, daemon=True)
+            watcher.start()
+            
+            output = []
+            for line in proc.stdout:
+                output.append(line)
+                if on_line is not None:
+                    on_line(line)
+            proc.wait()
+            watcher.join()
+            output = ''.join(output)
+            
             elapsed_time = time.time() - start_time
             
-            if result.returncode == 0:
-                self.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {description} selesai ({elapsed_time:.1f}s)")
-                return True, result.stdout
+            if state['timeout']:
+                self._log(f"⏱️ {description} timeout (>5 menit)", on_line)
+                return False, "Proses timeout setelah 5 menit"
+            if state['cancelled']:
+                self._log(f"🛑 {description} dibatalkan ({elapsed_time:.1f}s)", on_line)
+                return False, "Proses dibatalkan"
+            if proc.returncode == 0:
+                self._log(f"✅ {description} selesai ({elapsed_time:.1f}s)", on_line)
+                return True, output
             else:
-                self.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ {description} gagal")
-                return False, result.stderr
+                self._log(f"❌ {description} gagal", on_line)
+                return False, output
                 
-        except subprocess.TimeoutExpired:
-            self.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ⏱️ {description} timeout (>5 menit)")
-            return False, "Proses timeout setelah 5 menit"
         except Exception as e:
-            self.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error: {str(e)}")
+            self._log(f"❌ Error: {str(e)}", on_line)
             return False, str(e)
     
+    def run_stage(self, stage, on_line=None, cancel_event=None):
+        """Menjalankan satu stage pipeline berdasarkan kuncinya (lihat STAGES)"""
+        script_name, description = self.STAGES[stage]
+        return self._run_script(script_name, description, on_line=on_line, cancel_event=cancel_event)
+    
     def run_data_ingestion(self):
         """Jalankan 01_data_ingestion_cleaning.py"""
-        return self._run_script(
-            '01_data_ingestion_cleaning.py',
-            'Data Ingestion & Cleaning'
-        )
+        return self.run_stage('ingestion')
     
     def run_sentiment_processor(self):
         """Jalankan 03_sentiment_processor.py"""
-        return self._run_script(
-            '03_sentiment_processor.py',
-            'Sentiment Processing'
-        )
+        return self.run_stage('sentiment')
     
     def run_final_integration(self):
         """Jalankan 04_final_integration.py"""
-        return self._run_script(
-            '04_final_integration.py',
-            'Final Integration'
-        )
+        return self.run_stage('integration')
     
     def run_ml_training(self):
         """Jalankan 05_machine_learning_model.py"""
-        return self._run_script(
-            '05_machine_learning_model.py',
-            'ML Model Training'
-        )
+        return self.run_stage('ml')
     
     def run_forecasting(self):
         """Jalankan 07_forecasting.py"""
-        return self._run_script(
-            '07_forecasting.py',
-            'Forecasting 2026-2027'
-        )
+        return self.run_stage('forecast')
+    
+    def run_hierarchical_forecast(self):
+        """Jalankan 08_hierarchical_forecast.py"""
+        return self.run_stage('hierarchy')
+    
+    def run_dashboard_cube(self):
+        """Jalankan 09_dashboard_cube.py"""
+        return self.run_stage('cube')
+    
+    def run_backtest(self):
+        """Jalankan 10_backtest.py"""
+        return self.run_stage('backtest')
     
     def run_full_pipeline(self, include_sentiment=True):
-        """Jalankan seluruh pipeline processing"""
+        """Jalankan seluruh pipeline processing (diserialkan dengan lock pipeline antar proses)"""
         self.logs = []
+        holder = {'key': 'full_pipeline', 'label': 'Full Pipeline', 'stages': [s for s, _ in self.FULL_PIPELINE]}
+        with file_lock(self.lock_path, holder=holder,
+                       on_wait=lambda other: self._log("⏳ Menunggu run pipeline lain selesai...")):
+            return self._run_full_pipeline(include_sentiment)
+    
+    def _run_full_pipeline(self, include_sentiment):
         self.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] 🚀 Memulai Full Pipeline Processing...")
         
         # Step 1: Data Ingestion
@@ -116,6 +184,16 @@ class DataProcessor:
         if not success:
             return False, "Gagal di Forecasting: " + output
         
+        # Step 6: Forecast Hierarki (Kabupaten -> Provinsi -> Nasional)
+        success, output = self.run_hierarchical_forecast()
+        if not success:
+            return False, "Gagal di Forecast Hierarki: " + output
+        
+        # Step 7: Kubus agregat untuk dashboard
+        success, output = self.run_dashboard_cube()
+        if not success:
+            return False, "Gagal di Kubus Dashboard: " + output
+        
         self.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] 🎉 Full Pipeline selesai!")
         return True, "\n".join(self.logs)
     
@@ -127,9 +205,9 @@ class DataProcessor:
         """Menghapus logs"""
         self.logs = []
 
-def check_data_files():
-    """Cek keberadaan file data yang diperlukan"""
-    project_dir = '/home/ardwind/Project/BigDataProject'
+def check_data_files(data_root=None):
+    """Cek keberadaan file data yang diperlukan di root data (lihat PipelineConfig)"""
+    config = PipelineConfig(data_root)
     required_files = {
         'TPT': 'Data_Source/Tingkat Pengangguran Terbuka/',
         'P0': 'Data_Source/Persentase Penduduk Miskin/(P0) Menurut Provinsi/',
@@ -142,7 +220,7 @@ def check_data_files():
     
     status = {}
     for name, path in required_files.items():
-        full_path = os.path.join(project_dir, path)
+        full_path = config.path(path)
         if path.endswith('.csv'):
             status[name] = os.path.exists(full_path)
         else:
@@ -0,0 +1,172 @@
+"""
+Data Profiler Module
+Profil kualitas data hasil ingestion (tabel panjang seluruh indikator BPS):
+lonjakan antar tahun, robust z-score, celah tahun, dan salah satuan
+(mis. GK dilaporkan dalam ribuan). Semua dihitung dengan groupby vektor,
+tanpa loop per provinsi/kabupaten.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from .columnar_store import write_table, read_table
+
+# (level, file di cleaned_data, kolom nilai, nama indikator)
+SOURCES = [
+    ('Provinsi', 'tpt_master_final.csv', 'TPT_Tahunan', 'TPT'),
+    ('Provinsi', 'P0_master_final.csv', 'P0', 'P0'),
+    ('Provinsi', 'P1_master_final.csv', 'P1', 'P1'),
+    ('Provinsi', 'P2_master_final.csv', 'P2', 'P2'),
+    ('Provinsi', 'gk_master_final.csv', 'GK_Tahunan', 'GK'),
+    ('Provinsi', 'populasi_master_final.csv', 'Penduduk', 'Penduduk'),
+    ('Kabupaten', 'P0_kabupaten_master_final.csv', 'P0', 'P0'),
+    ('Nasional', 'P0_nasional_master_final.csv', 'P0', 'P0')
+]
+
+SERIES_KEYS = ['Level', 'Indikator', 'Wilayah']
+ANOMALY_TABLE = 'profil_anomali'
+GAP_TABLE = 'profil_gap'
+SUMMARY_TABLE = 'profil_ringkasan'
+
+Z_THRESHOLD = 3.5        # batas robust z-score (Iglewicz & Hoaglin)
+MIN_JUMP = 0.2           # lonjakan antar tahun minimal 20% agar ditandai
+UNIT_LOG10 = 2.5         # |log10(nilai / median)| >= 2.5 ~ beda skala ribuan
+
+def load_long_table(cleaned_dir='cleaned_data/', sources=SOURCES):
+    """
+    Menggabungkan output ingestion menjadi satu tabel panjang:
+    Level, Indikator, Wilayah, Tahun, Nilai. Wilayah kabupaten diberi
+    prefiks provinsi agar nama kabupaten yang sama di provinsi lain tidak bentrok.
+    """
+    frames = []
+    for level, filename, value_col, indikator in sources:
+        path = os.path.join(cleaned_dir, filename)
+        if not os.path.exists(path):
+            continue
+        df = pd.read_csv(path)
+        if level == 'Kabupaten':
+            wilayah = df['Provinsi'].astype(str) + ' / ' + df['Kabupaten'].astype(str)
+        elif level == 'Nasional':
+            wilayah = 'INDONESIA'
+        else:
+            wilayah = df['Provinsi'].astype(str)
+        frames.append(pd.DataFrame({
+            'Level': level, 'Indikator': indikator, 'Wilayah': wilayah,
+            'Tahun': pd.to_numeric(df['Tahun'], errors='coerce'),
+            'Nilai': pd.to_numeric(df[value_col], errors='coerce')
+        }))
+    if not frames:
+        return pd.DataFrame(columns=SERIES_KEYS + ['Tahun', 'Nilai'])
+    long_df = pd.concat(frames, ignore_index=True).dropna(subset=['Tahun'])
+    long_df['Tahun'] = long_df['Tahun'].astype(int)
+    return long_df
+
+def robust_z(values, keys):
+    """Robust z-score per grup: 0.6745 * (x - median) / MAD; NaN jika MAD = 0"""
+    grouped = values.groupby(keys, sort=False)
+    med = grouped.transform('median')
+    mad = (values - med).abs().groupby(keys, sort=False).transform('median')
+    return (0.6745 * (values - med) / mad.where(mad > 0)).astype(float)
+
+def _anomalies(df, mask, jenis, skor, keterangan):
+    """Baris anomali terstandar dari mask boolean"""
+    out = df.loc[mask, SERIES_KEYS + ['Tahun', 'Nilai']].copy()
+    out['Jenis'] = jenis
+    out['Skor'] = skor[mask].round(2).to_numpy()
+    out['Keterangan'] = keterangan[mask].to_numpy() if isinstance(keterangan, pd.Series) else keterangan
+    return out
+
+def profile_long_table(long_df):
+    """
+    Profil kualitas data dari tabel panjang.
+    Return: (anomali, gap, ringkasan) sebagai DataFrame.
+    """
+    # Duplikat (wilayah, tahun) dicatat lalu dirata-rata agar deret waktu unik
+    dup_mask = long_df.duplicated(SERIES_KEYS + ['Tahun'], keep=False)
+    duplicates = _anomalies(long_df, dup_mask, 'Duplikat', pd.Series(np.nan, index=long_df.index),
+                            'Lebih dari satu nilai untuk wilayah-tahun yang sama')
+    df = (long_df.dropna(subset=['Nilai'])
+          .groupby(SERIES_KEYS + ['Tahun'], as_index=False, sort=False)['Nilai'].mean()
+          .sort_values(SERIES_KEYS + ['Tahun'], ignore_index=True))
+
+    series = df.groupby(SERIES_KEYS, sort=False)
+    prev_value = series['Nilai'].shift()
+    prev_year = series['Tahun'].shift()
+    step = df['Tahun'] - prev_year
+
+    # 1. Lonjakan antar tahun: perubahan tahun berurutan dibanding perubahan tipikal indikator tsb
+    change = (df['Nilai'] - prev_value).where(step == 1)
+    pct = change / prev_value.abs()
+    z_change = robust_z(change, [df['Level'], df['Indikator']])
+    jump_mask = (z_change.abs() > Z_THRESHOLD) & (pct.abs() >= MIN_JUMP)
+    jumps = _anomalies(df, jump_mask, 'Lonjakan YoY', z_change,
+                       'Berubah ' + (pct * 100).round(1).astype(str) + '% dari tahun sebelumnya')
+
+    # 2. Outlier antar wilayah: nilai dibanding wilayah lain pada level/indikator/tahun yang sama
+    z_level = robust_z(df['Nilai'], [df['Level'], df['Indikator'], df['Tahun']])
+    outlier_mask = z_level.abs() > Z_THRESHOLD
+    outliers = _anomalies(df, outlier_mask, 'Outlier antar wilayah', z_level,
+                          'Jauh dari median wilayah lain di tahun yang sama')
+
+    # 3. Salah satuan: beda ~1000x dari median deret sendiri atau median lintas wilayah tahun itu
+    positive = df['Nilai'].where(df['Nilai'] > 0)
+    series_med = positive.groupby([df[k] for k in SERIES_KEYS], sort=False).transform('median')
+    year_med = positive.groupby([df['Level'], df['Indikator'], df['Tahun']], sort=False).transform('median')
+    log_series = np.log10(positive / series_med)
+    log_year = np.log10(positive / year_med)
+    log_ratio = log_series.where(log_series.abs() >= log_year.abs(), log_year)
+    unit_mask = log_ratio.abs() >= UNIT_LOG10
+    factor = (10 ** log_ratio.round()).round(3)
+    units = _anomalies(df, unit_mask, 'Salah satuan', log_ratio,
+                       'Sekitar ' + factor.astype(str) + 'x median (cek satuan, mis. ribuan)')
+
+    anomalies = pd.concat([duplicates, jumps, outliers, units], ignore_index=True)
+    anomalies = anomalies.sort_values(['Jenis', 'Skor'], key=lambda s: s.abs() if s.name == 'Skor' else s,
+                                      ascending=[True, False], ignore_index=True)
+
+    # 4. Celah tahun: di tengah deret (loncat > 1 tahun) dan di akhir (berhenti sebelum tahun terakhir indikator)
+    gap_mask = step > 1
+    inner = pd.DataFrame({
+        **{k: df.loc[gap_mask, k] for k in SERIES_KEYS},
+        'Dari': prev_year[gap_mask].astype(int), 'Sampai': df.loc[gap_mask, 'Tahun'],
+        'Tahun_Hilang': (step[gap_mask] - 1).astype(int), 'Posisi': 'Tengah'
+    })
+    last = series['Tahun'].max().rename('Terakhir').reset_index()
+    last['Maks_Indikator'] = last.groupby(['Level', 'Indikator'])['Terakhir'].transform('max')
+    trailing = last[last['Terakhir'] < last['Maks_Indikator']]
+    trailing = pd.DataFrame({
+        **{k: trailing[k] for k in SERIES_KEYS},
+        'Dari': trailing['Terakhir'], 'Sampai': trailing['Maks_Indikator'] + 1,
+        'Tahun_Hilang': trailing['Maks_Indikator'] - trailing['Terakhir'], 'Posisi': 'Akhir'
+    })
+    gaps = pd.concat([inner, trailing], ignore_index=True).sort_values(
+        ['Level', 'Indikator', 'Tahun_Hilang'], ascending=[True, True, False], ignore_index=True)
+
+    # 5. Ringkasan per level/indikator
+    summary = df.groupby(['Level', 'Indikator']).agg(
+        Wilayah=('Wilayah', 'nunique'), Observasi=('Nilai', 'size'),
+        Tahun_Min=('Tahun', 'min'), Tahun_Maks=('Tahun', 'max'))
+    span = summary['Tahun_Maks'] - summary['Tahun_Min'] + 1
+    summary['Cakupan'] = (summary['Observasi'] / (summary['Wilayah'] * span)).round(3)
+    counts = anomalies.groupby(['Level', 'Indikator', 'Jenis']).size().unstack(fill_value=0)
+    summary = summary.join(counts).fillna(0)
+    summary['Tahun_Hilang'] = gaps.groupby(['Level', 'Indikator'])['Tahun_Hilang'].sum()
+    summary = summary.fillna({'Tahun_Hilang': 0}).reset_index()
+    count_cols = [c for c in summary.columns if c in anomalies['Jenis'].unique() or c == 'Tahun_Hilang']
+    summary[count_cols] = summary[count_cols].astype(int)
+
+    return anomalies, gaps, summary
+
+def profile_ingested(cleaned_dir='cleaned_data/'):
+    """Profil seluruh output ingestion dan simpan ke store (dipanggil setelah skrip 01)"""
+    anomalies, gaps, summary = profile_long_table(load_long_table(cleaned_dir))
+    write_table(anomalies, ANOMALY_TABLE)
+    write_table(gaps, GAP_TABLE)
+    write_table(summary, SUMMARY_TABLE)
+    return anomalies, gaps, summary
+
+def load_profile():
+    """(anomali, gap, ringkasan) yang tersimpan; None jika profil belum pernah dibuat"""
+    tables = [read_table(name) for name in (ANOMALY_TABLE, GAP_TABLE, SUMMARY_TABLE)]
+    return None if any(t is None for t in tables) else tuple(tables)
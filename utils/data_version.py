@@ -0,0 +1,45 @@
+"""
+Data Version Module
+Token versi data untuk invalidasi cache dashboard: hash dari manifest
+output pipeline (path, ukuran, mtime), dihitung hanya dengan stat()
+"""
+
+import os
+import hashlib
+
+# Output pipeline yang dibaca dashboard (file atau direktori)
+OUTPUT_MANIFEST = [
+    'cleaned_data/dataset_final_untuk_ml.csv',
+    'cleaned_data/data_forecasting_2026_2027.csv',
+    'cleaned_data/data_forecasting_band_nasional.csv',
+    'cleaned_data/populasi_master_final.csv',
+    'cleaned_data/store/',
+    'cleaned_data/model_registry/registry.json',
+    'cleaned_data/explain/'
+]
+
+def _iter_entries(path):
+    """(path, ukuran, mtime_ns) untuk file, atau untuk setiap file langsung di dalam direktori"""
+    if os.path.isdir(path):
+        with os.scandir(path) as it:
+            for entry in sorted(it, key=lambda e: e.name):
+                if entry.is_file():
+                    st = entry.stat()
+                    yield entry.path, st.st_size, st.st_mtime_ns
+    elif os.path.exists(path):
+        st = os.stat(path)
+        yield path, st.st_size, st.st_mtime_ns
+
+def build_manifest(paths=OUTPUT_MANIFEST):
+    """Daftar (path, ukuran, mtime_ns) seluruh output pipeline yang ada"""
+    return [entry for path in paths for entry in _iter_entries(path)]
+
+def data_version_token(paths=OUTPUT_MANIFEST):
+    """
+    Hash (16 karakter) dari manifest output. Berubah tepat ketika ada output
+    yang ditulis ulang, ditambah atau dihapus; tetap sama selama output tidak berubah.
+    """
+    h = hashlib.sha256()
+    for path, size, mtime in build_manifest(paths):
+        h.update(f'{path}|{size}|{mtime}\n'.encode())
+    return h.hexdigest()[:16]
@@ -0,0 +1,87 @@
+"""
+Dtypes Module
+Skema tipe data ringkas untuk frame pipeline: nama wilayah sebagai category,
+Tahun sebagai int16 dan indikator persentase sebagai float32. Diterapkan saat
+ingestion dan setiap kali output dibaca ulang, sehingga salinan antara
+(per file, per tahun forecast) ikut kecil.
+
+Nilai BPS hanya 2 desimal, jadi float32 tetap tertulis sama persis di CSV.
+Tahap yang menghitung dengan indikator (training model, forecast rekursif,
+agregasi tertimbang, tampilan dashboard) memakai LABEL_SCHEMA sehingga
+indikatornya tetap float64 dan hasilnya tidak bergeser.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Kolom -> dtype ringkas. Kolom yang tidak ada di skema dibiarkan apa adanya.
+# Garis kemiskinan (Rupiah, 6-7 digit + 2 desimal) dan skor sentimen (rata-rata,
+# banyak desimal) tetap float64: float32 hanya ~7 digit signifikan sehingga
+# nilainya berubah saat ditulis ulang ke CSV.
+SCHEMA = {
+    'Provinsi': 'category',
+    'Kabupaten': 'category',
+    'Wilayah': 'category',
+    'Level': 'category',
+    'Sumber': 'category',
+    'Indikator': 'category',
+    'Tahun': 'int16',
+    'P0': 'float32',
+    'P0_Lag1': 'float32',
+    'P0_Base': 'float32',
+    'P1': 'float32',
+    'P2': 'float32',
+    'TPT': 'float32',
+    'TPT_Tahunan': 'float32',
+    'Garis_Kemiskinan': 'float64',
+    'GK_Tahunan': 'float64'
+}
+
+# Hanya label wilayah (category) dan Tahun (int16); indikator dibiarkan float64
+LABEL_SCHEMA = {col: dtype for col, dtype in SCHEMA.items() if dtype in ('category', 'int16')}
+
+def _target_dtype(series, dtype):
+    """dtype tujuan untuk satu kolom, atau None jika kolom dibiarkan (mis. Tahun berisi NaN)"""
+    if dtype == 'category':
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return None
+        return dtype if pd.api.types.is_string_dtype(series.dtype) or series.dtype == object else None
+    if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return None
+    if series.dtype == np.dtype(dtype):
+        return None
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        info = np.iinfo(dtype)
+        values = series.to_numpy()
+        if series.isna().any() or (values % 1 != 0).any() or values.min() < info.min or values.max() > info.max:
+            return None
+    return dtype
+
+def downcast(df, schema=SCHEMA, label=None):
+    """
+    DataFrame dengan dtype ringkas sesuai `schema` (idempoten, aman dipanggil
+    ulang setelah merge/concat yang mengembalikan kolom ke object/float64).
+    label: jika diisi, cetak memori frame sebelum dan sesudah.
+    """
+    if df is None or df.empty:
+        return df
+    dtypes = {}
+    for col, dtype in schema.items():
+        if col in df.columns:
+            target = _target_dtype(df[col], dtype)
+            if target is not None:
+                dtypes[col] = target
+    before = frame_mb(df) if label else None
+    if dtypes:
+        df = df.astype(dtypes)
+    if label:
+        print(f"💾 {label}: {before:.2f} MB -> {frame_mb(df):.2f} MB")
+    return df
+
+def read_compact(path, schema=SCHEMA, label=None, **kwargs):
+    """pd.read_csv lalu downcast; argumen lain diteruskan ke read_csv"""
+    return downcast(pd.read_csv(path, **kwargs), schema, label)
+
+def frame_mb(df):
+    """Memori frame (MB), termasuk isi string"""
+    return df.memory_usage(deep=True).sum() / 2**20
@@ -0,0 +1,115 @@
+"""
+Explainability Module
+Fungsi untuk menjelaskan prediksi Random Forest: kontribusi fitur per prediksi
+(jalur pohon, vektor) dan grid partial dependence yang di-cache per hash model
+"""
+
+import os
+import hashlib
+import joblib
+import numpy as np
+import pandas as pd
+
+from .atomic_io import dump_atomic
+
+EXPLAIN_DIR = 'cleaned_data/explain/'
+PD_FEATURES = ['TPT', 'Garis_Kemiskinan']
+
+def model_hash(model_path):
+    """Hash SHA-256 (16 karakter) dari file model, dipakai sebagai kunci cache"""
+    h = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+def _path_delta_matrix(forest, n_features):
+    """
+    Matriks sparse D (total_node x n_fitur): untuk setiap node anak c dengan induk p,
+    D[c, fitur_split(p)] = nilai(c) - nilai(p). Perkalian indikator jalur keputusan
+    dengan D menjumlahkan perubahan nilai di sepanjang jalur tiap sampel.
+    """
+    from scipy import sparse
+    rows, cols, data, roots = [], [], [], []
+    offset = 0
+    for est in forest.estimators_:
+        tree = est.tree_
+        value = tree.value[:, 0, 0]
+        internal = np.flatnonzero(tree.children_left >= 0)
+        for children in (tree.children_left, tree.children_right):
+            child = children[internal]
+            rows.append(offset + child)
+            cols.append(tree.feature[internal])
+            data.append(value[child] - value[internal])
+        roots.append(value[0])
+        offset += tree.node_count
+
+    D = sparse.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                          shape=(offset, n_features))
+    return D, float(np.mean(roots))
+
+def tree_contributions(model, X):
+    """
+    Kontribusi fitur per prediksi untuk Random Forest, tanpa loop per sampel.
+
+    decision_path() memberi indikator sparse (n_sampel x total_node) untuk seluruh
+    pohon sekaligus; satu perkalian sparse dengan matriks delta jalur menghasilkan
+    kontribusi. Ini atribusi jalur pohon (Saabas), pendekatan cepat TreeSHAP:
+    prediksi = bias + jumlah kontribusi.
+
+    Return: (DataFrame kontribusi n_sampel x n_fitur, bias)
+    """
+    D, bias = _path_delta_matrix(model, X.shape[1])
+    indicator, _ = model.decision_path(X)
+    contrib = (indicator @ D).toarray() / len(model.estimators_)
+    return pd.DataFrame(contrib, columns=list(X.columns), index=X.index), bias
+
+def partial_dependence_grids(model, X, features=None, grid_resolution=30):
+    """Grid partial dependence 1D per fitur dan permukaan 2D (TPT x GK) dengan metode rekursi pohon"""
+    from sklearn.inspection import partial_dependence
+
+    features = [f for f in (features or PD_FEATURES) if f in X.columns]
+    grids = {}
+    for feat in features:
+        pd_res = partial_dependence(model, X, [feat], method='recursion', grid_resolution=grid_resolution)
+        grids[feat] = {'grid': pd_res['grid_values'][0], 'pd': pd_res['average'][0]}
+
+    if len(features) == 2:
+        pd_res = partial_dependence(model, X, features, method='recursion', grid_resolution=grid_resolution)
+        grids['surface'] = {
+            'x': pd_res['grid_values'][0], 'y': pd_res['grid_values'][1],
+            'pd': pd_res['average'][0], 'features': features
+        }
+    return grids
+
+def build_explanations(model_path, X, id_cols=None, cache_dir=EXPLAIN_DIR):
+    """
+    Menghitung (atau memuat dari cache) paket penjelasan model:
+    kontribusi per baris X dan grid partial dependence TPT/GK.
+    Cache disimpan sebagai {cache_dir}/explain_{hash_model}.pkl.
+    """
+    key = model_hash(model_path)
+    cache_path = os.path.join(cache_dir, f'explain_{key}.pkl')
+    if os.path.exists(cache_path):
+        return joblib.load(cache_path)
+
+    model = joblib.load(model_path)
+    contrib, bias = tree_contributions(model, X)
+    if id_cols is not None:
+        contrib = pd.concat([id_cols.reset_index(drop=True), contrib.reset_index(drop=True)], axis=1)
+
+    bundle = {
+        'model_hash': key,
+        'bias': bias,
+        'contributions': contrib,
+        'pd_grids': partial_dependence_grids(model, X)
+    }
+    dump_atomic(bundle, cache_path)
+    return bundle
+
+def load_cached_explanations(model_path, cache_dir=EXPLAIN_DIR):
+    """Memuat paket penjelasan untuk model saat ini; None jika belum dihitung"""
+    if not os.path.exists(model_path):
+        return None
+    cache_path = os.path.join(cache_dir, f'explain_{model_hash(model_path)}.pkl')
+    return joblib.load(cache_path) if os.path.exists(cache_path) else None
@@ -0,0 +1,163 @@
+"""
+Forecast Interval Module
+Engine forecast rekursif (buffer NumPy) dan interval prediksi (P10/P50/P90)
+dari output per-pohon Random Forest
+"""
+
+import numpy as np
+import pandas as pd
+
+# Kuantil yang dilaporkan sebagai pita ketidakpastian
+QUANTILES = {'P10': 0.10, 'P50': 0.50, 'P90': 0.90}
+
+def _unwrap_forest(model):
+    """Mengambil forest di dalam TransformedTargetRegressor (model multi-output)"""
+    return getattr(model, 'regressor_', model)
+
+def build_leaf_value_table(model):
+    """Menyusun nilai node semua pohon menjadi satu tabel datar + offset per pohon"""
+    forest = _unwrap_forest(model)
+    values = [est.tree_.value[:, :, 0] for est in forest.estimators_]
+    offsets = np.cumsum([0] + [len(v) for v in values[:-1]])
+    return np.concatenate(values, axis=0), offsets
+
+def predict_per_tree(model, X, leaf_table=None):
+    """
+    Prediksi seluruh pohon dalam satu langkah vektor.
+    model.apply() mengembalikan indeks daun (n_sampel, n_pohon) sekaligus,
+    lalu nilai daun diambil dengan satu operasi gather dari tabel datar.
+    Return: array (n_sampel, n_pohon) atau (n_sampel, n_pohon, n_output) untuk model multi-output
+    """
+    forest = _unwrap_forest(model)
+    values, offsets = leaf_table if leaf_table is not None else build_leaf_value_table(model)
+    leaves = forest.apply(X)
+    per_tree = values[leaves + offsets]
+    if forest is not model:
+        # Kembalikan nilai daun ke skala asli target
+        shape = per_tree.shape
+        per_tree = model.transformer_.inverse_transform(per_tree.reshape(-1, shape[-1])).reshape(shape)
+    return per_tree[..., 0] if per_tree.shape[-1] == 1 else per_tree
+
+def _spatial_pairs(columns):
+    """Pasangan (indeks fitur spasial, indeks kolom sumber) yang keduanya ada di `columns`"""
+    from .spatial import SPATIAL_FEATURES
+    return [(columns.index(dst), columns.index(src)) for dst, src in SPATIAL_FEATURES.items()
+            if dst in columns and src in columns]
+
+def forecast_buffer(model, df_base, features, outputs, horizon, delta, weights=None):
+    """
+    Forecast titik rekursif untuk seluruh provinsi ke satu buffer NumPy yang
+    dialokasikan sekali, berbentuk (horizon, n_provinsi, n_kolom numerik).
+    Matriks fitur juga dialokasikan sekali dan diisi ulang di tempat setiap
+    tahun, jadi loop tidak membuat salinan DataFrame.
+
+    Setiap tahun: P0_Lag1 <- kolom P0 tahun sebelumnya, Tahun dimajukan, lalu
+    kolom `outputs` diisi prediksi (delta=True: ditambah prediksi perubahan).
+    weights: bobot spasial (sparse, urutan baris df_base); jika diisi, fitur
+    spasial dihitung ulang dari state tahun itu sebelum predict.
+    Return: (buffer, nama kolom buffer)
+    """
+    columns = [c for c in df_base.columns if pd.api.types.is_numeric_dtype(df_base[c])]
+    col = {c: k for k, c in enumerate(columns)}
+    feat_idx = [col[c] for c in features]
+    out_idx = [col[c] for c in outputs]
+    n_prov = len(df_base)
+
+    buffer = np.empty((horizon, n_prov, len(columns)), dtype=np.float64)
+    X = np.empty((n_prov, len(features)), dtype=np.float64)
+    X_input = pd.DataFrame(X, columns=features, copy=False)  # view X: isi baru terlihat tanpa dibuat ulang
+    prev = df_base[columns].to_numpy(dtype=np.float64)
+    start_year = prev[0, col['Tahun']]
+    spatial = _spatial_pairs(columns) if weights is not None else []
+
+    for h in range(horizon):
+        state = buffer[h]
+        np.copyto(state, prev)
+        state[:, col['P0_Lag1']] = state[:, col['P0']]
+        state[:, col['Tahun']] = start_year + h + 1
+        for dst, src in spatial:
+            state[:, dst] = weights @ state[:, src]
+
+        np.take(state, feat_idx, axis=1, out=X)
+        pred = model.predict(X_input).reshape(n_prov, -1)
+        if delta:
+            state[:, out_idx] += pred
+        else:
+            state[:, out_idx] = pred
+        prev = state
+    return buffer, columns
+
+def buffer_to_frame(buffer, columns, df_base):
+    """
+    DataFrame di atas buffer forecast (tanpa salinan kolom numerik), baris =
+    tahun x provinsi dan urutan kolom seperti df_base. Kolom label diulang per
+    tahun; kolom integer (mis. Tahun) dikembalikan ke dtype asalnya.
+    """
+    horizon, n_prov, _ = buffer.shape
+    df_out = pd.DataFrame(buffer.reshape(horizon * n_prov, len(columns)), columns=columns, copy=False)
+    for pos, c in enumerate(df_base.columns):
+        if c not in columns:
+            df_out.insert(pos, c, np.tile(df_base[c].to_numpy(), horizon))
+    for c in columns:
+        if pd.api.types.is_integer_dtype(df_base[c]) and np.array_equal(df_out[c], np.round(df_out[c])):
+            df_out[c] = df_out[c].astype(df_base[c].dtype)
+    return df_out
+
+def simulate_trajectories(model, df_base, features, horizon, feedback=None, delta=False,
+                          n_trajectories=500, batch_size=100, random_state=42, weights=None):
+    """
+    Propagasi ketidakpastian per-pohon melalui loop rekursif.
+
+    feedback memetakan kolom output model ke kolom fitur tahun berikutnya,
+    default {'P0': 'P0_Lag1'} untuk model target tunggal. Untuk model
+    multi-output, isi dengan seluruh indikator (mis. {'TPT': 'TPT', ...}).
+    delta=True berarti model memprediksi perubahan, sehingga state += prediksi.
+    weights: bobot spasial seperti di forecast_buffer; fitur spasial setiap
+    trajektori dihitung ulang dengan satu perkalian sparse per tahun.
+
+    Setiap trajektori memilih satu pohon acak di setiap tahun, sehingga sebaran
+    antar pohon ikut terbawa ke tahun berikutnya. Trajektori diproses per batch
+    agar matriks per-pohon hanya berukuran (n_provinsi * batch_size, n_pohon).
+
+    Return: dict {kolom_output: array float32 (horizon, n_provinsi, n_trajectories)}
+    """
+    feedback = feedback or {'P0': 'P0_Lag1'}
+    outputs = list(feedback)
+    feed_idx = [features.index(feedback[col]) for col in outputs]
+    spatial = _spatial_pairs(list(features)) if weights is not None else []
+
+    rng = np.random.default_rng(random_state)
+    leaf_table = build_leaf_value_table(model)
+    n_prov = len(df_base)
+    n_trees = len(_unwrap_forest(model).estimators_)
+
+    base = df_base[features].to_numpy(dtype=np.float64)
+    state_base = df_base[outputs].to_numpy(dtype=np.float64)
+    samples = {col: np.empty((horizon, n_prov, n_trajectories), dtype=np.float32) for col in outputs}
+
+    for start in range(0, n_trajectories, batch_size):
+        stop = min(start + batch_size, n_trajectories)
+        n_batch = stop - start
+
+        # Baris disusun per trajektori: baris = trajektori * n_prov + provinsi
+        X = np.tile(base, (n_batch, 1))
+        state = np.tile(state_base, (n_batch, 1))
+        rows = np.arange(len(X))
+
+        for h in range(horizon):
+            X[:, feed_idx] = state
+            for dst, src in spatial:
+                # Kolom (provinsi x trajektori) -> rata-rata tetangga per trajektori
+                X[:, dst] = (weights @ X[:, src].reshape(n_batch, n_prov).T).T.reshape(-1)
+            per_tree = predict_per_tree(model, pd.DataFrame(X, columns=features), leaf_table)
+            per_tree = per_tree.reshape(len(X), n_trees, -1)
+            picked = per_tree[rows, rng.integers(0, n_trees, size=len(X))]
+            state = state + picked if delta else picked
+            for k, col in enumerate(outputs):
+                samples[col][h, :, start:stop] = state[:, k].reshape(n_batch, n_prov).T
+
+    return samples
+
+def summarize_quantiles(samples, axis=-1):
+    """Menghitung kuantil P10/P50/P90 dari sampel trajektori"""
+    return {name: np.quantile(samples, q, axis=axis) for name, q in QUANTILES.items()}
@@ -0,0 +1,85 @@
+"""
+Frame Index Module
+Index terurut untuk filter dashboard: DataFrame diurutkan sekali (saat dimuat
+dan di-cache) dan diberi MultiIndex, mis. (Level, Provinsi, Tahun). Filter
+per provinsi/tahun lalu memakai pencarian biner pada index, sehingga biayanya
+sebanding dengan ukuran hasil, bukan pemindaian mask O(N) seluruh baris.
+"""
+
+import numpy as np
+import pandas as pd
+
+def build_index(df, keys):
+    """
+    DataFrame terurut dengan MultiIndex `keys` (kolom kunci dipindah ke index).
+    Pengurutan stabil, jadi urutan baris asli di dalam satu kunci tetap terjaga.
+    Kolom kunci tidak boleh berisi NaN (index tidak lagi terurut leksikal).
+    """
+    df = df.sort_values(keys, kind='stable')
+    df.index = pd.MultiIndex.from_frame(df[keys])
+    return df.drop(columns=keys)
+
+def index_values(indexed, key):
+    """
+    Nilai unik (terurut) satu level index tanpa memindai baris. Untuk frame
+    dari build_index, level index hanya berisi nilai yang benar-benar ada.
+    """
+    return indexed.index.levels[indexed.index.names.index(key)].tolist()
+
+def _level_mask(values, value):
+    """Mask boolean satu level index untuk nilai tunggal, list, atau slice (inklusif)"""
+    if isinstance(value, list):
+        return values.isin(value)
+    if isinstance(value, slice):
+        mask = np.ones(len(values), dtype=bool)
+        if value.start is not None:
+            mask &= values >= value.start
+        if value.stop is not None:
+            mask &= values <= value.stop
+        return mask
+    return values == value
+
+def select(indexed, **filters):
+    """
+    Potongan baris berdasarkan level index: nilai tunggal, list nilai, atau
+    slice (mis. Tahun=slice(2015, 2020), inklusif). Level yang tidak disebut
+    tidak difilter. Return DataFrame biasa (kolom kunci dikembalikan), kosong
+    jika tidak ada yang cocok.
+
+    Filter pada awalan index (mis. Level lalu Provinsi, opsional diakhiri
+    slice Tahun) dicari dengan pencarian biner (slice_locs); filter lain hanya
+    memindai baris hasil potongan tersebut.
+    """
+    names = list(indexed.index.names)
+    unknown = set(filters) - set(names)
+    if unknown:
+        raise KeyError(f"Bukan level index: {sorted(unknown)} (level: {names})")
+
+    lo, hi, used = [], [], 0
+    for name in names:
+        value = filters.get(name)
+        if name not in filters or isinstance(value, list):
+            break
+        used += 1
+        if isinstance(value, slice):
+            if value.start is not None:
+                lo.append(value.start)
+            if value.stop is not None:
+                hi.append(value.stop)
+            break
+        lo.append(value)
+        hi.append(value)
+
+    part = indexed
+    if lo or hi:
+        start, stop = indexed.index.slice_locs(tuple(lo) or None, tuple(hi) or None)
+        part = indexed.iloc[start:stop]
+
+    mask = None
+    for name in names[used:]:
+        if name in filters:
+            level_mask = _level_mask(part.index.get_level_values(name), filters[name])
+            mask = level_mask if mask is None else mask & level_mask
+    if mask is not None:
+        part = part[mask]
+    return part.reset_index()
@@ -0,0 +1,174 @@
+"""
+Geo Service Module
+Layanan geometri peta: GeoJSON dimuat sekali, disederhanakan ke beberapa level
+detail dengan tetap menjaga topologi (batas antar provinsi tetap rapat),
+dan figure choropleth dibangun sekali lalu hanya nilai warnanya yang diganti
+"""
+
+import json
+import copy
+import numpy as np
+from functools import lru_cache
+
+MAP_DATA_PATH = 'Data_Source/indonesia_simple.geojson'
+FEATURE_ID_KEY = 'Propinsi'
+
+# Toleransi Douglas-Peucker (derajat) per level detail
+SIMPLIFY_LEVELS = {
+    'tinggi': 0.0,
+    'sedang': 0.02,
+    'rendah': 0.05
+}
+
+def _douglas_peucker(points, tolerance):
+    """Douglas-Peucker iteratif (stack) untuk satu arc; titik ujung selalu dipertahankan"""
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        seg = points[end] - points[start]
+        rel = points[start + 1:end] - points[start]
+        seg_len = np.hypot(*seg)
+        if seg_len == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+        idx = int(np.argmax(dist))
+        if dist[idx] > tolerance:
+            mid = start + 1 + idx
+            keep[mid] = True
+            stack.extend([(start, mid), (mid, end)])
+    return points[keep]
+
+def _iter_rings(geometry):
+    """Semua ring (list koordinat) dari Polygon/MultiPolygon"""
+    polygons = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+    for polygon in polygons:
+        for ring in polygon:
+            yield ring
+
+def simplify_geojson(geo, tolerance):
+    """
+    Penyederhanaan yang menjaga topologi.
+
+    Setiap ring dipecah menjadi arc di titik junction (titik tempat himpunan
+    ring pemiliknya berubah). Arc yang dipakai bersama dua provinsi
+    disederhanakan sekali dalam arah kanonik lalu dipakai ulang oleh kedua
+    sisi, sehingga tidak muncul celah atau tumpang tindih di perbatasan.
+    """
+    if tolerance <= 0:
+        return geo
+
+    geo = copy.deepcopy(geo)
+    rings = [ring for feat in geo['features'] for ring in _iter_rings(feat['geometry'])]
+
+    # Himpunan ring yang memuat setiap titik
+    owners = {}
+    for r_id, ring in enumerate(rings):
+        for pt in ring[:-1]:
+            owners.setdefault(tuple(pt), set()).add(r_id)
+
+    arc_cache = {}
+
+    def simplify_arc(arc):
+        key = tuple(map(tuple, arc))
+        rev = key[::-1]
+        canon, flipped = (key, False) if key <= rev else (rev, True)
+        if canon not in arc_cache:
+            arc_cache[canon] = _douglas_peucker(np.asarray(canon, dtype=float), tolerance)
+        out = arc_cache[canon]
+        return out[::-1] if flipped else out
+
+    for ring in rings:
+        pts = ring[:-1]
+        n = len(pts)
+        if n < 4:
+            continue
+        sets = [frozenset(owners[tuple(p)]) for p in pts]
+        junctions = [i for i in range(n)
+                     if len(sets[i]) > 2 or sets[i] != sets[i - 1] or sets[i] != sets[(i + 1) % n]]
+        if not junctions:
+            # Ring tanpa junction (pulau): mulai dari titik kanonik agar hasil deterministik
+            junctions = [min(range(n), key=lambda i: tuple(pts[i]))]
+
+        start = junctions[0]
+        order = [pts[(start + i) % n] for i in range(n)] + [pts[start]]
+        cuts = sorted({(j - start) % n for j in junctions} | {n})
+
+        new_ring = [order[0]]
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            new_ring.extend(simplify_arc(order[a:b + 1])[1:].tolist())
+        # Ring yang runtuh jadi terlalu sedikit titik dibiarkan utuh
+        if len(new_ring) >= 4:
+            ring[:] = [list(p) for p in new_ring]
+    return geo
+
+@lru_cache(maxsize=1)
+def _load_raw(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+@lru_cache(maxsize=len(SIMPLIFY_LEVELS))
+def get_geometry(level='sedang', path=MAP_DATA_PATH):
+    """GeoJSON pada level detail tertentu; dimuat dan disederhanakan sekali per proses"""
+    return simplify_geojson(_load_raw(path), SIMPLIFY_LEVELS[level])
+
+def feature_ids(geo, key=FEATURE_ID_KEY):
+    """Daftar ID provinsi sesuai urutan feature di GeoJSON"""
+    return [feat['properties'][key] for feat in geo['features']]
+
+def count_vertices(geo):
+    """Jumlah total titik koordinat (untuk membandingkan level detail)"""
+    return sum(len(ring) for feat in geo['features'] for ring in _iter_rings(feat['geometry']))
+
+def build_choropleth_spec(geo, ids, colorscale='YlOrRd', height=400, key=FEATURE_ID_KEY):
+    """
+    Spesifikasi figure choropleth dasar (dict Plotly): geometri dan lokasi diset sekali,
+    z diisi belakangan. Dict dipakai langsung agar tidak ada validasi/penyalinan
+    ulang geometri oleh objek graph_objects.
+    """
+    import plotly.graph_objects as go
+    trace = go.Choropleth(
+        geojson=geo, locations=ids, z=np.full(len(ids), np.nan),
+        featureidkey=f'properties.{key}', colorscale=colorscale,
+        marker_line_width=0.5, text=ids,
+        hovertemplate='%{text}<br>P0: %{z:.2f}%<extra></extra>'
+    ).to_plotly_json()
+    layout = go.Layout(
+        geo=dict(fitbounds='locations', visible=False, projection_scale=1.8),
+        margin={'r': 0, 't': 0, 'l': 0, 'b': 0}, height=height
+    ).to_plotly_json()
+    return {'data': [trace], 'layout': layout}
+
+def choropleth_year_frames(base_spec, ids, pivot, active_year=None):
+    """
+    Figure choropleth dengan frame per tahun yang hanya berisi array warna.
+
+    pivot: DataFrame (tahun x provinsi). Geometri dikirim sekali di trace dasar;
+    slider tahun di dalam figure berpindah frame di browser tanpa rerun Streamlit.
+    Skala warna dikunci ke rentang seluruh tahun agar antar frame bisa dibandingkan.
+    """
+    Z = pivot.reindex(columns=ids).to_numpy(dtype=float)
+    years = [int(y) for y in pivot.index]
+    active = years.index(active_year) if active_year in years else len(years) - 1
+
+    trace = dict(base_spec['data'][0], z=Z[active],
+                 zmin=float(np.nanmin(Z)), zmax=float(np.nanmax(Z)))
+    frames = [{'name': str(y), 'data': [{'type': 'choropleth', 'z': Z[i]}], 'traces': [0]} for i, y in enumerate(years)]
+    steps = [{
+        'label': str(y), 'method': 'animate',
+        'args': [[str(y)], {'mode': 'immediate', 'frame': {'duration': 0, 'redraw': True},
+                            'transition': {'duration': 0}}]
+    } for y in years]
+
+    layout = dict(base_spec['layout'])
+    layout['sliders'] = [{'active': active, 'steps': steps,
+                          'currentvalue': {'prefix': 'Tahun: '}, 'pad': {'t': 10}}]
+    layout['margin'] = dict(layout.get('margin', {}), b=60)
+    return {'data': [trace], 'layout': layout, 'frames': frames}
@@ -0,0 +1,113 @@
+"""
+Hierarchy Module
+Fungsi untuk forecasting hierarki (Kabupaten/Kota -> Provinsi -> Nasional)
+dan rekonsiliasi berbobot penduduk dengan matriks penjumlahan sparse
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, cg
+
+def build_summing_matrix(bottom_parents, bottom_weights=None):
+    """
+    Membangun matriks penjumlahan S (sparse) untuk hierarki 3 level.
+
+    Baris S: [Nasional] + [Provinsi...] + [Kabupaten/Kota...], kolom: Kabupaten/Kota.
+    Karena P0 adalah persentase, baris agregat berisi bobot rata-rata tertimbang
+    (bobot penduduk dinormalisasi per provinsi dan secara nasional).
+    Jumlah elemen non-nol = 3 x n_kabupaten, sehingga biaya linear terhadap jumlah series.
+
+    Return: (S, daftar_provinsi) dengan urutan baris provinsi = daftar_provinsi
+    """
+    codes, provinces = pd.factorize(pd.Series(bottom_parents), sort=True)
+    n_bottom = len(codes)
+    n_prov = len(provinces)
+
+    w = np.ones(n_bottom) if bottom_weights is None else np.asarray(bottom_weights, dtype=float)
+    w_prov = w / np.bincount(codes, weights=w)[codes]
+    w_nat = w / w.sum()
+
+    cols = np.tile(np.arange(n_bottom), 3)
+    rows = np.concatenate([np.zeros(n_bottom, dtype=int), 1 + codes, 1 + n_prov + np.arange(n_bottom)])
+    data = np.concatenate([w_nat, w_prov, np.ones(n_bottom)])
+
+    S = sparse.csr_matrix((data, (rows, cols)), shape=(1 + n_prov + n_bottom, n_bottom))
+    return S, list(provinces)
+
+def reconcile(S, y_base, method='wls', variances=None):
+    """
+    Rekonsiliasi forecast dasar agar koheren antar level.
+
+    y_base: array (n_total,) atau (n_total, horizon) dengan urutan baris sama dengan S.
+    method='bottom_up': agregasi langsung dari level Kabupaten/Kota.
+    method='wls': gaya MinT dengan matriks kovarians diagonal (variances),
+    diselesaikan dengan conjugate gradient di atas operator sparse
+    S' W^-1 S, sehingga tiap iterasi hanya O(nnz(S)).
+    """
+    y_base = np.asarray(y_base, dtype=float)
+    squeeze = y_base.ndim == 1
+    Y = y_base[:, None] if squeeze else y_base
+    n_bottom = S.shape[1]
+
+    if method == 'bottom_up':
+        Y_rec = S @ Y[-n_bottom:]
+    else:
+        w_inv = np.ones(S.shape[0]) if variances is None else 1.0 / np.maximum(np.asarray(variances, dtype=float), 1e-8)
+        St = S.T.tocsr()
+        A = LinearOperator((n_bottom, n_bottom), matvec=lambda b: St @ (w_inv * (S @ b)), dtype=float)
+        rhs = St @ (w_inv[:, None] * Y)
+
+        B = np.empty((n_bottom, Y.shape[1]))
+        for j in range(Y.shape[1]):
+            B[:, j], _ = cg(A, rhs[:, j], x0=Y[-n_bottom:, j], maxiter=500)
+        Y_rec = S @ B
+
+    return Y_rec[:, 0] if squeeze else Y_rec
+
+def aggregate_history(S_rows, pivot):
+    """
+    Riwayat level agregat dari baris S (rata-rata tertimbang kabupaten/kota).
+    Bobot dinormalisasi ulang per tahun atas kabupaten/kota yang teramati,
+    sehingga tahun sebelum observasi pertama sebuah series tidak dihitung
+    sebagai 0. Tahun tanpa observasi sama sekali menjadi NaN.
+    """
+    values = pivot.ffill(axis=1).to_numpy(dtype=float)
+    observed = ~np.isnan(values)
+    num = S_rows @ np.where(observed, values, 0.0)
+    den = S_rows @ observed.astype(float)
+    hist = np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+    return pd.DataFrame(hist, columns=pivot.columns)
+
+def base_interval(base, variance, z=1.2816):
+    """
+    Interval forecast dasar (default P10-P90) dengan varians galat naif yang
+    tumbuh linear terhadap horizon (random walk). base: (n, horizon).
+    Return: (bawah, atas) dengan bentuk sama seperti base.
+    """
+    base = np.atleast_2d(np.asarray(base, dtype=float))
+    h = np.arange(1, base.shape[1] + 1)
+    half = z * np.sqrt(np.asarray(variance, dtype=float).reshape(-1, 1) * h[None, :])
+    return base - half, base + half
+
+def damped_drift_forecast(pivot, horizon, window=3, phi=0.8):
+    """
+    Forecast dasar vektor untuk banyak series sekaligus.
+
+    pivot: DataFrame (series x tahun). Nilai terakhir yang teramati diteruskan
+    dengan rata-rata perubahan tahunan `window` tahun terakhir, diredam phi^h.
+    Return: array (n_series, horizon)
+    """
+    values = pivot.ffill(axis=1).to_numpy(dtype=float)
+    last = values[:, -1]
+    steps = np.diff(values[:, -(window + 1):], axis=1)
+    drift = np.nan_to_num(np.nanmean(steps, axis=1)) if steps.size else np.zeros(len(values))
+
+    damp = np.cumsum(phi ** np.arange(1, horizon + 1))
+    return last[:, None] + drift[:, None] * damp[None, :]
+
+def naive_error_variance(pivot):
+    """Varians galat forecast naif satu langkah per series (skala untuk rekonsiliasi WLS)"""
+    diffs = pivot.diff(axis=1)
+    var = diffs.var(axis=1, skipna=True).to_numpy(dtype=float)
+    return np.where(np.isfinite(var) & (var > 0), var, np.nanmedian(var[var > 0]) if np.any(var > 0) else 1.0)
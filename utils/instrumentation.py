@@ -0,0 +1,179 @@
+"""
+Instrumentation Module
+Pencatatan performa pipeline: wall time, CPU time, RSS dan jumlah baris
+masuk/keluar per stage dan per fungsi. Setiap record ditulis satu baris
+ke file metrik JSONL sehingga tren antar run bisa dibandingkan.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_PATH = 'cleaned_data/metrics/metrics.jsonl'
+
+# Run id dibagikan DataProcessor ke subprocess skrip lewat environment,
+# sehingga semua record dari satu run pipeline bisa dikelompokkan
+RUN_ID_ENV = 'PIPELINE_RUN_ID'
+
+_local = threading.local()
+
+# Aktif selama beberapa stage berjalan paralel sebagai thread dalam satu proses
+# (pipeline_runner dengan workers > 1): cpu_s dan RSS adalah angka seluruh proses
+_shared_process = threading.Event()
+
+@contextmanager
+def process_scope():
+    """Menandai record yang dibuat di dalam blok dengan scope 'process' (CPU/RSS gabungan thread)"""
+    _shared_process.set()
+    try:
+        yield
+    finally:
+        _shared_process.clear()
+
+def current_run_id():
+    """Run id dari environment, atau id unik per proses jika skrip dijalankan langsung"""
+    if RUN_ID_ENV not in os.environ:
+        os.environ[RUN_ID_ENV] = datetime.now().strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+    return os.environ[RUN_ID_ENV]
+
+def _rss_mb():
+    """RSS proses saat ini (MB) dari /proc; None jika tidak tersedia"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _peak_rss_mb():
+    """Puncak RSS proses sejauh ini (MB); ru_maxrss dalam KB di Linux, byte di macOS"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+def _count_rows(obj):
+    """Jumlah baris DataFrame/Series (atau total dari tuple/list-nya); None jika bukan tabel"""
+    if hasattr(obj, 'shape') and hasattr(obj, 'index'):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        counts = [_count_rows(o) for o in obj]
+        counts = [c for c in counts if c is not None]
+        return sum(counts) if counts else None
+    return None
+
+def write_record(record, path=METRICS_PATH):
+    """
+    Menambahkan satu record ke file metrik. Satu baris pendek ditulis dengan
+    mode append sekali write, jadi aman dari beberapa proses sekaligus.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(record, default=str) + '\n')
+
+class _Record(dict):
+    """Record metrik yang sedang berjalan; jumlah baris bisa diisi dari dalam blok"""
+
+    def rows(self, rows_in=None, rows_out=None):
+        if rows_in is not None:
+            self['rows_in'] = int(rows_in)
+        if rows_out is not None:
+            self['rows_out'] = int(rows_out)
+
+@contextmanager
+def stage(name, kind='stage', path=METRICS_PATH):
+    """
+    Mengukur satu blok (stage skrip atau fungsi) dan menulis record-nya:
+    wall_s, cpu_s, rss_mb (akhir), rss_delta_mb, peak_rss_mb (puncak proses
+    sampai blok selesai), rows_in/rows_out dan status. scope = 'block' jika
+    cpu_s/RSS milik blok ini saja, 'process' jika di dalam process_scope()
+    (stage lain berjalan di thread yang sama prosesnya, angka tidak per stage).
+    """
+    record = _Record(
+        run_id=current_run_id(), ts=datetime.now().isoformat(timespec='seconds'),
+        script=os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+        name=name, kind=kind, rows_in=None, rows_out=None, status='ok', error=None,
+        scope='process' if _shared_process.is_set() else 'block'
+    )
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(record)
+    rss_start = _rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    except BaseException as e:
+        record['status'] = 'error'
+        record['error'] = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        stack.pop()
+        rss_end = _rss_mb()
+        peak = _peak_rss_mb()
+        if peak is not None and rss_end is not None:
+            peak = max(peak, rss_end)
+        record.update(
+            wall_s=round(time.perf_counter() - wall_start, 4),
+            cpu_s=round(time.process_time() - cpu_start, 4),
+            rss_mb=round(rss_end, 1) if rss_end is not None else None,
+            rss_delta_mb=round(rss_end - rss_start, 1) if rss_end is not None and rss_start is not None else None,
+            peak_rss_mb=round(peak, 1) if peak is not None else None
+        )
+        write_record(dict(record), path)
+
+def record_rows(rows_in=None, rows_out=None):
+    """Mengisi jumlah baris untuk record stage/fungsi terdalam yang sedang berjalan"""
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        stack[-1].rows(rows_in, rows_out)
+
+def instrumented(func=None, *, name=None):
+    """
+    Decorator: mengukur setiap pemanggilan fungsi dengan stage(kind='function').
+    rows_in dihitung dari argumen DataFrame, rows_out dari nilai kembalian
+    (jika belum diisi lewat record_rows di dalam fungsi).
+    name: nama record, atau callable(*args, **kwargs) -> nama untuk membedakan
+    pemanggilan (mis. per jenis data).
+    """
+    if func is None:
+        return functools.partial(instrumented, name=name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        label = name(*args, **kwargs) if callable(name) else (name or func.__name__)
+        with stage(label, kind='function') as record:
+            record.rows(rows_in=_count_rows(list(args) + list(kwargs.values())))
+            result = func(*args, **kwargs)
+            if record['rows_out'] is None:
+                record.rows(rows_out=_count_rows(result))
+            return result
+    return wrapper
+
+def load_metrics(path=METRICS_PATH):
+    """Seluruh record metrik sebagai DataFrame (kosong jika belum ada)"""
+    import pandas as pd
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:  # baris terpotong (mis. proses dihentikan saat menulis)
+                continue
+    df = pd.DataFrame.from_records(records)
+    if not df.empty:
+        df['ts'] = pd.to_datetime(df['ts'])
+    return df
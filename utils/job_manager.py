@@ -0,0 +1,173 @@
+"""
+Job Manager Module
+Menjalankan stage pipeline di background (worker pool), terlepas dari sesi
+Streamlit: log di-stream ke ring buffer, bisa dibatalkan, dan mencatat
+durasi tiap stage. Job dengan kunci yang sama tidak dijalankan dua kali.
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .atomic_io import file_lock
+
+LOG_BUFFER_SIZE = 2000
+MAX_WORKERS = 2
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+def covers(stages_running, stages_requested):
+    """True jika run yang sedang berjalan sudah mencakup semua stage yang diminta"""
+    return {s for s, _ in stages_requested} <= {s for s, _ in stages_running}
+
+class Job:
+    """Satu eksekusi pipeline: urutan stage, status, log (ring buffer) dan durasi per stage"""
+
+    def __init__(self, key, stages, label):
+        self.job_id = uuid.uuid4().hex[:8]
+        self.key = key
+        self.label = label
+        # stages: list of (stage_key, optional); stage opsional boleh gagal tanpa menghentikan job
+        self.stages = stages
+        self.status = 'queued'
+        self.current_stage = None
+        self.timings = {}
+        self.error = None
+        self.created_at = datetime.now()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self._lines = deque(maxlen=LOG_BUFFER_SIZE)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def log(self, line):
+        """Menambahkan satu baris log (thread-safe); baris tertua dibuang jika buffer penuh"""
+        with self._lock:
+            self._seq += 1
+            self._lines.append((self._seq, line.rstrip('\n')))
+
+    def tail(self, n=200, since=0):
+        """Baris log terbaru (maks n) dengan nomor urut > since"""
+        with self._lock:
+            lines = [text for seq, text in self._lines if seq > since]
+        return lines[-n:]
+
+    @property
+    def is_active(self):
+        return self.status in ACTIVE_STATUSES
+
+    @property
+    def progress(self):
+        """Fraksi stage yang sudah selesai (0-1)"""
+        return len(self.timings) / len(self.stages) if self.stages else 1.0
+
+    def summary(self):
+        return {
+            'job_id': self.job_id, 'label': self.label, 'status': self.status,
+            'stage': self.current_stage, 'progress': self.progress,
+            'timings': dict(self.timings), 'error': self.error,
+            'created_at': self.created_at.strftime('%H:%M:%S'),
+            'finished_at': self.finished_at.strftime('%H:%M:%S') if self.finished_at else None
+        }
+
+class JobManager:
+    """
+    Pool worker bersama untuk seluruh sesi. Submit ketika job aktif lain sudah
+    mencakup stage yang sama (mis. stage tunggal saat Full Pipeline berjalan)
+    mengembalikan job tersebut, sehingga beberapa pengguna memantau run yang sama.
+
+    Eksekusi diserialkan dengan file lock pipeline, jadi job berikutnya antre
+    dan run dari proses/server lain juga ikut dihormati. Jika proses lain sedang
+    menjalankan stage yang mencakup permintaan ini, job digabungkan dan tidak
+    dijalankan ulang.
+    """
+
+    def __init__(self, processor_factory, max_workers=MAX_WORKERS, history=20):
+        self._processor_factory = processor_factory
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pipeline-job')
+        self._jobs = {}
+        self._order = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def submit(self, key, stages, label=None):
+        """Menjadwalkan job; return (job, is_new)"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.is_active and (job.key == key or covers(job.stages, stages)):
+                    return job, False
+            job = Job(key, stages, label or key)
+            if len(self._order) == self._order.maxlen:
+                self._jobs.pop(self._order[0], None)
+            self._order.append(job.job_id)
+            self._jobs[job.job_id] = job
+        self._pool.submit(self._run, job)
+        return job, True
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Semua job yang tercatat, terbaru lebih dulu"""
+        with self._lock:
+            return [self._jobs[j] for j in reversed(self._order) if j in self._jobs]
+
+    def active_jobs(self):
+        return [job for job in self.jobs() if job.is_active]
+
+    def cancel(self, job_id):
+        """Meminta pembatalan; proses stage yang sedang berjalan dihentikan"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.is_active:
+            job.cancel_event.set()
+            return True
+        return False
+
+    def _run(self, job):
+        processor = self._processor_factory()
+        waiting_for = {}
+
+        def on_wait(other):
+            waiting_for['holder'] = other
+            label = other.get('label', other.get('key')) if other else 'proses lain'
+            job.log(f"[{datetime.now().strftime('%H:%M:%S')}] ⏳ Menunggu run '{label}' selesai...")
+
+        holder = {'key': job.key, 'label': job.label, 'job_id': job.job_id,
+                  'stages': [s for s, _ in job.stages]}
+        try:
+            with file_lock(processor.lock_path, holder=holder, on_wait=on_wait):
+                other = waiting_for.get('holder')
+                if other and other.get('job_id') not in self._jobs and \
+                        covers([(s, False) for s in other.get('stages', [])], job.stages):
+                    job.log(f"🔗 Digabung dengan run identik dari proses {other.get('pid')}, tidak dijalankan ulang")
+                    job.status = 'done'
+                    return
+                self._execute(job, processor)
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.current_stage = None
+            job.finished_at = datetime.now()
+            job.log(f"[{job.finished_at.strftime('%H:%M:%S')}] Job selesai dengan status: {job.status}")
+
+    def _execute(self, job, processor):
+        job.status = 'running'
+        job.log(f"[{datetime.now().strftime('%H:%M:%S')}] 🚀 Memulai job '{job.label}' ({job.job_id})")
+        for stage, optional in job.stages:
+            if job.cancel_event.is_set():
+                break
+            job.current_stage = stage
+            start = time.perf_counter()
+            success, output = processor.run_stage(stage, on_line=job.log, cancel_event=job.cancel_event)
+            job.timings[stage] = round(time.perf_counter() - start, 2)
+            if not success and not job.cancel_event.is_set():
+                if optional:
+                    job.log(f"⚠️ Stage {stage} gagal, dilanjutkan (opsional)")
+                    continue
+                job.error = f"Gagal di stage {stage}"
+                job.status = 'failed'
+                return
+        job.status = 'cancelled' if job.cancel_event.is_set() else 'done'
@@ -0,0 +1,232 @@
+"""
+Model Registry Module
+Registry model lokal: versi artefak, metadata, promote/rollback,
+dan backtest champion vs challenger rolling-origin pada tahun historis
+"""
+
+import os
+import json
+import time
+import hashlib
+import joblib
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+
+from .atomic_io import dump_atomic, write_json_atomic, file_lock
+from .dtypes import read_compact, LABEL_SCHEMA
+
+REGISTRY_DIR = 'cleaned_data/model_registry/'
+INDEX_FILE = 'registry.json'
+LOCK_FILE = '.registry.lock'
+
+# Fallback ke path lama jika registry masih kosong
+LEGACY_PATHS = {
+    'p0': ('cleaned_data/model_kemiskinan_final.pkl', 'cleaned_data/feature_names.pkl'),
+    'multi': ('cleaned_data/model_multioutput.pkl', 'cleaned_data/multioutput_feature_names.pkl')
+}
+
+# Jumlah tahun target terakhir yang disisihkan skrip 05 untuk evaluasi; model yang
+# didaftarkan dilatih ulang dengan semua tahun sesudah evaluasi
+HOLDOUT_YEARS = 2
+
+def data_fingerprint(data_path):
+    """Hash SHA-256 (16 karakter) dari file dataset latih"""
+    h = hashlib.sha256()
+    with open(data_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+def config_fingerprint(model, features):
+    """Hash (16 karakter) konfigurasi model: kelas, hyperparameter dan fitur"""
+    params = sorted((k, repr(v)) for k, v in model.get_params(deep=True).items())
+    payload = repr((type(model).__name__, params, list(features)))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def holdout_start(target_years, n_years=HOLDOUT_YEARS):
+    """Tahun target pertama slice holdout evaluasi (n_years tahun terakhir)"""
+    return int(sorted(set(int(y) for y in target_years))[-n_years])
+
+def _index_path(registry_dir):
+    return os.path.join(registry_dir, INDEX_FILE)
+
+def load_index(registry_dir=REGISTRY_DIR):
+    """Membaca indeks registry (versi, champion, riwayat promote per family)"""
+    path = _index_path(registry_dir)
+    if not os.path.exists(path):
+        return {'versions': {}, 'families': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _save_index(index, registry_dir):
+    write_json_atomic(index, _index_path(registry_dir), indent=2)
+
+def _index_lock(registry_dir):
+    """Lock baca-ubah-tulis indeks registry (register/promote/rollback dari proses berbeda)"""
+    return file_lock(os.path.join(registry_dir, LOCK_FILE), holder={'key': 'registry'})
+
+def register_model(model, features, family, data_path, cv_metrics, training_time,
+                   registry_dir=REGISTRY_DIR):
+    """
+    Menyimpan model sebagai versi baru beserta metadata:
+    daftar fitur, fingerprint data & konfigurasi, metrik CV, waktu training
+    dan ukuran artefak. Jika family yang sama sudah
+    punya versi dengan data dan konfigurasi identik, versi itu dikembalikan
+    tanpa menulis artefak baru (rerun tanpa perubahan tidak menambah versi).
+    Return: id versi (mis. 'p0-v003')
+    """
+    data_fp = data_fingerprint(data_path)
+    config_fp = config_fingerprint(model, features)
+    with _index_lock(registry_dir):
+        index = load_index(registry_dir)
+        for version, meta in index['versions'].items():
+            if (meta['family'] == family and meta['data_fingerprint'] == data_fp
+                    and meta.get('config_fingerprint') == config_fp):
+                return version
+
+        n_family = sum(1 for v in index['versions'].values() if v['family'] == family)
+        version = f"{family}-v{n_family + 1:03d}"
+
+        version_dir = os.path.join(registry_dir, version)
+        model_path = os.path.join(version_dir, 'model.pkl')
+        dump_atomic(model, model_path)
+        dump_atomic(features, os.path.join(version_dir, 'features.pkl'))
+
+        index['versions'][version] = {
+            'family': family,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'features': list(features),
+            'data_fingerprint': data_fp,
+            'config_fingerprint': config_fp,
+            'cv_metrics': {k: round(float(v), 6) for k, v in cv_metrics.items()},
+            'training_time_s': round(float(training_time), 3),
+            'artifact_size_bytes': os.path.getsize(model_path),
+            'model_path': model_path
+        }
+        _save_index(index, registry_dir)
+        return version
+
+def promote(version, registry_dir=REGISTRY_DIR):
+    """Menjadikan versi tertentu sebagai champion untuk family-nya"""
+    with _index_lock(registry_dir):
+        index = load_index(registry_dir)
+        if version not in index['versions']:
+            raise KeyError(f"Versi {version} tidak ada di registry")
+        family = index['versions'][version]['family']
+        fam = index['families'].setdefault(family, {'champion': None, 'history': []})
+        if fam['champion'] != version:
+            fam['champion'] = version
+            fam['history'].append(version)
+        _save_index(index, registry_dir)
+        return version
+
+def rollback(family, registry_dir=REGISTRY_DIR):
+    """Mengembalikan champion ke versi sebelumnya dalam riwayat promote"""
+    with _index_lock(registry_dir):
+        index = load_index(registry_dir)
+        fam = index['families'].get(family)
+        if not fam or len(fam['history']) < 2:
+            raise ValueError(f"Tidak ada versi sebelumnya untuk family '{family}'")
+        fam['history'].pop()
+        fam['champion'] = fam['history'][-1]
+        _save_index(index, registry_dir)
+        return fam['champion']
+
+def get_champion(family, registry_dir=REGISTRY_DIR):
+    """Id versi champion untuk family; None jika belum ada"""
+    return load_index(registry_dir)['families'].get(family, {}).get('champion')
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    """Ringkasan seluruh versi sebagai DataFrame"""
+    index = load_index(registry_dir)
+    champions = {f['champion'] for f in index['families'].values()}
+    rows = []
+    for version, meta in index['versions'].items():
+        row = {'Versi': version, 'Family': meta['family'], 'Champion': version in champions,
+               'Dibuat': meta['created_at'], 'Data': meta['data_fingerprint'],
+               'Waktu Training (s)': meta['training_time_s'],
+               'Ukuran (KB)': round(meta['artifact_size_bytes'] / 1024, 1)}
+        row.update({f'CV {k}': v for k, v in meta['cv_metrics'].items()})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+@lru_cache(maxsize=8)
+def _load_resolved(model_path, features_path, mtime):
+    return joblib.load(model_path), joblib.load(features_path)
+
+def resolve_model_paths(family, registry_dir=REGISTRY_DIR):
+    """Path (model, fitur, versi) untuk model 'current' suatu family, fallback ke path lama"""
+    version = get_champion(family, registry_dir)
+    if version is not None:
+        version_dir = os.path.join(registry_dir, version)
+        return os.path.join(version_dir, 'model.pkl'), os.path.join(version_dir, 'features.pkl'), version
+    model_path, features_path = LEGACY_PATHS[family]
+    if os.path.exists(model_path) and os.path.exists(features_path):
+        return model_path, features_path, 'legacy'
+    return None, None, None
+
+def resolve_current_model(family, registry_dir=REGISTRY_DIR):
+    """
+    Memuat model 'current' (champion) suatu family.
+    Hasil di-cache per (path, mtime), sehingga pemanggilan berulang tidak membaca ulang artefak.
+    Return: (model, fitur, versi) atau (None, None, None)
+    """
+    model_path, features_path, version = resolve_model_paths(family, registry_dir)
+    if model_path is None:
+        return None, None, None
+    model, features = _load_resolved(model_path, features_path, os.path.getmtime(model_path))
+    return model, features, version
+
+def backtest_champion_vs_challenger(challenger, data_path, origins=None, n_jobs=-1, registry_dir=REGISTRY_DIR):
+    """
+    Backtest rolling-origin champion vs challenger pada tahun historis: konfigurasi
+    kedua versi (hyperparameter + fitur artefak) dilatih ulang per tahun origin
+    hanya dengan data sampai origin, lalu diskor pada P0 tahun berikutnya.
+    Origin dijalankan paralel (joblib, lewat utils/backtest).
+    Return: DataFrame MAE champion & challenger per tahun; None jika belum ada
+    champion lain atau fitur salah satu versi tidak ada di data.
+    """
+    from sklearn.base import clone
+    from .backtest import compare_models
+
+    index = load_index(registry_dir)
+    meta = index['versions'][challenger]
+    champion = get_champion(meta['family'], registry_dir)
+    if champion is None or champion == challenger:
+        return None
+
+    df = read_compact(data_path, LABEL_SCHEMA)
+    candidates = []
+    for name, v in [('champion', champion), ('challenger', challenger)]:
+        features = index['versions'][v]['features']
+        if any(c not in df.columns for c in features):
+            return None
+        candidates.append((name, clone(joblib.load(index['versions'][v]['model_path'])), features))
+
+    df_bt = compare_models(df, meta['family'], candidates, origins, n_jobs)
+    df_bt.attrs['champion'], df_bt.attrs['challenger'] = champion, challenger
+    return df_bt
+
+def timed_fit(model, X, y):
+    """Melatih model dan mengembalikan durasi training (detik)"""
+    start = time.perf_counter()
+    model.fit(X, y)
+    return time.perf_counter() - start
+
+def cross_validate_metrics(model, X, y, cv=5, output=None):
+    """
+    Metrik cross-validation (MAE, R2) untuk metadata registry.
+    Untuk model multi-output, `output` memilih kolom target yang diskor (mis. 'P0'),
+    agar metrik tidak didominasi target berskala besar seperti GK.
+    """
+    from sklearn.model_selection import KFold, cross_val_predict
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    y_pred = cross_val_predict(model, X, y, cv=KFold(cv, shuffle=True, random_state=42), n_jobs=-1)
+    if output is not None:
+        y, y_pred = y[output], y_pred[:, list(y.columns).index(output)]
+    return {
+        'mae': mean_absolute_error(y, y_pred),
+        'r2': r2_score(y, y_pred)
+    }
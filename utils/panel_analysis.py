@@ -0,0 +1,219 @@
+"""
+Panel Analysis Module
+Analisis ekonometrika panel provinsi x tahun untuk pertanyaan TPT -> P0:
+regresi fixed effects (provinsi + tahun) dengan lag TPT, uji kausalitas
+Granger panel dan korelasi silang per lag. Semua transformasi within
+(demeaning per grup) dihitung vektor dengan np.bincount; interval kepercayaan
+dari bootstrap klaster provinsi yang dijalankan paralel (joblib).
+"""
+
+import numpy as np
+import pandas as pd
+
+MAX_LAG = 3
+N_BOOT = 500
+
+def panel_arrays(df, columns):
+    """
+    Panel terurut Provinsi-Tahun sebagai array: kode grup (0..G-1), tahun,
+    dan nilai kolom (float64). Baris dengan nilai kosong tetap ada (NaN).
+    """
+    df = df.sort_values(['Provinsi', 'Tahun'])
+    groups = pd.factorize(df['Provinsi'].astype(str), sort=True)[0]
+    return {
+        'groups': groups,
+        'years': df['Tahun'].to_numpy(dtype=np.int64),
+        **{c: df[c].to_numpy(dtype=np.float64) for c in columns}
+    }
+
+def shift(values, groups, years, k):
+    """
+    Nilai k tahun sebelumnya (k<0: sesudahnya) pada provinsi yang sama;
+    NaN jika tahun tersebut tidak ada. Panel harus terurut grup-tahun.
+    """
+    out = np.full(len(values), np.nan)
+    if k == 0:
+        return values.copy()
+    n = len(values)
+    if abs(k) >= n:
+        return out
+    src = np.arange(n) - k
+    valid = (src >= 0) & (src < n)
+    src_c = np.clip(src, 0, n - 1)
+    valid &= (groups[src_c] == groups) & (years[src_c] == years - k)
+    out[valid] = values[src_c[valid]]
+    return out
+
+def within(X, groups, years=None, max_iter=50, tol=1e-10):
+    """
+    Transformasi within: kurangi rata-rata per provinsi (dan per tahun jika
+    `years` diberikan, lewat proyeksi bergantian sampai konvergen untuk panel
+    tidak seimbang). X: array (n,) atau (n, k) tanpa NaN.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    flat = X.ndim == 1
+    X = X.reshape(len(X), -1).copy()
+    g_count = np.bincount(groups)
+    if years is not None:
+        t_codes = np.unique(years, return_inverse=True)[1]
+        t_count = np.bincount(t_codes)
+
+    for _ in range(max_iter if years is not None else 1):
+        prev = X.copy()
+        for j in range(X.shape[1]):
+            X[:, j] -= (np.bincount(groups, X[:, j], len(g_count)) / np.maximum(g_count, 1))[groups]
+            if years is not None:
+                X[:, j] -= (np.bincount(t_codes, X[:, j], len(t_count)) / np.maximum(t_count, 1))[t_codes]
+        if years is None or np.abs(X - prev).max() < tol:
+            break
+    return X[:, 0] if flat else X
+
+def fe_ols(y, X, groups, years=None, cluster_se=True):
+    """
+    Regresi fixed effects (within) y ~ X. Baris dengan NaN dibuang.
+    Return: dict coef, cov (cluster-robust per provinsi), n, n_groups.
+    """
+    X = np.asarray(X, dtype=np.float64).reshape(len(y), -1)
+    keep = ~np.isnan(y) & ~np.isnan(X).any(axis=1)
+    y, X, groups = y[keep], X[keep], groups[keep]
+    years = years[keep] if years is not None else None
+    groups = np.unique(groups, return_inverse=True)[1]
+    n, k = X.shape
+    n_groups = groups.max() + 1 if n else 0
+    if n <= k + n_groups:
+        return {'coef': np.full(k, np.nan), 'cov': np.full((k, k), np.nan), 'n': n, 'n_groups': n_groups}
+
+    y_w = within(y, groups, years)
+    X_w = within(X, groups, years)
+    XtX_inv = np.linalg.pinv(X_w.T @ X_w)
+    coef = XtX_inv @ (X_w.T @ y_w)
+    resid = y_w - X_w @ coef
+
+    if cluster_se:
+        # Skor dijumlah per provinsi: S[g] = sum_i x_i * e_i
+        scores = X_w * resid[:, None]
+        S = np.column_stack([np.bincount(groups, scores[:, j], n_groups) for j in range(k)])
+        correction = n_groups / max(n_groups - 1, 1) * (n - 1) / max(n - k, 1)
+        cov = correction * XtX_inv @ (S.T @ S) @ XtX_inv
+    else:
+        sigma2 = resid @ resid / max(n - k - n_groups, 1)
+        cov = sigma2 * XtX_inv
+    return {'coef': coef, 'cov': cov, 'n': n, 'n_groups': n_groups}
+
+def _lag_design(panel, y, x, lags, y_lags=0):
+    """Kolom desain: x_{t-l} untuk l di `lags`, ditambah y_{t-1..y_lags}"""
+    g, t = panel['groups'], panel['years']
+    cols = [shift(panel[x], g, t, l) for l in lags]
+    cols += [shift(panel[y], g, t, l) for l in range(1, y_lags + 1)]
+    return np.column_stack(cols)
+
+def lag_regressions(panel, y='P0', x='TPT', max_lag=MAX_LAG, time_effects=True):
+    """Regresi FE terpisah y_t ~ x_{t-l} untuk l = 0..max_lag: (lag, coef, se, n)"""
+    years = panel['years'] if time_effects else None
+    rows = []
+    for lag in range(max_lag + 1):
+        fit = fe_ols(panel[y], _lag_design(panel, y, x, [lag]), panel['groups'], years)
+        rows.append((lag, fit['coef'][0], np.sqrt(fit['cov'][0, 0]), fit['n']))
+    return rows
+
+def granger_test(panel, cause, effect, p, time_effects=True):
+    """
+    Granger panel (pooled FE): apakah lag 1..p `cause` menambah daya prediksi
+    `effect` di atas lag `effect` sendiri. Uji Wald cluster-robust untuk
+    koefisien lag `cause` = 0. Return: (F, p-value, n).
+    """
+    from scipy import stats
+
+    years = panel['years'] if time_effects else None
+    X = _lag_design(panel, effect, cause, range(1, p + 1), y_lags=p)
+    fit = fe_ols(panel[effect], X, panel['groups'], years)
+    b, V = fit['coef'][:p], fit['cov'][:p, :p]
+    if np.isnan(b).any():
+        return np.nan, np.nan, fit['n']
+    wald = float(b @ np.linalg.pinv(V) @ b)
+    f_stat = wald / p
+    p_value = float(stats.f.sf(f_stat, p, max(fit['n_groups'] - 1, 1)))
+    return f_stat, p_value, fit['n']
+
+def cross_correlation(panel, y='P0', x='TPT', max_lag=MAX_LAG, time_effects=True):
+    """
+    Korelasi within antara x_{t-k} dan y_t untuk k = -max_lag..max_lag
+    (k>0: x mendahului y). Return: list (k, korelasi, n).
+    """
+    g, t = panel['groups'], panel['years']
+    rows = []
+    for k in range(-max_lag, max_lag + 1):
+        xs = shift(panel[x], g, t, k)
+        keep = ~np.isnan(xs) & ~np.isnan(panel[y])
+        if keep.sum() < 3:
+            rows.append((k, np.nan, int(keep.sum())))
+            continue
+        codes = np.unique(g[keep], return_inverse=True)[1]
+        pair = within(np.column_stack([xs[keep], panel[y][keep]]), codes, t[keep] if time_effects else None)
+        rows.append((k, float(np.corrcoef(pair[:, 0], pair[:, 1])[0, 1]), int(keep.sum())))
+    return rows
+
+def _resample(panel, draws):
+    """Panel bootstrap: provinsi hasil undian disusun ulang sebagai grup baru (vektor, tanpa loop per grup)"""
+    counts = np.bincount(panel['groups'])
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    lengths = counts[draws]
+    offsets = np.repeat(starts[draws] - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    idx = offsets + np.arange(lengths.sum())
+    out = {key: values[idx] for key, values in panel.items()}
+    out['groups'] = np.repeat(np.arange(len(draws)), lengths)
+    return out
+
+def _bootstrap_chunk(panel, y, x, max_lag, time_effects, seed, n_rep):
+    """Koefisien lag_regressions untuk n_rep replikasi bootstrap klaster: array (n_rep, max_lag+1)"""
+    rng = np.random.default_rng(seed)
+    n_groups = panel['groups'].max() + 1
+    out = np.empty((n_rep, max_lag + 1))
+    for r in range(n_rep):
+        sample = _resample(panel, rng.integers(0, n_groups, size=n_groups))
+        out[r] = [row[1] for row in lag_regressions(sample, y, x, max_lag, time_effects)]
+    return out
+
+def bootstrap_lag_ci(panel, y='P0', x='TPT', max_lag=MAX_LAG, n_boot=N_BOOT, alpha=0.05,
+                     time_effects=True, n_jobs=-1, seed=42, chunk_size=50):
+    """
+    Interval kepercayaan persentil koefisien lag dari bootstrap klaster
+    provinsi. Replikasi dibagi per chunk dan dijalankan paralel; setiap chunk
+    punya seed turunan sendiri sehingga hasil tidak bergantung jumlah worker.
+    Return: array (max_lag+1, 2) batas bawah/atas.
+    """
+    from joblib import Parallel, delayed
+
+    sizes = [min(chunk_size, n_boot - s) for s in range(0, n_boot, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    parts = Parallel(n_jobs=n_jobs)(
+        delayed(_bootstrap_chunk)(panel, y, x, max_lag, time_effects, s, n) for s, n in zip(seeds, sizes)
+    )
+    coefs = np.vstack(parts)
+    return np.nanquantile(coefs, [alpha / 2, 1 - alpha / 2], axis=0).T
+
+def panel_report(df, y='P0', x='TPT', max_lag=MAX_LAG, n_boot=N_BOOT, time_effects=True, n_jobs=-1, seed=42):
+    """
+    Ringkasan analisis panel y vs x dari tabel master (Provinsi, Tahun, y, x).
+    Return: dict DataFrame 'lag_regression', 'granger', 'xcorr' dan dict 'meta'.
+    """
+    from scipy import stats
+
+    panel = panel_arrays(df, [y, x])
+    rows = lag_regressions(panel, y, x, max_lag, time_effects)
+    ci = bootstrap_lag_ci(panel, y, x, max_lag, n_boot, time_effects=time_effects, n_jobs=n_jobs, seed=seed)
+    n_groups = panel['groups'].max() + 1
+    df_lag = pd.DataFrame(rows, columns=['Lag', 'Koefisien', 'SE', 'N'])
+    df_lag['p_value'] = 2 * stats.t.sf(np.abs(df_lag['Koefisien'] / df_lag['SE']), max(n_groups - 1, 1))
+    df_lag['CI_Bawah'], df_lag['CI_Atas'] = ci[:, 0], ci[:, 1]
+
+    granger = []
+    for cause, effect in [(x, y), (y, x)]:
+        for p in range(1, max_lag + 1):
+            f_stat, p_value, n = granger_test(panel, cause, effect, p, time_effects)
+            granger.append({'Arah': f'{cause} → {effect}', 'Lag': p, 'F': f_stat, 'p_value': p_value, 'N': n})
+
+    df_xcorr = pd.DataFrame(cross_correlation(panel, y, x, max_lag, time_effects), columns=['Lag', 'Korelasi', 'N'])
+    meta = {'n_obs': int(len(panel['years'])), 'n_provinsi': int(n_groups), 'n_boot': n_boot,
+            'tahun': (int(panel['years'].min()), int(panel['years'].max())), 'time_effects': time_effects}
+    return {'lag_regression': df_lag, 'granger': pd.DataFrame(granger), 'xcorr': df_xcorr, 'meta': meta}
@@ -0,0 +1,205 @@
+"""
+Panel Tensor Module
+Representasi bersama data panel: array padat (provinsi x tahun x indikator)
+dengan peta index integer yang selaras, sehingga lag, selisih, rolling window
+dan agregasi tertimbang dikerjakan sebagai operasi array, bukan groupby/merge
+berulang di setiap skrip. Sumbu tahun selalu rentang penuh min..max (tahun
+kosong berisi NaN), jadi lag k pada sumbu tahun berarti tepat k tahun.
+"""
+
+import warnings
+import numpy as np
+import pandas as pd
+
+AXES = {'provinsi': 0, 'tahun': 1, 'indikator': 2}
+
+ROLLING_FUNCS = {
+    'mean': np.nanmean,
+    'sum': np.nansum,
+    'min': np.nanmin,
+    'max': np.nanmax,
+    'std': np.nanstd
+}
+
+class PanelTensor:
+    """
+    values: array float64 (n_provinsi, n_tahun, n_indikator), NaN = tidak ada data.
+    present: mask (n_provinsi, n_tahun) sel yang punya baris di tabel asal;
+    to_long() hanya mengembalikan sel ini.
+    """
+
+    def __init__(self, values, provinces, years, indicators, present=None, year_dtype=np.int64):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.provinces = list(provinces)
+        self.years = np.asarray(years)
+        self.indicators = list(indicators)
+        self.present = present if present is not None else ~np.isnan(self.values).all(axis=2)
+        self.year_dtype = year_dtype
+        self.province_index = {p: i for i, p in enumerate(self.provinces)}
+        self.year_index = {int(y): i for i, y in enumerate(self.years)} if self.years.dtype.kind in 'iu' else {}
+        self.indicator_index = {c: i for i, c in enumerate(self.indicators)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @classmethod
+    def from_long(cls, df, indicators=None, province_col='Provinsi', year_col='Tahun'):
+        """
+        Tensor dari tabel panjang (satu baris per Provinsi-Tahun). indicators:
+        kolom yang dimuat (default: semua kolom numerik selain tahun).
+        """
+        if indicators is None:
+            indicators = [c for c in df.columns
+                          if c != year_col and pd.api.types.is_numeric_dtype(df[c])]
+        p_codes, provinces = pd.factorize(df[province_col].astype(str), sort=True)
+        year_values = df[year_col].to_numpy(dtype=np.int64)
+        start = year_values.min() if len(year_values) else 0
+        years = np.arange(start, (year_values.max() + 1) if len(year_values) else 0)
+        t_codes = year_values - start
+
+        values = np.full((len(provinces), len(years), len(indicators)), np.nan)
+        values[p_codes, t_codes] = df[indicators].to_numpy(dtype=np.float64)
+        present = np.zeros((len(provinces), len(years)), dtype=bool)
+        present[p_codes, t_codes] = True
+        return cls(values, provinces, years, indicators, present, df[year_col].dtype)
+
+    def codes(self, df, province_col='Provinsi', year_col='Tahun'):
+        """Posisi (provinsi, tahun) di tensor untuk setiap baris df; -1 jika tidak ada"""
+        p = pd.Index(self.provinces).get_indexer(df[province_col].astype(str))
+        t = pd.Index(self.years).get_indexer(df[year_col].to_numpy(dtype=np.int64))
+        return p, t
+
+    def values_at(self, df, indicators=None, province_col='Provinsi', year_col='Tahun'):
+        """Nilai (n_baris, n_indikator) untuk baris df, selaras urutan df; NaN jika di luar tensor"""
+        p, t = self.codes(df, province_col, year_col)
+        idx = [self.indicator_index[c] for c in (indicators or self.indicators)]
+        ok = (p >= 0) & (t >= 0)
+        out = np.full((len(df), len(idx)), np.nan)
+        out[ok] = self.values[p[ok], t[ok]][:, idx]
+        return out
+
+    def to_long(self, province_col='Provinsi', year_col='Tahun'):
+        """Tabel panjang sel `present`, urut provinsi lalu tahun"""
+        p, t = np.nonzero(self.present)
+        df = pd.DataFrame({province_col: np.asarray(self.provinces, dtype=object)[p],
+                           year_col: self.years[t]})
+        if self.years.dtype.kind in 'iu':
+            df[year_col] = df[year_col].astype(self.year_dtype)
+        df[self.indicators] = self.values[p, t]
+        return df
+
+    def __getitem__(self, indicator):
+        """Matriks (provinsi x tahun) satu indikator (view)"""
+        return self.values[:, :, self.indicator_index[indicator]]
+
+    def frame(self, indicator):
+        """DataFrame tahun x provinsi satu indikator (format pivot dashboard)"""
+        return pd.DataFrame(self[indicator].T, index=self.years, columns=self.provinces)
+
+    def _with(self, values, **labels):
+        return PanelTensor(values, labels.get('provinces', self.provinces), labels.get('years', self.years),
+                           labels.get('indicators', self.indicators), labels.get('present', self.present),
+                           self.year_dtype)
+
+    def assign(self, **arrays):
+        """Tensor dengan indikator tambahan/pengganti dari array (provinsi x tahun)"""
+        values, indicators = self.values.copy(), list(self.indicators)
+        for name, arr in arrays.items():
+            arr = np.asarray(arr, dtype=np.float64)[:, :, None]
+            if name in self.indicator_index:
+                values[:, :, self.indicator_index[name]] = arr[:, :, 0]
+            else:
+                values = np.concatenate([values, arr], axis=2)
+                indicators.append(name)
+        return self._with(values, indicators=indicators)
+
+    def select(self, indicators):
+        """Tensor berisi sebagian indikator saja"""
+        idx = [self.indicator_index[c] for c in indicators]
+        return self._with(self.values[:, :, idx], indicators=list(indicators))
+
+    def lag(self, k=1, axis='tahun'):
+        """Nilai k posisi sebelumnya di sepanjang sumbu (k<0: sesudahnya), NaN di tepi"""
+        ax = AXES.get(axis, axis)
+        out = np.full_like(self.values, np.nan)
+        n = self.values.shape[ax]
+        if abs(k) < n:
+            src = [slice(None)] * 3
+            dst = [slice(None)] * 3
+            src[ax] = slice(0, n - k) if k >= 0 else slice(-k, n)
+            dst[ax] = slice(k, n) if k >= 0 else slice(0, n + k)
+            out[tuple(dst)] = self.values[tuple(src)]
+        return self._with(out)
+
+    def diff(self, k=1, axis='tahun'):
+        """Selisih nilai dengan lag k (NaN jika salah satu tidak ada)"""
+        return self._with(self.values - self.lag(k, axis).values)
+
+    def rolling(self, window, func='mean', axis='tahun', min_periods=None):
+        """
+        Statistik jendela bergulir (mean/sum/min/max/std) berakhir di setiap
+        posisi; jendela di awal sumbu diisi NaN. Posisi dengan data valid kurang
+        dari min_periods (default: window) menjadi NaN.
+        """
+        from numpy.lib.stride_tricks import sliding_window_view
+
+        ax = AXES.get(axis, axis)
+        min_periods = window if min_periods is None else min_periods
+        pad = [(0, 0)] * 3
+        pad[ax] = (window - 1, 0)
+        padded = np.pad(self.values, pad, constant_values=np.nan)
+        windows = sliding_window_view(padded, window, axis=ax)
+        count = (~np.isnan(windows)).sum(axis=-1)
+        with warnings.catch_warnings():
+            # Jendela tanpa data valid menghasilkan NaN ("Mean of empty slice")
+            warnings.simplefilter('ignore', RuntimeWarning)
+            out = ROLLING_FUNCS[func](windows, axis=-1)
+        out = np.where(count >= max(min_periods, 1), out, np.nan)
+        return self._with(out)
+
+    def aggregate(self, axis='provinsi', weights=None, groups=None, label='TOTAL'):
+        """
+        Rata-rata (tertimbang) di sepanjang sumbu, per grup. Nilai NaN tidak
+        ikut dihitung (bobotnya juga tidak). Grup dijumlah dengan satu
+        perkalian matriks sparse one-hot (n_grup x panjang sumbu).
+
+        weights: None (rata-rata biasa), nama indikator di tensor, atau array
+                 yang bisa di-broadcast ke values (mis. penduduk (provinsi x tahun)).
+        groups:  label grup per posisi sumbu (mis. pulau per provinsi); None =
+                 satu grup bernama `label`.
+        Return: PanelTensor dengan sumbu tersebut diganti label grup.
+        """
+        from scipy import sparse
+
+        ax = AXES.get(axis, axis)
+        n = self.values.shape[ax]
+        if isinstance(weights, str):
+            weights = self[weights][:, :, None]
+        w = np.broadcast_to(np.ones(1) if weights is None else np.asarray(weights, dtype=np.float64),
+                            self.values.shape)
+
+        if groups is None:
+            codes, labels = np.zeros(n, dtype=np.int64), [label]
+        else:
+            codes, labels = pd.factorize(pd.Series(list(groups)), sort=True)
+            labels = list(labels)
+        G = sparse.csr_matrix((np.ones(n), (codes, np.arange(n))), shape=(len(labels), n))
+
+        valid = ~np.isnan(self.values)
+        w = np.where(valid, w, 0.0)  # sel kosong (mis. tahun tanpa data) tidak ikut, termasuk bobotnya
+        flat = lambda a: np.moveaxis(a, ax, 0).reshape(n, -1)
+        num = G @ flat(np.where(valid, self.values * w, 0.0))
+        den = G @ flat(w)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+        shape = list(np.moveaxis(self.values, ax, 0).shape)
+        shape[0] = len(labels)
+        values = np.moveaxis(mean.reshape(shape), 0, ax)
+
+        present = self.present
+        if ax < 2:
+            present = np.moveaxis((G @ np.moveaxis(self.present, ax, 0).astype(np.float64)) > 0, 0, ax)
+        key = {0: 'provinces', 1: 'years', 2: 'indicators'}[ax]
+        return self._with(values, present=present, **{key: labels if ax != 1 else np.asarray(labels)})
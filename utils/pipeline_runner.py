@@ -0,0 +1,291 @@
+"""
+Pipeline Runner Module
+Konfigurasi path pipeline (satu objek untuk lokasi kode dan data) dan
+eksekusi stage di dalam proses: fungsi skrip diimpor langsung tanpa
+subprocess. Stage yang output-nya masih lebih baru dari input-nya bisa
+dilewati (mode inkremental), dan stage yang tidak saling bergantung
+dijalankan paralel.
+"""
+
+import os
+import sys
+import glob
+import time
+import importlib.util
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .atomic_io import file_lock, PIPELINE_LOCK_PATH
+from .instrumentation import stage as measure_stage, process_scope
+
+# Root kode (folder berisi app.py dan skrip bernomor)
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Root data (berisi Data_Source/ dan cleaned_data/) bisa dipindah lewat environment,
+# mis. volume terpisah di container atau scratch di node batch
+DATA_ROOT_ENV = 'PIPELINE_DATA_ROOT'
+
+# Spesifikasi stage: skrip, fungsi yang dipanggil berurutan, dependensi, dan pola
+# glob input/output (relatif terhadap root data) untuk pengecekan inkremental.
+# Skrip itu sendiri juga dihitung sebagai input, jadi perubahan kode memicu run ulang.
+STAGE_SPECS = {
+    'ingestion': {
+        'script': '01_data_ingestion_cleaning.py',
+        'description': 'Data Ingestion & Cleaning',
+        'entry': ['main'],
+        'depends': [],
+        'inputs': ['Data_Source/Tingkat Pengangguran Terbuka/*.csv',
+                   'Data_Source/Persentase Penduduk Miskin/**/*.csv', 'Data_Source/Jumlah Penduduk/*.csv'],
+        'outputs': ['cleaned_data/tpt_master_final.csv', 'cleaned_data/P0_master_final.csv',
+                    'cleaned_data/P1_master_final.csv', 'cleaned_data/P2_master_final.csv',
+                    'cleaned_data/gk_master_final.csv', 'cleaned_data/data_master_ml.csv']
+    },
+    'sentiment': {
+        'script': '03_sentiment_processor.py',
+        'description': 'Sentiment Processing',
+        'entry': ['process_tiktok_data'],
+        'depends': [],
+        'inputs': ['Data_Source/sosialresponse/*.csv'],
+        'outputs': ['cleaned_data/sentiment_per_year.csv']
+    },
+    'integration': {
+        'script': '04_final_integration.py',
+        'description': 'Final Integration',
+        'entry': ['integrate_final_dataset'],
+        'depends': ['ingestion', 'sentiment'],
+        'inputs': ['cleaned_data/data_master_ml.csv', 'cleaned_data/sentiment_per_year.csv'],
+        'outputs': ['cleaned_data/dataset_final_untuk_ml.csv']
+    },
+    'ml': {
+        'script': '05_machine_learning_model.py',
+        'description': 'ML Model Training',
+        'entry': ['build_machine_learning_model', 'build_multioutput_model'],
+        'depends': ['integration'],
+        'inputs': ['cleaned_data/dataset_final_untuk_ml.csv'],
+        'outputs': ['cleaned_data/model_registry/registry.json']
+    },
+    'forecast': {
+        'script': '07_forecasting.py',
+        'description': 'Forecasting 2026-2027',
+        'entry': ['run_forecasting'],
+        'depends': ['ml'],
+        'inputs': ['cleaned_data/dataset_final_untuk_ml.csv', 'cleaned_data/model_registry/registry.json',
+                   'cleaned_data/populasi_master_final.csv'],
+        'outputs': ['cleaned_data/data_forecasting_2026_2027.csv',
+                    'cleaned_data/data_forecasting_band_nasional.csv']
+    },
+    'hierarchy': {
+        'script': '08_hierarchical_forecast.py',
+        'description': 'Forecast Hierarki',
+        'entry': ['run_hierarchical_forecast'],
+        'depends': ['ingestion', 'forecast'],
+        'inputs': ['cleaned_data/P0_kabupaten_master_final.csv', 'cleaned_data/P0_nasional_master_final.csv',
+                   'cleaned_data/data_forecasting_2026_2027.csv', 'cleaned_data/populasi_master_final.csv'],
+        'outputs': ['cleaned_data/store/forecast_hierarki.*']
+    },
+    'cube': {
+        'script': '09_dashboard_cube.py',
+        'description': 'Kubus Agregat Dashboard',
+        'entry': ['run_dashboard_cube'],
+        'depends': ['integration', 'forecast'],
+        'inputs': ['cleaned_data/dataset_final_untuk_ml.csv', 'cleaned_data/data_forecasting_2026_2027.csv',
+                   'cleaned_data/populasi_master_final.csv'],
+        'outputs': ['cleaned_data/store/dashboard_cube.*']
+    },
+    'backtest': {
+        'script': '10_backtest.py',
+        'description': 'Backtest Forecast',
+        'entry': ['run_backtesting'],
+        'depends': ['integration'],
+        'inputs': ['cleaned_data/dataset_final_untuk_ml.csv'],
+        'outputs': ['cleaned_data/store/backtest_mae.*', 'cleaned_data/store/backtest_forecast.*']
+    }
+}
+
+# Stage yang boleh gagal tanpa menghentikan stage sesudahnya (sentimen bersifat tambahan)
+OPTIONAL_STAGES = {'sentiment'}
+
+class PipelineConfig:
+    """Lokasi kode dan data untuk satu run pipeline; semua path diresolve dari sini"""
+
+    def __init__(self, data_root=None, code_dir=CODE_DIR):
+        self.code_dir = os.path.abspath(code_dir)
+        self.data_root = os.path.abspath(data_root or os.environ.get(DATA_ROOT_ENV) or self.code_dir)
+
+    def path(self, *parts):
+        """Path absolut di bawah root data"""
+        return os.path.join(self.data_root, *parts)
+
+    def script_path(self, stage_key):
+        """Path absolut skrip sebuah stage"""
+        return os.path.join(self.code_dir, STAGE_SPECS[stage_key]['script'])
+
+    @property
+    def lock_path(self):
+        return self.path(PIPELINE_LOCK_PATH)
+
+    @property
+    def python(self):
+        """Interpreter untuk menjalankan skrip sebagai subprocess: venv proyek jika ada"""
+        venv_python = os.path.join(self.code_dir, 'venv/bin/python3')
+        return venv_python if os.path.exists(venv_python) else sys.executable
+
+def resolve_stages(names):
+    """
+    Kunci stage dari nama atau nomor skrip (mis. 'ingestion', '01', 'all'),
+    diurutkan sesuai urutan pipeline. ValueError untuk nama yang tidak dikenal.
+    """
+    by_number = {spec['script'][:2]: key for key, spec in STAGE_SPECS.items()}
+    selected = set()
+    for name in names:
+        name = name.strip()
+        if not name:
+            continue
+        if name == 'all':
+            selected.update(STAGE_SPECS)
+        elif name in STAGE_SPECS:
+            selected.add(name)
+        elif name in by_number:
+            selected.add(by_number[name])
+        else:
+            raise ValueError(f"Stage tidak dikenal: '{name}' (pilihan: {', '.join(STAGE_SPECS)}, 01-10, all)")
+    return [key for key in STAGE_SPECS if key in selected]
+
+def _matches(config, patterns):
+    """{pola: [file]} hasil glob di root data"""
+    return {p: glob.glob(config.path(p), recursive=True) for p in patterns}
+
+def stage_freshness(config, stage_key):
+    """
+    (perlu_dijalankan, alasan) dari perbandingan mtime: stage perlu jalan jika
+    ada output yang belum ada, atau input/skrip lebih baru dari output tertua.
+    """
+    spec = STAGE_SPECS[stage_key]
+    outputs = _matches(config, spec['outputs'])
+    missing = [p for p, files in outputs.items() if not files]
+    if missing:
+        return True, f"output belum ada: {os.path.basename(missing[0])}"
+    oldest_output = min(os.path.getmtime(f) for files in outputs.values() for f in files)
+    inputs = [f for files in _matches(config, spec['inputs']).values() for f in files]
+    inputs.append(config.script_path(stage_key))
+    newer = [f for f in inputs if os.path.exists(f) and os.path.getmtime(f) > oldest_output]
+    if newer:
+        return True, f"input lebih baru: {os.path.basename(newer[0])}"
+    return False, 'up-to-date'
+
+def plan_stages(config, stages, force=False):
+    """
+    Rencana run: list dict {stage, run, reason} sesuai urutan pipeline.
+    Stage yang dependensinya (di antara stage terpilih) dijalankan ikut dijalankan.
+    """
+    plan, running = [], set()
+    for key in stages:
+        upstream = [d for d in STAGE_SPECS[key]['depends'] if d in running]
+        if force:
+            run, reason = True, 'force'
+        elif upstream:
+            run, reason = True, f"dependensi dijalankan: {', '.join(upstream)}"
+        else:
+            run, reason = stage_freshness(config, key)
+        if run:
+            running.add(key)
+        plan.append({'stage': key, 'run': run, 'reason': reason})
+    return plan
+
+def load_stage_module(config, stage_key):
+    """Mengimpor skrip stage sebagai modul (blok __main__ tidak dijalankan)"""
+    path = config.script_path(stage_key)
+    spec = importlib.util.spec_from_file_location(f'pipeline_stage_{stage_key}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_stage_inprocess(config, stage_key):
+    """
+    Menjalankan fungsi entry sebuah stage di proses ini, diukur seperti saat
+    skrip dijalankan langsung. Return: (status, pesan) dengan status 'ok'/'failed';
+    skrip yang berhenti lebih awal tanpa menulis output dianggap gagal.
+    """
+    spec = STAGE_SPECS[stage_key]
+    try:
+        module = load_stage_module(config, stage_key)
+        with measure_stage(os.path.splitext(spec['script'])[0]):
+            for name in spec['entry']:
+                getattr(module, name)()
+    except Exception as e:
+        return 'failed', f'{type(e).__name__}: {e}'
+    missing = [p for p, files in _matches(config, spec['outputs']).items() if not files]
+    if missing:
+        return 'failed', f"output tidak terbentuk: {', '.join(missing)}"
+    return 'ok', None
+
+def run_pipeline(config, stages, workers=1, force=False, dry_run=False, on_event=None):
+    """
+    Menjalankan stage terpilih di root data `config`, paralel hingga `workers`
+    stage sekaligus selama dependensinya sudah selesai. Run diserialkan dengan
+    lock pipeline yang sama dengan dashboard.
+    Return: list dict {stage, status, reason, wall_s}; status 'ok', 'skipped',
+    'failed', 'blocked' (dependensi gagal) atau 'planned' (dry run).
+    Dengan workers > 1 stage berbagi satu proses, jadi record metrik stage
+    ditandai scope 'process': cpu_s/peak_rss_mb-nya angka proses, bukan per stage.
+    """
+    workers = max(1, int(workers))
+    plan = plan_stages(config, stages, force)
+    if dry_run:
+        return [{'stage': p['stage'], 'status': 'planned' if p['run'] else 'skipped',
+                 'reason': p['reason'], 'wall_s': None} for p in plan]
+
+    def emit(result):
+        if on_event is not None:
+            on_event(result)
+
+    results = {}
+    for p in plan:
+        if not p['run']:
+            results[p['stage']] = {'stage': p['stage'], 'status': 'skipped', 'reason': p['reason'], 'wall_s': None}
+            emit(results[p['stage']])
+    pending = [p['stage'] for p in plan if p['run']]
+    to_run = set(pending)
+
+    def ready(key):
+        return all(d in results for d in STAGE_SPECS[key]['depends'] if d in to_run)
+
+    def blocked_by(key):
+        return [d for d in STAGE_SPECS[key]['depends']
+                if d in results and results[d]['status'] in ('failed', 'blocked') and d not in OPTIONAL_STAGES]
+
+    def timed(key):
+        start = time.perf_counter()
+        status, message = run_stage_inprocess(config, key)
+        return {'stage': key, 'status': status, 'reason': message, 'wall_s': round(time.perf_counter() - start, 3)}
+
+    holder = {'key': 'cli:' + ','.join(pending), 'label': 'CLI Pipeline', 'stages': pending}
+    cwd = os.getcwd()
+    scope = process_scope() if workers > 1 else nullcontext()
+    with file_lock(config.lock_path, holder=holder), scope:
+        # Skrip memakai path relatif terhadap root data
+        os.chdir(config.data_root)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                running = {}
+                while pending or running:
+                    for key in [k for k in pending if ready(k)]:
+                        blockers = blocked_by(key)
+                        if blockers:
+                            pending.remove(key)
+                            results[key] = {'stage': key, 'status': 'blocked', 'wall_s': None,
+                                            'reason': f"dependensi gagal: {', '.join(blockers)}"}
+                            emit(results[key])
+                        elif len(running) < workers:
+                            pending.remove(key)
+                            running[pool.submit(timed, key)] = key
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key = running.pop(future)
+                        results[key] = future.result()
+                        emit(results[key])
+        finally:
+            os.chdir(cwd)
+    return [results[key] for key in stages if key in results]
@@ -0,0 +1,69 @@
+"""
+Population Module
+Bobot penduduk per provinsi-tahun dari tabel hasil ingestion (skrip 01) dan
+agregasi nasional tertimbang: setiap tahun dihitung sebagai satu perkalian
+titik nilai provinsi dengan bobot penduduk, seluruh tahun sekaligus (einsum).
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from .panel_tensor import PanelTensor
+
+POPULASI_PATH = 'cleaned_data/populasi_master_final.csv'
+
+def load_population(path=POPULASI_PATH):
+    """Tabel penduduk (Provinsi, Tahun, Penduduk) jika sudah diingest; None jika belum"""
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path)
+
+def population_weights(population, provinces, years):
+    """
+    Matriks bobot (n_provinsi x n_tahun) sesuai urutan `provinces` dan `years`.
+    Tahun tanpa data penduduk memakai tahun terdekat provinsi tersebut (termasuk
+    tahun forecast sesudah tabel berakhir), provinsi tanpa data memakai
+    rata-rata; tanpa tabel penduduk semua bobot = 1 (rata-rata biasa).
+    """
+    provinces = [str(p) for p in provinces]
+    years = np.asarray(years, dtype=np.int64)
+    if population is None or population.empty:
+        return np.ones((len(provinces), len(years)))
+
+    panel = PanelTensor.from_long(population.dropna(subset=['Penduduk']), ['Penduduk'])
+    grid = pd.DataFrame(panel['Penduduk'], index=panel.provinces).ffill(axis=1).bfill(axis=1)
+    pos = np.clip(years - panel.years[0], 0, len(panel.years) - 1)
+    weights = grid.reindex(provinces).to_numpy()[:, pos]
+    fallback = np.nanmean(weights) if (~np.isnan(weights)).any() else 1.0
+    return np.where(np.isnan(weights), fallback, weights)
+
+def weighted_mean(values, weights):
+    """
+    Rata-rata tertimbang di sumbu provinsi, satu perkalian titik per tahun.
+    values:  array (n_tahun, n_provinsi, ...) mis. sampel trajektori forecast
+    weights: array (n_tahun, n_provinsi)
+    Nilai NaN tidak ikut dihitung (bobotnya juga). Return: array (n_tahun, ...).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    w = weights.reshape(weights.shape + (1,) * (values.ndim - 2))
+    valid = ~np.isnan(values)
+    w = np.where(valid, w, 0.0)
+    num = np.einsum('tp...,tp...->t...', np.where(valid, values, 0.0), w)
+    den = w.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+def national_mean(df, columns, population=None):
+    """
+    Agregat nasional tertimbang penduduk per tahun dari tabel panjang
+    (Provinsi, Tahun, kolom). Return: DataFrame Tahun + kolom, urut tahun.
+    """
+    panel = PanelTensor.from_long(df, list(columns))
+    weights = population_weights(population, panel.provinces, panel.years)
+    means = weighted_mean(panel.values.transpose(1, 0, 2), weights.T)
+    has_data = panel.present.any(axis=0)
+    out = pd.DataFrame(means[has_data], columns=list(columns))
+    out.insert(0, 'Tahun', panel.years[has_data].astype(panel.year_dtype))
+    return out
@@ -0,0 +1,162 @@
+"""
+Query Engine Module
+Lapisan SQL analitik in-process (DuckDB, tanpa server) di atas output pipeline:
+setiap CSV di cleaned_data/, tabel di columnar store dan metrik JSONL didaftarkan
+sebagai view yang membaca file langsung saat query (tanpa disalin ke pandas).
+Agregat berat bisa didorong ke engine ini lewat grouped_means().
+"""
+
+import os
+import re
+import glob
+
+from .columnar_store import STORE_DIR
+from .data_profiler import SOURCES
+from .instrumentation import METRICS_PATH
+
+CLEANED_DIR = 'cleaned_data/'
+
+# View gabungan seluruh indikator dalam format panjang (sama dengan data_profiler.load_long_table)
+LONG_VIEW = 'indikator_panjang'
+
+# Statement yang boleh dijalankan dari kotak query (hanya baca)
+READ_ONLY_PREFIXES = ('select', 'with', 'describe', 'show', 'summarize', 'explain', 'from', 'pivot', 'unpivot')
+
+def has_duckdb():
+    """Cek apakah duckdb tersedia"""
+    try:
+        import duckdb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _view_name(path):
+    """Nama view dari nama file: karakter non-alfanumerik menjadi '_'"""
+    name = re.sub(r'\W', '_', os.path.splitext(os.path.basename(path))[0])
+    return f't_{name}' if name[0].isdigit() else name
+
+def _quote(path):
+    return "'" + path.replace("'", "''") + "'"
+
+def discover_tables(cleaned_dir=CLEANED_DIR, store_dir=STORE_DIR, metrics_path=METRICS_PATH):
+    """
+    {nama_view: (path, reader)} untuk semua file yang bisa di-query.
+    Tabel store menimpa CSV bernama sama; Parquet diutamakan daripada CSV cadangan store.
+    """
+    tables = {}
+    for path in sorted(glob.glob(os.path.join(cleaned_dir, '*.csv'))):
+        tables[_view_name(path)] = (path, 'read_csv_auto')
+    for ext, reader in (('csv', 'read_csv_auto'), ('parquet', 'read_parquet')):
+        for path in sorted(glob.glob(os.path.join(store_dir, f'*.{ext}'))):
+            tables[_view_name(path)] = (path, reader)
+    if os.path.exists(metrics_path):
+        tables['metrics'] = (metrics_path, 'read_json_auto')
+    return tables
+
+def _long_view_sql(views, sources=SOURCES):
+    """SELECT UNION ALL untuk view indikator panjang dari file sumber yang tersedia"""
+    parts = []
+    for level, filename, value_col, indikator in sources:
+        view = _view_name(filename)
+        if view not in views:
+            continue
+        if level == 'Kabupaten':
+            wilayah = "CAST(Provinsi AS VARCHAR) || ' / ' || CAST(Kabupaten AS VARCHAR)"
+        elif level == 'Nasional':
+            wilayah = "'INDONESIA'"
+        else:
+            wilayah = 'CAST(Provinsi AS VARCHAR)'
+        parts.append(
+            f"SELECT '{level}' AS Level, '{indikator}' AS Indikator, {wilayah} AS Wilayah, "
+            f"TRY_CAST(Tahun AS INTEGER) AS Tahun, TRY_CAST(\"{value_col}\" AS DOUBLE) AS Nilai FROM {view}"
+        )
+    return '\nUNION ALL\n'.join(parts)
+
+def connect(cleaned_dir=CLEANED_DIR, store_dir=STORE_DIR, metrics_path=METRICS_PATH):
+    """
+    Koneksi DuckDB in-memory dengan satu view per file output (lihat discover_tables)
+    dan view indikator_panjang. View membaca file saat query, jadi hasil pipeline
+    terbaru langsung terlihat; file baru perlu connect() ulang.
+    Koneksi dikunci: hanya folder data pipeline yang bisa dibaca (tanpa akses
+    file lain, URL atau ekstensi) dan konfigurasi tidak bisa diubah lewat SET.
+    """
+    if not has_duckdb():
+        raise ImportError("duckdb belum terinstall (pip install duckdb)")
+    import duckdb
+
+    con = duckdb.connect(database=':memory:')
+    views = {}
+    for name, (path, reader) in discover_tables(cleaned_dir, store_dir, metrics_path).items():
+        try:
+            con.execute(f'CREATE OR REPLACE VIEW "{name}" AS SELECT * FROM {reader}({_quote(os.path.abspath(path))})')
+            views[name] = path
+        except duckdb.Error as e:  # file kosong/rusak tidak menggagalkan view lain
+            print(f"⚠️ View {name} dilewati: {e}")
+    long_sql = _long_view_sql(views)
+    if long_sql:
+        con.execute(f'CREATE OR REPLACE VIEW {LONG_VIEW} AS {long_sql}')
+    folders = {cleaned_dir, store_dir, os.path.dirname(metrics_path) or '.'}
+    allowed = sorted(os.path.join(os.path.abspath(d), '') for d in folders)
+    con.execute(f"SET allowed_directories=[{', '.join(map(_quote, allowed))}]")
+    con.execute("SET enable_external_access=false")
+    con.execute("SET lock_configuration=true")
+    return con
+
+def list_views(con):
+    """Daftar view beserta kolomnya sebagai DataFrame (View, Kolom)"""
+    return con.cursor().execute(
+        "SELECT table_name AS View, string_agg(column_name || ' ' || data_type, ', ' ORDER BY ordinal_position) AS Kolom "
+        "FROM information_schema.columns GROUP BY table_name ORDER BY table_name"
+    ).df()
+
+def is_read_only(sql):
+    """True jika SQL hanya satu statement baca (SELECT/WITH/DESCRIBE/...)"""
+    statement = re.sub(r'--[^\n]*|/\*.*?\*/', ' ', sql, flags=re.S).strip().rstrip(';').strip()
+    return bool(statement) and ';' not in statement and statement.lower().startswith(READ_ONLY_PREFIXES)
+
+def run_query(con, sql, params=None, max_rows=None, read_only=True):
+    """
+    Menjalankan SQL dan mengembalikan DataFrame. Setiap panggilan memakai cursor
+    sendiri sehingga satu koneksi aman dipakai bersama beberapa thread (sesi Streamlit).
+    read_only=True menolak statement selain query baca (ValueError).
+    """
+    if read_only and not is_read_only(sql):
+        raise ValueError("Hanya satu query baca (SELECT/WITH/DESCRIBE/SUMMARIZE) yang diizinkan")
+    cursor = con.cursor()
+    result = cursor.execute(sql, params or [])
+    if max_rows is None:
+        return result.df()
+    import pandas as pd
+    rows = result.fetchmany(max_rows)
+    return pd.DataFrame(rows, columns=[d[0] for d in result.description])
+
+def grouped_means(relation, keys, indicators, weight=None, con=None):
+    """
+    Agregat yang didorong ke DuckDB: rata-rata biasa (kolom indikator) dan, jika
+    `weight` diberikan, rata-rata tertimbang (kolom indikator_W) per grup `keys`.
+    relation: nama view/tabel di `con`, atau DataFrame (dibaca langsung tanpa disalin).
+    NaN diperlakukan sebagai nilai kosong, sama seperti pandas.
+    """
+    import duckdb
+
+    con = con or duckdb.connect(database=':memory:')
+    cursor = con.cursor()
+    if isinstance(relation, str):
+        source = f'"{relation}"'
+    else:
+        cursor.register('_grouped_means_input', relation)
+        source = '_grouped_means_input'
+
+    select = [f'"{k}"' for k in keys]
+    for ind in indicators:
+        value = f'CASE WHEN isnan(CAST("{ind}" AS DOUBLE)) THEN NULL ELSE CAST("{ind}" AS DOUBLE) END'
+        select.append(f'AVG({value}) AS "{ind}"')
+        if weight is not None:
+            select.append(f'SUM({value} * "{weight}") / NULLIF(SUM(CASE WHEN {value} IS NOT NULL '
+                          f'THEN "{weight}" END), 0) AS "{ind}_W"')
+    group = ', '.join(f'"{k}"' for k in keys)
+    try:
+        return cursor.execute(f'SELECT {", ".join(select)} FROM {source} GROUP BY {group}').df()
+    finally:
+        if not isinstance(relation, str):
+            cursor.unregister('_grouped_means_input')
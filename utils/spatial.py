@@ -0,0 +1,227 @@
+"""
+Spatial Module
+Fitur spasial dari geometri provinsi: graf ketetanggaan dihitung sekali dari
+GeoJSON (index bounding box lalu uji sisi bersama yang eksak) dan di-cache per
+proses. Spatial lag (rata-rata indikator provinsi tetangga) dan Moran's I per
+tahun dihitung sebagai perkalian matriks sparse untuk seluruh tahun sekaligus.
+"""
+
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+
+from .geo_service import get_geometry, feature_ids, _iter_rings, MAP_DATA_PATH
+from .panel_tensor import PanelTensor
+
+# Nama provinsi dataset -> nama feature GeoJSON. Peta hanya memuat 32 provinsi
+# lama, jadi provinsi hasil pemekaran memakai poligon induknya: provinsi yang
+# berbagi poligon saling bertetangga dan mewarisi tetangga poligon tersebut.
+# Provinsi kepulauan yang dulu bagian dari provinsi daratan (Kep. Riau) tidak
+# ikut poligon induk (batas daratnya bukan batasnya): namanya tidak ada di peta
+# dan tetangganya hanya dari SEA_NEIGHBOURS.
+GEOMETRY_ALIAS = {
+    'ACEH': 'DI. ACEH',
+    'BANTEN': 'PROBANTEN',
+    'DI YOGYAKARTA': 'DAERAH ISTIMEWA YOGYAKARTA',
+    'JAKARTA': 'DKI JAKARTA',
+    'KALIMATAN BARAT': 'KALIMANTAN BARAT',
+    'KALIMATAN SELATAN': 'KALIMANTAN SELATAN',
+    'KALIMATAN TENGAH': 'KALIMANTAN TENGAH',
+    'KALIMATAN TIMUR': 'KALIMANTAN TIMUR',
+    'KALIMATAN UTARA': 'KALIMANTAN TIMUR',
+    'KALIMANTAN UTARA': 'KALIMANTAN TIMUR',
+    'KEP. BANGKA BELITUNG': 'BANGKA BELITUNG',
+    'KEPULAUAN BANGKA BELITUNG': 'BANGKA BELITUNG',
+    'KEP. RIAU': 'KEPULAUAN RIAU',
+    'NUSA TENGGARA BARAT': 'NUSATENGGARA BARAT',
+    'PAPUA': 'IRIAN JAYA TIMUR',
+    'PAPUA SELATAN': 'IRIAN JAYA TIMUR',
+    'PAPUA PEGUNUNGAN': 'IRIAN JAYA TENGAH',
+    'PAPUA TENGAH': 'IRIAN JAYA TENGAH',
+    'PAPUA BARAT': 'IRIAN JAYA BARAT',
+    'PAPUA BARAT DAYA': 'IRIAN JAYA BARAT',
+    'SULAWESI BARAT': 'SULAWESI SELATAN',
+    'SUMATRA BARAT': 'SUMATERA BARAT',
+    'SUMATRA SELATAN': 'SUMATERA SELATAN',
+    'SUMATRA UTARA': 'SUMATERA UTARA'
+}
+
+# Tetangga lewat laut (nama hasil geometry_key), ditambahkan sebelum provinsi
+# yang masih tanpa tetangga dihubungkan ke centroid terdekat: centroid poligon
+# pulau bisa lebih dekat ke provinsi yang bukan tetangganya (mis. NTT ke Sultra)
+SEA_NEIGHBOURS = [
+    ('BALI', 'JAWA TIMUR'),
+    ('NUSATENGGARA BARAT', 'BALI'),
+    ('NUSA TENGGARA TIMUR', 'NUSATENGGARA BARAT'),
+    ('KEPULAUAN RIAU', 'RIAU'),
+    ('KEPULAUAN RIAU', 'JAMBI'),
+    ('KEPULAUAN RIAU', 'BANGKA BELITUNG'),
+    ('BANGKA BELITUNG', 'SUMATERA SELATAN'),
+    ('PROBANTEN', 'LAMPUNG'),
+    ('MALUKU', 'MALUKU UTARA'),
+    ('MALUKU', 'IRIAN JAYA BARAT'),
+    ('MALUKU UTARA', 'SULAWESI UTARA')
+]
+
+# Fitur spasial -> kolom sumber. P0 memakai lag tahun lalu (P0 tetangga tahun
+# yang sama belum diketahui saat forecast), TPT memakai tahun berjalan seperti
+# fitur TPT sendiri.
+SPATIAL_FEATURES = {
+    'P0_Lag1_Spasial': 'P0_Lag1',
+    'TPT_Spasial': 'TPT'
+}
+
+# Pembulatan koordinat sebelum membandingkan sisi antar poligon
+COORD_DECIMALS = 6
+
+def _polygon_edges(geometry):
+    """Himpunan sisi (pasangan titik, arah kanonik) seluruh ring satu feature"""
+    edges = set()
+    for ring in _iter_rings(geometry):
+        pts = [tuple(p) for p in np.round(np.asarray(ring, dtype=float), COORD_DECIMALS)]
+        edges.update((p, q) if p <= q else (q, p) for p, q in zip(pts[:-1], pts[1:]) if p != q)
+    return edges
+
+@lru_cache(maxsize=1)
+def geometry_adjacency(path=MAP_DATA_PATH):
+    """
+    Ketetanggaan antar feature GeoJSON (geometri penuh, tanpa penyederhanaan).
+    Pasangan kandidat dipilih dari bounding box yang bersinggungan, lalu
+    dinyatakan bertetangga jika berbagi minimal satu sisi yang sama persis.
+    Return: (ids, pasangan (k, 2) indeks feature, centroid titik (m, 2))
+    """
+    geo = get_geometry('tinggi', path)
+    ids = feature_ids(geo)
+    coords = [np.concatenate([np.asarray(r, dtype=float) for r in _iter_rings(f['geometry'])]) for f in geo['features']]
+    lo = np.array([c.min(axis=0) for c in coords])
+    hi = np.array([c.max(axis=0) for c in coords])
+    centroids = np.array([c.mean(axis=0) for c in coords])
+
+    overlap = ((lo[:, None, :] <= hi[None, :, :]) & (lo[None, :, :] <= hi[:, None, :])).all(axis=2)
+    candidates = np.argwhere(np.triu(overlap, k=1))
+
+    edges = [_polygon_edges(f['geometry']) for f in geo['features']]
+    pairs = [(i, j) for i, j in candidates if not edges[i].isdisjoint(edges[j])]
+    return tuple(ids), np.array(pairs, dtype=np.int64).reshape(-1, 2), centroids
+
+def geometry_key(provinsi):
+    """Nama feature GeoJSON untuk nama provinsi dataset"""
+    name = str(provinsi).upper().strip()
+    return GEOMETRY_ALIAS.get(name, name)
+
+@lru_cache(maxsize=32)
+def _adjacency(provinces, path):
+    from scipy import sparse
+
+    ids, pairs, centroids = geometry_adjacency(path)
+    pos = {name: k for k, name in enumerate(ids)}
+    m = len(ids)
+    G = sparse.coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(m, m)).tocsr()
+    G = G + G.T + sparse.identity(m, format='csr')
+
+    # One-hot provinsi -> poligon; A = P G P^T (poligon sama atau poligon bertetangga)
+    geo_idx = np.array([pos.get(geometry_key(p), -1) for p in provinces])
+    known = np.flatnonzero(geo_idx >= 0)
+    P = sparse.csr_matrix((np.ones(len(known)), (known, geo_idx[known])), shape=(len(provinces), m))
+    A = (P @ G @ P.T).tocsr()
+
+    keys = np.array([geometry_key(p) for p in provinces])
+    for a, b in SEA_NEIGHBOURS:
+        rows, cols = np.flatnonzero(keys == a), np.flatnonzero(keys == b)
+        rows, cols = np.repeat(rows, len(cols)), np.tile(cols, len(rows))
+        A = A + sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=A.shape)
+        A = A + sparse.csr_matrix((np.ones(len(rows)), (cols, rows)), shape=A.shape)
+    A = A.tocsr()
+    A.setdiag(0)
+    A.eliminate_zeros()
+    A.data[:] = 1.0
+
+    # Provinsi pulau yang tetap tanpa tetangga dihubungkan ke poligon lain terdekat (centroid)
+    isolated = known[np.diff(A.indptr)[known] == 0]
+    if len(isolated):
+        dist = np.linalg.norm(centroids[geo_idx[isolated]][:, None, :] - centroids[None, :, :], axis=2)
+        dist[np.arange(len(isolated)), geo_idx[isolated]] = np.inf
+        dist[:, np.setdiff1d(np.arange(m), geo_idx[known])] = np.inf  # hanya poligon yang dipakai dataset
+        nearest = dist.argmin(axis=1)
+        links = P[:, nearest].T.tocsr()  # (isolated, provinsi) yang menempati poligon terdekat
+        rows, cols = links.nonzero()
+        extra = sparse.csr_matrix((np.ones(len(rows)), (isolated[rows], cols)), shape=A.shape)
+        A = ((A + extra + extra.T) > 0).astype(np.float64).tocsr()
+    return A
+
+def adjacency_matrix(provinces, path=MAP_DATA_PATH):
+    """
+    Matriks ketetanggaan biner simetris (scipy.sparse CSR, n x n) untuk daftar
+    provinsi dataset sesuai urutannya. Provinsi yang tidak ada di peta hanya
+    bertetangga lewat SEA_NEIGHBOURS. Di-cache per daftar provinsi.
+    """
+    return _adjacency(tuple(str(p) for p in provinces), path)
+
+def _row_standardize(A):
+    """Bobot ter-standardisasi baris: setiap baris berjumlah 1 (baris tanpa tetangga tetap 0)"""
+    degree = np.asarray(A.sum(axis=1)).ravel()
+    scale = np.divide(1.0, degree, out=np.zeros_like(degree), where=degree > 0)
+    return A.multiply(scale[:, None]).tocsr()
+
+def spatial_weights(provinces, path=MAP_DATA_PATH):
+    """Bobot spasial ter-standardisasi baris (rata-rata tetangga), urutan = `provinces`"""
+    return _row_standardize(adjacency_matrix(provinces, path))
+
+def spatial_lag(df, column, path=MAP_DATA_PATH):
+    """
+    Rata-rata `column` provinsi tetangga pada tahun yang sama, untuk setiap
+    baris df (kolom Provinsi, Tahun). Seluruh tahun dihitung dengan dua
+    perkalian sparse: jumlah nilai tetangga dan jumlah tetangga yang punya
+    data (sehingga tetangga tanpa data tahun itu tidak ikut dirata-rata).
+    Provinsi tanpa tetangga berdata memakai nilainya sendiri.
+    """
+    panel = PanelTensor.from_long(df, [column])
+    grid = panel[column]
+    A = adjacency_matrix(panel.provinces, path)
+    present = ~np.isnan(grid)
+    total = A @ np.where(present, grid, 0.0)
+    count = A @ present.astype(np.float64)
+    lag = np.where(count > 0, total / np.maximum(count, 1), grid)
+    lagged = panel.assign(**{column: lag}).values_at(df, [column])[:, 0]
+    return pd.Series(lagged, index=df.index, name=f'{column}_Spasial')
+
+def add_spatial_features(df, path=MAP_DATA_PATH):
+    """df dengan kolom SPATIAL_FEATURES (yang kolom sumbernya tersedia)"""
+    lags = {dst: spatial_lag(df, src, path) for dst, src in SPATIAL_FEATURES.items() if src in df.columns}
+    return df.assign(**lags)
+
+def morans_i(df, column, n_perm=999, seed=42, path=MAP_DATA_PATH):
+    """
+    Moran's I per tahun dengan bobot ter-standardisasi baris atas provinsi berdata
+    tahun itu (seperti spatial_weights), sehingga blok provinsi pemekaran yang
+    berbagi poligon induk tidak mendominasi hanya karena banyak sambungannya.
+    Beserta nilai harapan -1/(n-1) dan p-value permutasi satu sisi (autokorelasi
+    positif); semua permutasi satu tahun dievaluasi dengan satu perkalian sparse
+    W @ Z (n x n_perm). Graf_Berubah menandai tahun yang himpunan provinsinya
+    (jadi grafnya) berbeda dari tahun sebelumnya: nilai I tidak sebanding lintas titik itu.
+    Return: DataFrame Tahun, Moran_I, E_I, p_value, N, Graf_Berubah
+    """
+    panel = PanelTensor.from_long(df, [column])
+    grid, years = panel[column], panel.years
+    A = adjacency_matrix(panel.provinces, path)
+    rng = np.random.default_rng(seed)
+    rows, previous = [], None
+    for t, year in enumerate(years):
+        if not panel.present[:, t].any():
+            continue
+        idx = np.flatnonzero(~np.isnan(grid[:, t]))
+        changed = previous is not None and not np.array_equal(idx, previous)
+        previous = idx
+        W = _row_standardize(A[idx][:, idx])
+        n, s0 = len(idx), W.sum()
+        z = grid[idx, t] - grid[idx, t].mean()
+        zz = z @ z
+        if n < 3 or s0 == 0 or zz == 0:
+            rows.append((int(year), np.nan, np.nan, np.nan, n, changed))
+            continue
+        moran = n / s0 * (z @ (W @ z)) / zz
+        Z = rng.permuted(np.tile(z[:, None], (1, n_perm)), axis=0)
+        perm = n / s0 * (Z * (W @ Z)).sum(axis=0) / zz
+        p_value = (1 + (perm >= moran).sum()) / (n_perm + 1)
+        rows.append((int(year), moran, -1 / (n - 1), p_value, n, changed))
+    return pd.DataFrame(rows, columns=['Tahun', 'Moran_I', 'E_I', 'p_value', 'N', 'Graf_Berubah'])
@@ -0,0 +1,342 @@
+"""
+Validation Engine Module
+Validasi upload berbasis skema: file dibaca per chunk, setiap kolom dicek
+secara vektor, dan hasilnya berupa daftar baris/kolom yang bermasalah
+beserta alasannya (bukan sekadar pesan umum)
+"""
+
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+from .atomic_io import atomic_path
+
+CHUNK_SIZE = 50_000
+MAX_ERRORS = 1000
+
+# Kolom persentase BPS (boleh kosong, mis. provinsi baru sebelum pemekaran)
+_PCT = {'type': 'numeric', 'min': 0, 'max': 100, 'nullable': True}
+
+# Skema per jenis upload.
+# read      : argumen pembacaan (header/skiprows) sama seperti skrip 01 dan Control Panel
+# positions : template BPS tidak punya nama kolom yang stabil, jadi kolom dipetakan per posisi
+#             persis seperti di skrip 01; baris dengan 'key' kosong (sub-header) dilewati
+# null      : token yang dianggap kosong (BPS memakai '-')
+SCHEMAS = {
+    'TPT': {
+        'read': {'header': 3},
+        'positions': {0: 'Provinsi', 1: 'TPT_Feb', 2: 'TPT_Aug', 3: 'TPT_Tahunan_Source'},
+        'key': 'Provinsi',
+        'null': ['-'],
+        'columns': {
+            'Provinsi': {'type': 'text'},
+            'TPT_Feb': _PCT,
+            'TPT_Aug': _PCT,
+            'TPT_Tahunan_Source': _PCT
+        }
+    },
+    'GK': {
+        'read': {'header': 3},
+        'positions': {0: 'Provinsi', 3: 'GK_Kota_Tahunan', 6: 'GK_Desa_Tahunan'},
+        'key': 'Provinsi',
+        'null': ['-'],
+        'columns': {
+            'Provinsi': {'type': 'text'},
+            'GK_Kota_Tahunan': {'type': 'numeric', 'min': 0, 'nullable': True},
+            'GK_Desa_Tahunan': {'type': 'numeric', 'min': 0, 'nullable': True}
+        }
+    },
+    'PENDUDUK': {
+        'read': {'header': 3},
+        'positions': {0: 'Provinsi', 1: 'Penduduk'},
+        'key': 'Provinsi',
+        'null': ['-'],
+        'columns': {
+            'Provinsi': {'type': 'text'},
+            'Penduduk': {'type': 'numeric', 'min': 0, 'nullable': True}
+        }
+    },
+    'TIKTOK_KONTEN': {
+        'read': {'skiprows': 4},
+        'unique': 'ID Unik',
+        'columns': {
+            'ID Unik': {'type': 'text', 'prefix': 'T'},
+            'Jenis Konten': {'type': 'text'},
+            'Teks Konten': {'type': 'text', 'nullable': True},
+            'Tahun': {'type': 'integer', 'min': 2019, 'max': 2030},
+            'Platform': {'type': 'text', 'allowed': ['TikTok']}
+        }
+    },
+    'TIKTOK_KOMENTAR': {
+        'read': {'skiprows': 1},
+        'unique': 'ID Unik',
+        'columns': {
+            'ID Unik': {'type': 'text', 'prefix': 'T'},
+            'Jenis Konten': {'type': 'text', 'allowed': ['Komentar Balasan']},
+            'Teks Konten': {'type': 'text', 'nullable': True},
+            'Tahun': {'type': 'integer', 'min': 2019, 'max': 2030},
+            'Platform': {'type': 'text', 'allowed': ['TikTok']},
+            'Balasan ID Komentar': {'type': 'text', 'nullable': True}
+        }
+    }
+}
+for _code in ('P0', 'P1', 'P2'):
+    SCHEMAS[_code] = {
+        'read': {'header': 3},
+        'positions': {0: 'Provinsi', 7: f'{_code}_Mar', 8: f'{_code}_Sep', 9: f'{_code}_Tahunan_Source'},
+        'key': 'Provinsi',
+        'null': ['-'],
+        'columns': {
+            'Provinsi': {'type': 'text'},
+            f'{_code}_Mar': _PCT,
+            f'{_code}_Sep': _PCT,
+            f'{_code}_Tahunan_Source': _PCT
+        }
+    }
+
+ERROR_COLUMNS = ['Baris', 'Kolom', 'Indeks Kolom', 'Nilai', 'Alasan']
+
+def _errors_from_mask(mask, row_ids, column, col_idx, values, reason):
+    """Baris error (vektor) dari mask boolean satu pemeriksaan"""
+    rows = np.flatnonzero(mask)
+    if rows.size == 0:
+        return None
+    return pd.DataFrame({
+        'Baris': row_ids[rows], 'Kolom': column, 'Indeks Kolom': col_idx,
+        'Nilai': values[rows], 'Alasan': reason
+    })
+
+def apply_layout(chunk, schema):
+    """
+    Menyelaraskan chunk dengan skema: nama kolom dirapikan, kolom posisi BPS
+    diberi nama, baris sub-header (key kosong) dibuang, token null diganti NA.
+    Return: (chunk, {nama_kolom: indeks_kolom_asli})
+    """
+    chunk.columns = [str(c).strip() for c in chunk.columns]
+    positions = schema.get('positions')
+    if positions:
+        width = chunk.shape[1]
+        present = {pos: name for pos, name in positions.items() if pos < width}
+        chunk = chunk.iloc[:, list(present)].set_axis(list(present.values()), axis=1)
+        col_index = {name: pos for pos, name in present.items()}
+    else:
+        col_index = {name: i for i, name in enumerate(chunk.columns)}
+    if schema.get('null'):
+        chunk = chunk.replace(schema['null'], np.nan)
+    key = schema.get('key')
+    if key in chunk.columns:
+        chunk = chunk[chunk[key].notna()]
+    return chunk, col_index
+
+def check_chunk(chunk, schema, col_index=None):
+    """
+    Memeriksa satu chunk (semua kolom dibaca sebagai string) terhadap skema.
+    Indeks baris chunk dipakai sebagai nomor baris data (0-based setelah header).
+    Return: DataFrame error (Baris, Kolom, Indeks Kolom, Nilai, Alasan)
+    """
+    found = []
+    col_index = col_index or {name: i for i, name in enumerate(chunk.columns)}
+    row_ids = chunk.index.to_numpy()
+    for name, spec in schema['columns'].items():
+        if name not in chunk.columns:
+            continue
+        col_idx = col_index[name]
+        raw = chunk[name]
+        values = raw.to_numpy(dtype=object)
+        text = raw.str.strip()
+        is_null = (text.isna() | (text == '')).fillna(True).astype(bool)
+
+        if not spec.get('nullable', False):
+            found.append(_errors_from_mask(is_null.to_numpy(), row_ids, name, col_idx, values, 'Nilai kosong'))
+
+        if spec['type'] in ('numeric', 'integer'):
+            num = pd.to_numeric(text.str.replace(',', '.', regex=False), errors='coerce').astype(float)
+            bad = (~is_null & num.isna()).to_numpy()
+            found.append(_errors_from_mask(bad, row_ids, name, col_idx, values, 'Bukan angka'))
+            if spec['type'] == 'integer':
+                frac = (num.notna() & (num % 1 != 0)).to_numpy()
+                found.append(_errors_from_mask(frac, row_ids, name, col_idx, values, 'Harus bilangan bulat'))
+            if 'min' in spec:
+                low = (num < spec['min']).to_numpy()
+                found.append(_errors_from_mask(low, row_ids, name, col_idx, values, f"Kurang dari {spec['min']}"))
+            if 'max' in spec:
+                high = (num > spec['max']).to_numpy()
+                found.append(_errors_from_mask(high, row_ids, name, col_idx, values, f"Lebih dari {spec['max']}"))
+        else:
+            if 'prefix' in spec:
+                bad = (~is_null & ~text.str.startswith(spec['prefix'], na=False)).to_numpy()
+                found.append(_errors_from_mask(bad, row_ids, name, col_idx, values,
+                                               f"Harus diawali '{spec['prefix']}'"))
+            if 'allowed' in spec:
+                bad = (~is_null & ~text.isin(spec['allowed'])).to_numpy()
+                found.append(_errors_from_mask(bad, row_ids, name, col_idx, values,
+                                               f"Harus salah satu dari {spec['allowed']}"))
+
+    found = [f for f in found if f is not None]
+    if not found:
+        return pd.DataFrame(columns=ERROR_COLUMNS)
+    return pd.concat(found, ignore_index=True)
+
+def validate_stream(source, schema, chunksize=CHUNK_SIZE, max_errors=MAX_ERRORS):
+    """
+    Validasi file CSV (path atau file-like) per chunk tanpa memuat seluruh isi ke memori.
+
+    Return dict:
+      is_valid, n_rows, missing_columns, errors (DataFrame, maks max_errors baris),
+      n_errors (total), error_counts (per kolom+alasan), years, provinces
+    """
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    reader = pd.read_csv(source, dtype=str, chunksize=chunksize, keep_default_na=False,
+                         na_values=[''], **schema.get('read', {}))
+
+    errors, n_errors, n_rows = [], 0, 0
+    counts = {}
+    missing, years, provinces = None, set(), set()
+    unique_col = schema.get('unique')
+    seen_ids = np.array([], dtype=np.uint64)
+
+    for chunk in reader:
+        chunk, col_index = apply_layout(chunk, schema)
+        if missing is None:
+            missing = [c for c in schema['columns'] if c not in chunk.columns]
+
+        chunk_errors = check_chunk(chunk, schema, col_index)
+
+        if unique_col in chunk.columns:
+            # Duplikat lintas chunk dicek lewat hash 64-bit ID pada array terurut
+            # (searchsorted), jadi biaya per chunk ~ ukuran chunk x log(jumlah ID)
+            ids = chunk[unique_col].to_numpy(dtype=object)
+            present = ~pd.isna(ids)
+            hashes = pd.util.hash_array(ids[present].astype(str))
+            dup = pd.Series(ids, dtype=object).duplicated(keep='first').to_numpy().copy()
+            pos = np.searchsorted(seen_ids, hashes).clip(max=max(len(seen_ids) - 1, 0))
+            if len(seen_ids):
+                dup[present] |= seen_ids[pos] == hashes
+            dup_err = _errors_from_mask(dup, chunk.index.to_numpy(), unique_col,
+                                        col_index[unique_col], ids, 'Duplikat')
+            if dup_err is not None:
+                chunk_errors = pd.concat([chunk_errors, dup_err], ignore_index=True)
+            seen_ids = np.sort(np.concatenate([seen_ids, hashes]), kind='stable')
+
+        if len(chunk_errors):
+            n_errors += len(chunk_errors)
+            for key, n in chunk_errors.groupby(['Kolom', 'Alasan']).size().items():
+                counts[key] = counts.get(key, 0) + int(n)
+            room = max_errors - sum(len(e) for e in errors)
+            if room > 0:
+                errors.append(chunk_errors.head(room))
+
+        if 'Tahun' in chunk.columns:
+            years.update(pd.to_numeric(chunk['Tahun'], errors='coerce').dropna().astype(int).unique().tolist())
+        if 'Provinsi' in chunk.columns:
+            provinces.update(chunk['Provinsi'].dropna().str.strip().unique().tolist())
+        n_rows += len(chunk)
+
+    missing = missing if missing is not None else list(schema['columns'])
+    df_errors = pd.concat(errors, ignore_index=True) if errors else pd.DataFrame(columns=ERROR_COLUMNS)
+    # Nomor baris di file (1-based): baris data 0 berada tepat setelah baris header
+    read = schema.get('read', {})
+    header_line = read.get('header', 0) + read.get('skiprows', 0)
+    df_errors.insert(1, 'Baris File', df_errors['Baris'].astype(int) + header_line + 2)
+    error_counts = pd.DataFrame(
+        [(col, reason, n) for (col, reason), n in counts.items()],
+        columns=['Kolom', 'Alasan', 'Jumlah']
+    ).sort_values('Jumlah', ascending=False, ignore_index=True)
+
+    return {
+        'is_valid': not missing and n_errors == 0,
+        'n_rows': n_rows,
+        'missing_columns': missing,
+        'errors': df_errors,
+        'n_errors': n_errors,
+        'error_counts': error_counts,
+        'years': sorted(years),
+        'provinces': sorted(provinces)
+    }
+
+def validate_frame(df, schema):
+    """Validasi DataFrame yang sudah ada di memori dengan skema yang sama (satu chunk)"""
+    chunk, col_index = apply_layout(df.astype('string'), schema)
+    missing = [c for c in schema['columns'] if c not in chunk.columns]
+    errors = check_chunk(chunk, schema, col_index)
+    unique_col = schema.get('unique')
+    if unique_col in chunk.columns:
+        dup = _errors_from_mask(chunk[unique_col].duplicated().to_numpy(), chunk.index.to_numpy(),
+                                unique_col, col_index[unique_col],
+                                chunk[unique_col].to_numpy(dtype=object), 'Duplikat')
+        if dup is not None:
+            errors = pd.concat([errors, dup], ignore_index=True)
+    return missing, errors
+
+def report_messages(missing, errors, limit=10):
+    """Ringkasan pesan error yang mudah dibaca (kolom hilang + jumlah error per kolom/alasan)"""
+    messages = []
+    if missing:
+        messages.append(f"Kolom yang hilang: {', '.join(missing)}")
+    if len(errors):
+        for (col, reason), grp in errors.groupby(['Kolom', 'Alasan'], sort=False):
+            rows = ', '.join(map(str, grp['Baris'].head(5)))
+            more = f" (+{len(grp) - 5} lainnya)" if len(grp) > 5 else ""
+            messages.append(f"Kolom '{col}': {reason} di baris {rows}{more}")
+    return messages[:limit]
+
+def save_upload(uploaded_file, dest_path, chunk_size=1 << 20):
+    """Menyimpan file upload mentah ke disk per blok (tanpa parsing ulang), secara atomik"""
+    uploaded_file.seek(0)
+    with atomic_path(dest_path) as tmp:
+        with open(tmp, 'wb') as out:
+            shutil.copyfileobj(uploaded_file, out, chunk_size)
+    return dest_path
+
+def _read_chunks(source, schema, chunksize):
+    """Reader CSV per chunk dengan nilai apa adanya (string), sesuai argumen baca skema"""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return pd.read_csv(source, dtype=str, chunksize=chunksize, keep_default_na=False,
+                       na_values=[''], **schema.get('read', {}))
+
+def _hash_ids(chunk, key):
+    """Hash 64-bit dari kolom kunci (string, spasi tepi dibuang)"""
+    return pd.util.hash_array(chunk[key].astype(str).str.strip().to_numpy(dtype=object))
+
+def merge_upload(uploaded_file, dest_path, schema, preamble, chunksize=CHUNK_SIZE):
+    """
+    Menggabungkan upload ke file tujuan per chunk, tanpa memuat keduanya utuh.
+    Hasilnya sama dengan concat(lama, upload) + drop_duplicates(`unique`,
+    keep='last'): pass pertama hanya mengumpulkan hash 64-bit kunci untuk
+    menandai kemunculan terakhir, pass kedua menulis baris yang lolos.
+    Urutan kolom = kolom lama lalu kolom baru. preamble: baris pembuka
+    template (sebelum header kolom). Ditulis atomik.
+    Return: jumlah baris data yang ditulis.
+    """
+    key = schema['unique']
+    sources = ([dest_path] if os.path.exists(dest_path) else []) + [uploaded_file]
+
+    columns, hashes = [], []
+    for source in sources:
+        for chunk in _read_chunks(source, schema, chunksize):
+            columns += [c for c in (str(c).strip() for c in chunk.columns) if c not in columns]
+            chunk.columns = [str(c).strip() for c in chunk.columns]
+            hashes.append(_hash_ids(chunk, key))
+    hashes = np.concatenate(hashes) if hashes else np.array([], dtype=np.uint64)
+    # Kemunculan pertama di urutan terbalik = kemunculan terakhir di urutan asli
+    _, first_rev = np.unique(hashes[::-1], return_index=True)
+    keep = np.zeros(len(hashes), dtype=bool)
+    keep[len(hashes) - 1 - first_rev] = True
+
+    n_rows, offset = 0, 0
+    with atomic_path(dest_path) as tmp:
+        with open(tmp, 'w', encoding='utf-8', newline='') as out:
+            out.writelines(preamble)
+            pd.DataFrame(columns=columns).to_csv(out, index=False)
+            for source in sources:
+                for chunk in _read_chunks(source, schema, chunksize):
+                    chunk.columns = [str(c).strip() for c in chunk.columns]
+                    mask = keep[offset:offset + len(chunk)]
+                    offset += len(chunk)
+                    chunk = chunk[mask]
+                    chunk.reindex(columns=columns).to_csv(out, header=False, index=False)
+                    n_rows += len(chunk)
+    return n_rows